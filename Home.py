@@ -1,16 +1,33 @@
 # pylint: disable=import-error
 import streamlit as st
 import plotly.express as px
-import pandas as pd
-from src.load.load_module import DataLoader
-from src.load.load_module import get_engine
+from src.logs.logging_module import configure_logging
+configure_logging()
+from src.db.engine import get_engine, database_url
+from src.load.load_module import table_version
+from src.db import sql_queries_module as queries
+from src.load.parquet_store_module import SeasonStore
 from dotenv import load_dotenv
 import os
 
-# Get connection to database
+# The database engine is resolved on first read by the query helpers below
+# (get_engine() creates it once per process), so loading the page does no
+# database work until data is shown. Without database settings the views
+# read the Parquet store only.
 load_dotenv()
-load = DataLoader()
-engine = get_engine()
+
+def database_configured() -> bool:
+    try:
+        database_url()
+        return True
+    except ValueError:
+        return False
+
+def db():
+    """Shared engine, or None when no database is configured"""
+    return get_engine() if database_configured() else None
+# Season-partitioned Parquet copy of nfl_facts, read for the seasons it holds
+store = SeasonStore.from_env()
 
 st.set_page_config(layout="wide", page_title='NFL Analytics Platform')
 st.title('🏈 NFL Offensive Analysis', text_alignment = 'center')
@@ -22,144 +39,50 @@ if 'updated' not in st.session_state:
 if 'last_update' not in st.session_state:
     st.session_state.last_update = None
 
-if 'team_table' not in st.session_state:
-    st.session_state.team_table = None
-
-if 'game_table' not in st.session_state:
-    st.session_state.game_table = None
-
-if 'season_table' not in st.session_state:
-    st.session_state.season_table = None
-
-if 'nfl_facts_table' not in st.session_state:
-    st.session_state.nfl_facts_table = None
-
 if st.session_state.last_update is not None:
     st.text(f"Last updated: {st.session_state.last_update}")
 
-# Querys for tables
-def query_teams():
-    with engine.connect() as connection:
-        query = "SELECT * FROM team"
-        result = pd.read_sql(query, connection)
-        return result 
-def query_seasons():
-    with engine.connect() as connection:
-        query = "SELECT * FROM season"
-        result = pd.read_sql(query, connection)
-        return result   
-def query_games():
-    with engine.connect() as connection:
-        query = "SELECT * FROM game"
-        result = pd.read_sql(query, connection)
-        return result   
-def query_nfl_facts():
-    with engine.connect() as connection:
-        query = "SELECT * FROM nfl_facts"
-        result = pd.read_sql(query, connection)
-        return result
-
-# Functions to build tables for chart builder 
-def get_season_view(df, start_year, end_year):
-    filtered = df[
-        (df["season_id"] >= start_year) &
-        (df["season_id"] <= end_year)
-    ]
-
-    season_df = (
-        filtered.groupby("season_id")
-        .agg({
-            "pass_attempts": "sum",
-            "rush_attempts": "sum",
-            "pass_yards": "sum",
-            "rush_yards": "sum",
-            "pass_tds": "sum",
-            "rush_tds": "sum",
-        })
-        .reset_index()
-    )
-
-    season_df["avg_pass_pct"] = (
-        season_df["pass_attempts"] /
-        (season_df["pass_attempts"] + season_df["rush_attempts"])
-    )
-
-    season_df["avg_rush_pct"] = 1 - season_df["avg_pass_pct"]
-    season_df["avg_pass_pct"] *= 100
-    season_df["avg_rush_pct"] *= 100
-
-    new_season_df = season_df.dropna()
-    return new_season_df
-def get_team_view(df, year):
-    filtered = df[df["season_id"] == year]
-
-    # Aggregate season totals per team
-    team_df = (
-        filtered.groupby("team_id")
-        .agg({
-            "pass_attempts": "sum",
-            "rush_attempts": "sum",
-            "pass_yards": "sum",
-            "rush_yards": "sum",
-            "pass_tds": "sum",
-            "rush_tds": "sum",
-            "result": lambda x: list(x),  # keep results for win %
-            "game_type": lambda x: list(x)
-        })
-        .reset_index()
-    )
-
-    team_df["made_playoffs"] = team_df["game_type"].apply(
-        lambda games: any(g != "REG" for g in games)
-    )
-
-    team_df["made_superbowl"] = team_df["game_type"].apply(
-        lambda games: any(g == "SB" for g in games)
-    )
-
-    def get_status(row):
-        if row["made_superbowl"]:
-            return "Super Bowl"
-        elif row["made_playoffs"]:
-            return "Playoffs"
-        else:
-            return "Regular Season"
-        
-    team_df["season_status"] = team_df.apply(get_status, axis=1)
-
-    team_df['pass_percentage'] = (team_df['pass_attempts'] / (team_df['pass_attempts'] + team_df['rush_attempts'])) * 100
-    team_df['rush_percentage'] = (team_df['rush_attempts'] / (team_df['pass_attempts'] + team_df['rush_attempts'])) * 100
-    team_df['pass_efficiency'] = (team_df['pass_yards'] / (team_df['pass_attempts']))
-    team_df['rush_efficiency'] = (team_df['rush_yards'] / (team_df['rush_attempts']))
-    team_df['pass_td_percentage'] = (team_df['pass_tds'] / (team_df['pass_tds'] + team_df['rush_tds'])) * 100
-    team_df['rush_td_percentage'] = (team_df['rush_tds'] / (team_df['pass_tds'] + team_df['rush_tds'])) * 100
-
-    team_df.drop(columns=["game_type"], inplace=True)
-
-    team_df["win_pct"] = team_df["result"].apply(calculate_win_pct)
-
-    new_team_df = team_df.dropna()
-    return new_team_df
-def get_game_view(df, year, week):
-    game_df = df[
-        (df["season_id"] == year) &
-        (df["week"] == week)
-    ].copy()
-
-    new_game_df = game_df.dropna()
-    return new_game_df
-
-def calculate_win_pct(results):
-    wins = results.count("W")
-    losses = results.count("L")
-    ties = results.count("T")
-
-    total = wins + losses + ties
-
-    if total == 0:
-        return 0
-
-    return ((wins + 0.5 * ties) / total) * 100
+# Cached reads are keyed on data_version(): this process's write counters,
+# the tables' row counts (changed by loads from any process, e.g. the CLI or
+# another server) and the Parquet store's write time. Updates made
+# elsewhere that keep a table's row count show after CACHE_TTL seconds.
+CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", 300))
+
+def data_version(*table_names):
+    version = tuple(table_version(t) for t in table_names)
+    if database_configured():
+        version += queries.row_counts(db(), table_names)
+    return version
+
+# Querys for tables: the preview reads one page of rows at a time
+@st.cache_data(show_spinner = False, ttl = CACHE_TTL)
+def query_page(table_name, page, version):
+    return queries.read_preview(db(), table_name, page)
+
+def preview_table(table_name):
+    rows = queries.count_rows(db(), table_name)
+    version = (table_version(table_name), rows)
+    pages = max(1, -(-rows // queries.PREVIEW_ROWS))
+    page = st.number_input("Page", 1, pages, 1, key = f"{table_name}_page") if pages > 1 else 1
+    st.caption(f"{rows} rows | page {page} of {pages}")
+    st.dataframe(query_page(table_name, page - 1, version), width = 'content')
+
+# Functions to build tables for chart builder.
+# Read from the summary tables, the Parquet store's partitions or SQL
+# aggregates, so only the view's rows are held; cached until the facts or
+# summaries are written again
+@st.cache_data(show_spinner = False, ttl = CACHE_TTL)
+def get_season_view(start_year, end_year, version):
+    return queries.season_view(start_year, end_year, db(), store = store)
+@st.cache_data(show_spinner = False, ttl = CACHE_TTL)
+def get_team_view(year, version):
+    return queries.team_view(year, db(), store = store)
+@st.cache_data(show_spinner = False, ttl = CACHE_TTL)
+def get_game_view(year, week, version):
+    return queries.game_view(year, week, db(), store = store)
+@st.cache_data(show_spinner = False, ttl = CACHE_TTL)
+def get_seasons(version):
+    return queries.seasons(db(), store = store)
 
 def chart_builder(df, x_axis=None, compare = False):
 
@@ -310,41 +233,25 @@ tab1, tab2 = st.tabs(['Data Preview', 'Chart Builder'])
 with tab1:
     table1, table2, table3, table4 = st.tabs(['team_table', 'season_table', 'game_table', 'nfl_facts_table'])
     with table1:
-        if st.session_state.updated:
-            try:
-                team = query_teams()
-                st.dataframe(team, width = 'content')
-                st.session_state.team_table = team
-                st.session_updated = False
-            except Exception:
-                st.error("No team table found in database")
+        try:
+            preview_table("team")
+        except Exception:
+            st.error("No team table found in database")
     with table2:
-        if st.session_state.updated:
-            try:
-                season = query_seasons()
-                st.dataframe(season, width = 'content')
-                st.session_state.season_table = season
-                st.session_updated = False
-            except Exception:
-                st.error("No season table found in database")   
+        try:
+            preview_table("season")
+        except Exception:
+            st.error("No season table found in database")   
     with table3:
-        if st.session_state.updated:
-            try:
-                game = query_games()
-                st.dataframe(game, width = 'content')
-                st.session_state.game_table = game
-                st.session_updated = False
-            except Exception:
-                st.error("No game table found in database")
+        try:
+            preview_table("game")
+        except Exception:
+            st.error("No game table found in database")
     with table4:
-        if st.session_state.updated:
-            try:
-                nfl_facts = query_nfl_facts()
-                st.dataframe(nfl_facts, width = 'content')
-                st.session_state.nfl_facts_table = nfl_facts
-                st.session_updated = False
-            except Exception:
-                st.error("No nfl_facts table found in database")
+        try:
+            preview_table("nfl_facts")
+        except Exception:
+            st.error("No nfl_facts table found in database")
 
 with tab2:
     col1, col2 = st.columns([3, 1], border = True)
@@ -352,38 +259,45 @@ with tab2:
     with col2:
         option = st.selectbox(label = 'Select data you wish to chart', options = ['Season', 'Team', 'Game'])
 
-        if st.session_state.nfl_facts_table is not None:
-            nfl_facts = st.session_state.nfl_facts_table
+        version = data_version("nfl_facts", "season_summary", "team_season_summary")
+        version += (store.version("nfl_facts"),)
+        has_data = database_configured() or store.seasons("nfl_facts")
+        try:
+            seasons = get_seasons(version) if has_data else []
+        except Exception:
+            seasons = []
+            st.error("No nfl_facts table found in database")
 
+        if seasons:
             if option == "Season":
                 start_year, end_year = st.slider(
                     "Select Year Range",
-                    int(nfl_facts["season_id"].min()),
-                    int(nfl_facts["season_id"].max()),
-                    (1999, 2025)
+                    seasons[0],
+                    seasons[-1],
+                    (seasons[0], seasons[-1])
                 )
 
                 compare_mode = st.toggle("Compare Multiple Metrics")
 
-                df_view = get_season_view(nfl_facts, start_year, end_year)
+                df_view = get_season_view(start_year, end_year, version)
                 chart = chart_builder(df_view, 'season_id', compare_mode)
             elif option == "Team":
                 year = st.selectbox(
                     "Select Season",
-                    sorted(nfl_facts["season_id"].unique())
+                    seasons
                 )
 
-                df_view = get_team_view(nfl_facts, year)
+                df_view = get_team_view(year, version)
                 chart = chart_builder(df_view)
             elif option == "Game":
                 year = st.selectbox(
                     "Select Season",
-                    sorted(nfl_facts["season_id"].unique())
+                    seasons
                 )
 
                 week = st.slider("Select Week", 1, 22, 1)
 
-                df_view = get_game_view(nfl_facts, year, week)
+                df_view = get_game_view(year, week, version)
                 chart = chart_builder(df_view)
 
             with col1:
@@ -0,0 +1,96 @@
+"""Benchmark: vectorized facts_table against the previous row-wise version.
+
+Builds a 26-season frame (1999-2024) by repeating the 2024 example files
+and times both implementations on it.
+
+Run from the repository root with the usual .env in place:
+    python -m benchmarks.bench_facts_table
+"""
+import time
+import argparse
+import pandas as pd
+from src.transform import fe_module
+from src.transform.validation import Validation
+
+
+def facts_table_apply(stats_df, schedule_df):
+    """The previous facts_table: row-wise apply for the result column"""
+    home_games = schedule_df[fe_module.schedule_home].copy()
+    home_games['team_id'] = home_games['home_team']
+    home_games['points_scored'] = home_games['home_score']
+    home_games['points_allowed'] = home_games['away_score']
+
+    away_games = schedule_df[fe_module.schedule_away].copy()
+    away_games['team_id'] = away_games['away_team']
+    away_games['points_scored'] = away_games['away_score']
+    away_games['points_allowed'] = away_games['home_score']
+
+    team_games = pd.concat([home_games, away_games], ignore_index=True)
+    team_games = team_games.rename(columns={'season': 'season_id'})
+    team_stats = stats_df.rename(columns={'season': 'season_id', 'team': 'team_id'})
+
+    f_table = team_stats.merge(team_games, on=['season_id', 'week', 'team_id'], how='left')
+    f_table['game_id'] = (
+        f_table['season_id'].astype(str) + "_" +
+        f_table['week'].astype(str) + "_" +
+        f_table['team_id'].fillna('')
+    )
+    f_table['result'] = f_table.apply(
+        lambda row: 'W' if row['points_scored'] > row['points_allowed']
+        else 'L' if row['points_scored'] < row['points_allowed']
+        else 'T',
+        axis=1
+    )
+    final_table = f_table.rename(columns={
+        'attempts': 'pass_attempts',
+        'carries': 'rush_attempts',
+        'passing_yards': 'pass_yards',
+        'rushing_yards': 'rush_yards',
+        'passing_tds': 'pass_tds',
+        'rushing_tds': 'rush_tds'
+    })
+    valid, rejected = Validation.valid_columns(final_table, fe_module.fact_cols)
+    return valid
+
+
+def build_seasons(first=1999, last=2024):
+    """Repeats the 2024 example stats and schedule once per season"""
+    stats = pd.read_csv("2024_team_stats_example.csv")
+    schedule = pd.read_csv("2024_schedule_example.csv")
+    years = range(first, last + 1)
+    stats_all = pd.concat([stats.assign(season=year) for year in years], ignore_index=True)
+    schedule_all = pd.concat([schedule.assign(season=year) for year in years], ignore_index=True)
+    return stats_all, schedule_all
+
+
+def best_of(func, repeat, *args):
+    """Returns the fastest of `repeat` runs, in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    stats, schedule = build_seasons()
+    expected = facts_table_apply(stats, schedule)
+    actual = fe_module.facts_table(stats, schedule)
+    pd.testing.assert_frame_equal(expected.reset_index(drop=True), actual.reset_index(drop=True),
+                                  check_dtype=False)
+
+    old = best_of(facts_table_apply, args.repeat, stats, schedule)
+    new = best_of(fe_module.facts_table, args.repeat, stats, schedule)
+    print(f"rows: {len(actual)} ({len(stats)} stat rows, {len(schedule)} games)")
+    print(f"row-wise apply: {old * 1000:8.1f} ms")
+    print(f"vectorized:     {new * 1000:8.1f} ms")
+    print(f"speedup:        {old / new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Benchmark suite: ETL hot paths at 1x, 10x and 100x scale, against a baseline.
+
+The 2024 example files are the 1x input. Larger scales repeat them once per
+synthetic season (2024, 2023, ...), so keys stay unique and every run sees
+the same data. Each case is timed as the best of --repeat runs (fast
+cases are looped, as in timeit):
+
+    facts_table, game_table        fe_module transforms
+    clean                          Cleaning.clean on the raw facts table
+    valid_columns                  Validation.valid_columns on the team stats
+    insert, insert_batched         DataLoader.insert_ into a fresh SQLite table:
+                                   one named-parameter executemany, then
+                                   batches of up to 500 rows, each a driver
+                                   executemany of a single-row INSERT with
+                                   positional binds (capped by the backend's
+                                   bind-parameter limit)
+
+Results are compared to benchmarks/baseline.json; a case slower than the
+baseline by more than --tolerance (and by at least --min-delta seconds) is
+reported as a regression and the run exits with status 1.
+
+Run from the repository root with the usual .env in place:
+    python -m benchmarks.bench_suite                       # compare
+    python -m benchmarks.bench_suite --save-baseline       # record a new baseline
+    python -m benchmarks.bench_suite --scales 1 10 --only facts_table clean
+"""
+import os
+import sys
+import json
+import timeit
+import platform
+import argparse
+import tempfile
+import pandas as pd
+from sqlalchemy import create_engine, event
+from benchmarks.bench_facts_table import best_of
+from src.transform import fe_module
+from src.transform.cleaning import Cleaning
+from src.transform.validation import Validation
+from src.load.load_module import DataLoader
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+SCALES = (1, 10, 100)
+
+
+def build_scaled(scale: int):
+    """Returns (stats, schedule) holding `scale` copies of the 2024 examples,
+    one per season counting back from 2024"""
+    stats = pd.read_csv("2024_team_stats_example.csv")
+    schedule = pd.read_csv("2024_schedule_example.csv")
+    years = range(2024, 2024 - scale, -1)
+    return (pd.concat([stats.assign(season=year) for year in years], ignore_index=True),
+            pd.concat([schedule.assign(season=year) for year in years], ignore_index=True))
+
+
+def sqlite_insert(workdir, batch_size=None):
+    """insert_ into a new table in a throwaway SQLite file under workdir,
+    created outside the timing"""
+    def setup(facts):
+        fd, path = tempfile.mkstemp(suffix=".db", dir=workdir)
+        os.close(fd)
+        engine = create_engine(f"sqlite:///{path}")
+        # fsync timing is disk noise, not loader cost
+        event.listen(engine, "connect", lambda conn, _: conn.execute("PRAGMA synchronous = OFF"))
+        load = DataLoader(engine)
+        load.create_(facts, "nfl_facts", primary_key="game_id")
+        return load
+    return setup, lambda load, facts: load.insert_(facts, "nfl_facts", "game_id", batch_size=batch_size)
+
+
+def cases(stats, schedule, workdir):
+    """name -> (setup or None, function, args)"""
+    raw_facts = fe_module.facts_table(stats, schedule)
+    facts = Cleaning.clean(raw_facts)
+    return {
+        "facts_table": (None, fe_module.facts_table, (stats, schedule)),
+        "game_table": (None, fe_module.game_table, (schedule,)),
+        "clean": (None, Cleaning.clean, (raw_facts,)),
+        "valid_columns": (None, Validation.valid_columns, (stats, list(stats.columns[::2]))),
+        "insert": (*sqlite_insert(workdir), (facts,)),
+        "insert_batched": (*sqlite_insert(workdir, 500), (facts,)),
+    }
+
+
+def run_case(setup, func, args, repeat):
+    """Best-of-repeat seconds per call. Cases without setup are looped like
+    timeit, so each measurement lasts at least 0.2s and millisecond cases
+    are not dominated by noise; setup runs before every repeat, untimed."""
+    if setup is None:
+        timer = timeit.Timer(lambda: func(*args))
+        number, _ = timer.autorange()
+        return min(timer.repeat(repeat, number)) / number
+    times = []
+    for _ in range(repeat):
+        state = setup(*args)
+        times.append(best_of(func, 1, state, *args))
+    return min(times)
+
+
+def environment():
+    return {"python": platform.python_version(), "pandas": pd.__version__,
+            "platform": platform.platform(), "machine": platform.machine()}
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta: float = 0.0):
+    """Prints one line per case and returns the names of regressed cases:
+    slower than the baseline by more than `tolerance` and by at least
+    `min_delta` seconds"""
+    regressions = []
+    print(f"{'case':<26} {'seconds':>10} {'baseline':>10} {'ratio':>7}")
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if base:
+            ratio = seconds / base
+            flag = "  REGRESSION" if ratio > 1 + tolerance and seconds - base >= min_delta else ""
+            if flag:
+                regressions.append(name)
+            print(f"{name:<26} {seconds:10.4f} {base:10.4f} {ratio:6.2f}x{flag}")
+        else:
+            print(f"{name:<26} {seconds:10.4f} {'-':>10} {'-':>7}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=list(SCALES))
+    parser.add_argument("--only", nargs="+", default=None, help="case names to run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown over the baseline before failing (0.25 = 25%%)")
+    parser.add_argument("--min-delta", type=float, default=0.002,
+                        help="ignore slowdowns smaller than this many seconds")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write these results as the new baseline instead of comparing")
+    args = parser.parse_args(argv)
+
+    # Metrics records would only add noise to the timings
+    os.environ.setdefault("PIPELINE_METRICS_FILE", "")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench_") as workdir:
+        for scale in args.scales:
+            stats, schedule = build_scaled(scale)
+            for name, (setup, func, func_args) in cases(stats, schedule, workdir).items():
+                if args.only and name not in args.only:
+                    continue
+                results[f"{name}@{scale}x"] = run_case(setup, func, func_args, args.repeat)
+
+    if args.save_baseline:
+        stored = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                stored = json.load(f).get("results", {})
+        stored.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "repeat": args.repeat, "results": stored}, f, indent=2)
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            saved = json.load(f)
+        baseline = saved.get("results", {})
+        if saved.get("environment", {}).get("machine") != platform.machine():
+            print("Note: baseline was recorded on a different machine type")
+    regressions = compare(results, baseline, args.tolerance, args.min_delta)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
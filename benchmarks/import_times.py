@@ -0,0 +1,125 @@
+"""Import-time report: what a cold start of the app, pipeline and tests pays for.
+
+Each target is imported in a fresh interpreter under `python -X importtime`,
+and the output is summarized per top-level package (cumulative time, with
+the interpreter's own startup imports left out). A target is a module name
+or a script path; for a script (e.g. a Streamlit page) only its module-level
+import statements are run, so nothing is rendered or loaded.
+
+Run from the repository root with the usual .env in place:
+    python -m benchmarks.import_times
+    python -m benchmarks.import_times pages/Data_Pipeline.py --top 15
+    python -m benchmarks.import_times src.db.engine --json
+"""
+import os
+import ast
+import sys
+import json
+import argparse
+import subprocess
+
+TARGETS = (
+    "Home.py",
+    "pages/Data_Pipeline.py",
+    "src.pipeline.runner_module",
+    "testing.test_pipeline",
+)
+PROJECT_PACKAGES = {"src", "testing", "benchmarks", "pages"}
+
+
+def import_code(target: str) -> str:
+    """Python source that performs the target's imports"""
+    if not target.endswith(".py"):
+        return f"import {target}"
+    with open(target, encoding = "utf-8") as f:
+        tree = ast.parse(f.read(), filename = target)
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in imports) or "pass"
+
+
+def parse_importtime(stderr: str) -> list:
+    """Rows of (package, depth, self_us, cumulative_us) from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        name = parts[2][1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(parts[0]), int(parts[1])))
+    return rows
+
+
+def _run(code: str) -> list:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output = True, text = True, env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"})
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+def package_key(name: str) -> str:
+    """Report line a module counts towards: the project's own modules by
+    subpackage (src.load), everything else by top-level package"""
+    parts = name.split(".")
+    return ".".join(parts[:2]) if parts[0] in PROJECT_PACKAGES else parts[0]
+
+
+def summarize(rows: list, skip: set = frozenset()) -> dict:
+    """Seconds per package_key, heaviest first. A package is charged where
+    it is first entered from a different package, less the packages it
+    pulls in itself, so the figures add up to the total import time."""
+    packages = {}
+    stack = []  # (depth, key, entry key of the nearest charged ancestor)
+    for name, depth, _, cumulative in reversed(rows):  # parents before children
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        key = package_key(name)
+        parent_key, owner = (stack[-1][1], stack[-1][2]) if stack else (None, None)
+        if key != parent_key and name not in skip:
+            packages[key] = packages.get(key, 0) + cumulative / 1e6
+            if owner is not None:
+                packages[owner] -= cumulative / 1e6
+            owner = key
+        stack.append((depth, key, owner))
+    return dict(sorted(packages.items(), key = lambda item: item[1], reverse = True))
+
+
+def profile(target: str) -> dict:
+    """summarize() for one target, leaving out what the interpreter
+    imports on its own at startup"""
+    startup = {name for name, *_ in _run("pass")}
+    return summarize(_run(import_code(target)), startup)
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument("targets", nargs = "*", default = list(TARGETS), help = "module names or script paths")
+    parser.add_argument("--top", type = int, default = 10, help = "packages listed per target")
+    parser.add_argument("--json", action = "store_true", help = "print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    report = {}
+    for target in args.targets:
+        try:
+            report[target] = profile(target)
+        except RuntimeError as e:
+            report[target] = {"error": str(e)}
+    if args.json:
+        print(json.dumps(report, indent = 2))
+        return report
+
+    for target, packages in report.items():
+        if "error" in packages:
+            print(f"{target}: failed to import ({packages['error']})")
+            continue
+        print(f"{target}: {sum(packages.values()):.3f}s")
+        for name, seconds in list(packages.items())[:args.top]:
+            print(f"    {name:<28} {seconds:8.3f}s")
+    return report
+
+
+if __name__ == "__main__":
+    main()
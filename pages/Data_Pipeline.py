@@ -1,42 +1,64 @@
 """Module of Streamlit UI to run the data pipeline"""
 import streamlit as st
 import pandas as pd
-import time
 from datetime import datetime
-from src.extract.nflreadpy_extract import *
+from src.logs.logging_module import configure_logging
+configure_logging()
 from src.extract.extract_module import DataExtractor
-from src.transform import cleaning, fe_module
+from src.transform import fe_module, schema_module
 from src.load.load_module import DataLoader
+from src.metrics import metrics_module
+from src.db.engine import pool_status
 
+# The engine connects on first use; nflreadpy and Polars are imported by
+# the pipeline modules, only when a button below runs them
 load = DataLoader()
+engine = fe_module.transform_engine()
 
 st.set_page_config(layout="wide", page_title='NFL Analytics Data Pipeline')
 st.title("⚙️ Data Pipeline")
 
 # Columns for extract buttons
-col1, col2, _ = st.columns([1,1,6], gap = 'xxsmall')
-
-# SESSION STATES
-if 'stats_example' not in st.session_state:
-    st.session_state.stats_example = None
-
-if 'schedule_example' not in st.session_state:
-    st.session_state.schedule_example = None
-
+col1, col2, col3, _ = st.columns([1,1,1,5], gap = 'xxsmall')
 
 # Placeholder containers for ETL status
 extract = st.empty()
 transform = st.empty()
 loader = st.empty()
 
-# Function to check if uploaded files are valid
+# Function to check uploaded files against the local schema registry
 def validate_schema(stats_df: pd.DataFrame, schedule_df: pd.DataFrame):
-    if st.session_state.stats_example is not None and st.session_state.schedule_example is not None:
-        stats_missing = [c for c in stats_df.columns if c not in st.session_state.stats_example.columns]
-        schedule_missing = [c for c in schedule_df.columns if c not in st.session_state.schedule_example.columns]
-        print(schedule_missing)
-        print(stats_missing)
-        return (len(stats_missing) == 0 and len(schedule_missing) == 0)
+    reports = [schema_module.validate_frame(stats_df, "team_stats"),
+               schema_module.validate_frame(schedule_df, "schedule")]
+    problems = "\n".join(report.describe() for report in reports if report.describe())
+    if problems:
+        st.warning(problems)
+    return all(report.ok for report in reports)
+
+# Example file of a registered dataset, read from the repository
+@st.cache_data
+def load_example(name: str) -> pd.DataFrame:
+    return pd.read_csv(schema_module.example_path(name))
+
+# Summary of the metrics recorded since `since` (metrics_module.mark())
+def show_metrics(since: int):
+    entries = metrics_module.records(since)
+    if not entries:
+        return
+    summary = metrics_module.summary_frame(entries)
+    with st.expander(f"📊 Run metrics ({len(entries)} measured calls)", expanded = True):
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Slowest stage", summary['stage'].iloc[0], f"{summary['seconds'].iloc[0]:.2f}s", delta_color = "off")
+        c2.metric("Rows extracted", int(summary.loc[summary['step'] == 'extract', 'rows_out'].sum()))
+        c3.metric("Peak RSS", f"{summary['rss_peak_mb'].max():.0f} MB")
+        st.dataframe(summary, hide_index = True)
+        pool = pool_status()
+        if pool:
+            st.caption(f"Connection pool: {pool['checked_out']}/{pool['pool_size']} checked out, "
+                       f"{pool['checkouts']} checkouts, {pool['avg_wait_ms']:.1f} ms avg wait, "
+                       f"{pool['max_wait_ms']:.0f} ms max wait, {pool['timeouts']} timeouts")
+        if metrics_module.metrics_file():
+            st.caption(f"Every call is also written to {metrics_module.metrics_file()} as JSON lines")
 
 if st.session_state.updated is not None:
     st.write(f"Last updated: {st.session_state.last_update}")
@@ -46,35 +68,18 @@ with col1:
     # Button to load most current data from this year to database
     if st.button("Get Current Data"):
 
-        extract.success("📥 Extracting...")
-        # EXTRACT DATA
-        teams = get_teams()
-        stats = get_team_stats()
-        schedule = get_schedule(2025)
+        loader.warning("📥 Extracting, 🔄 transforming and 📤 loading...")
+        from src.pipeline import runner_module
+        run_mark = metrics_module.mark()
+        pipeline = runner_module.current_pipeline(load, engine = engine)
+        results = pipeline.run()
 
-        extract.empty()
-        transform.info("🔄 Transforming...")
-        # TRANSFORM DATA
-        team_table = fe_module.team_table(teams)
-        game_table = fe_module.game_table(schedule)
-        season_table = fe_module.season_table(stats)
-        fact_table = fe_module.facts_table(stats_df = stats, schedule_df = schedule)
-        cleaned_fact = cleaning.Cleaning.clean(fact_table)
-        cleaned_season = cleaning.Cleaning.clean(season_table)
-
-        transform.empty()
-        loader.warning("📤 Loading to Database...")
-        # LOAD DATA
-        load.create_(df = team_table, table_name = 'team', primary_key = 'team_id')
-        load.create_(df = cleaned_season, table_name = 'season', primary_key = 'season_id')
-        load.create_(df = game_table, table_name = 'game', primary_key = 'game_id')
-        load.create_(df = cleaned_fact, table_name = 'nfl_facts', primary_key = 'game_id')
-
-        load.insert_(df = team_table, table_name= 'team', primary_key = 'team_id')
-        load.insert_(df = cleaned_season, table_name= 'season', primary_key = 'season_id')
-        load.insert_(df = game_table, table_name= 'game', primary_key = 'game_id')
-        load.insert_(df = cleaned_fact, table_name= 'nfl_facts', primary_key = 'game_id')
         loader.success("✅ Data Successfully Loaded!")
+        # Only rows that changed since the last refresh are sent
+        counts = {name.removeprefix('load_'): results[name] for name in ('load_team', 'load_season', 'load_game', 'load_facts')}
+        st.caption(" | ".join(f"{name}: {c['sent']} written, {c['skipped']} unchanged" for name, c in counts.items()))
+        st.dataframe(pipeline.timing_frame())
+        show_metrics(run_mark)
 
         st.session_state.last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         st.session_state.updated = True
@@ -83,50 +88,39 @@ with col1:
 
 with col2:
     # Button to load all data available(1999-Last Year) to database
+    # Streaming loads each season while the next ones download, holding only a few at once
+    stream = st.checkbox("Stream seasons", value = True)
     if st.button("Load ALL Data"):
 
-        extract.success("📥 Extracting...")
-        teams = get_teams()
+        loader.warning("📥 Extracting, 🔄 transforming and 📤 loading...")
+        from src.pipeline import runner_module
+        run_mark = metrics_module.mark()
+        if stream:
+            pipeline = runner_module.StreamingBackfill(load, range(1999, 2025), engine = engine)
+        else:
+            pipeline = runner_module.backfill_pipeline(load, range(1999, 2025), engine = engine)
+        pipeline.run()
 
-        # EXTRACT DATA
-        dataframes = {}
-        for year in range(1999, 2025):
-            stats_df = get_team_stats(year)
-            schedule_df = get_schedule(year)
-            dataframes.setdefault(year, [stats_df, schedule_df])
+        loader.success("✅ Data Successfully Loaded!")
+        st.caption(f"Pipeline finished in {pipeline.wall_time:.1f}s "
+                   f"({sum(pipeline.timings.values()):.1f}s if run one after another)")
+        st.dataframe(pipeline.timing_frame())
+        show_metrics(run_mark)
+        st.session_state.last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        st.session_state.updated = True
 
-        extract.empty()
-        transform.info("🔄 Transforming...")
-        team_table = fe_module.team_table(teams)
-
-        # TRANSFORM DATA
-        tables = {}
-        for year, items in dataframes.items():
-            game_table = fe_module.game_table(items[1])
-            season_table = fe_module.season_table(items[0])
-            fact_table = fe_module.facts_table(stats_df = items[0], schedule_df = items[1])
-            cleaned_fact = cleaning.Cleaning.clean(fact_table)
-            cleaned_season = cleaning.Cleaning.clean(season_table)
-            tables.setdefault(year, [cleaned_season, game_table, cleaned_fact])
-
-        transform.empty()
-        loader.warning("📤 Loading to Database...")
-
-        # LOAD DATA
-        load.create_(df = team_table, table_name = 'team', primary_key = 'team_id')
-        load.insert_(df = team_table, table_name= 'team', primary_key = 'team_id')
-
-        load.create_(df = tables[1999][0], table_name = 'season', primary_key = 'season_id')
-        load.create_(df = tables[1999][1], table_name = 'game', primary_key = 'game_id')
-        load.create_(df = tables[1999][2], table_name = 'nfl_facts', primary_key = 'game_id')
-
-        for items in tables.values():
-            print(items[0])
-            load.insert_(df = items[0], table_name= 'season', primary_key = 'season_id')
-            load.insert_(df = items[1], table_name= 'game', primary_key = 'game_id')
-            load.insert_(df = items[2], table_name= 'nfl_facts', primary_key = 'game_id')
+with col3:
+    # Button to load play-by-play (1999-Last Year) one week at a time
+    if st.button("Load Play-by-Play"):
 
-        loader.success("✅ Data Successfully Loaded!")
+        loader.warning("📤 Loading play-by-play to Database...")
+        from src.pipeline import pbp_module
+        run_mark = metrics_module.mark()
+        rows = pbp_module.ingest_pbp(range(1999, 2025), load)
+
+        loader.success("✅ Play-by-Play Successfully Loaded!")
+        st.caption(f"Loaded {sum(rows.values())} plays from {len(rows)} seasons")
+        show_metrics(run_mark)
         st.session_state.last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         st.session_state.updated = True
 
@@ -134,11 +128,11 @@ with col2:
 # FILE UPLOADERS
 uploaded_stats = st.file_uploader(
     "Upload CSV or JSON obtained from nflfastR team_stats in the format below",
-    type=["csv", "json"]
+    type=["csv", "json", "jsonl", "ndjson"]
 )
 uploaded_schedule = st.file_uploader(
     "Upload CSV or JSON obtained from nflfastR schedule in the format below",
-    type=["csv", "json"]
+    type=["csv", "json", "jsonl", "ndjson"]
 )
 
 # Warning to make sure both files are uploaded
@@ -149,50 +143,57 @@ if uploaded_stats and uploaded_schedule:
 
     # Extract data from csv's and upload data to database
     extract.success("📥 Extracting...")
-    time.sleep(1)
 
     # EXTRACT DATA
-    stats = DataExtractor.extract_data(uploaded_stats, uploaded_stats.name)
+    # The schedule is small and read whole; team stats are streamed in
+    # bounded chunks straight through transform and load
     schedule = DataExtractor.extract_data(uploaded_schedule, uploaded_schedule.name)
-
-    if validate_schema(stats, schedule):
-        extract.empty()
-        transform.info("🔄 Transforming...")
-        time.sleep(1)
-
-        # TRANSFROM DATA
-        game_table = fe_module.game_table(schedule)
-        season_table = fe_module.season_table(stats)
-        fact_table = fe_module.facts_table(stats_df = stats, schedule_df = schedule)
-        cleaned_fact = cleaning.Cleaning.clean(fact_table)
-        cleaned_season = cleaning.Cleaning.clean(season_table)
-
-        transform.empty()
-        loader.warning("📤 Loading to Database...")
-        time.sleep(1)
-        
-        # LOAD DATA
-        load.create_(df = cleaned_season, table_name = 'season', primary_key = 'season_id')
-        load.create_(df = game_table, table_name = 'game', primary_key = 'game_id')
-        load.create_(df = cleaned_fact, table_name = 'nfl_facts', primary_key = 'game_id')
-
-        load.insert_(df = cleaned_season, table_name= 'season', primary_key = 'season_id')
-        load.insert_(df = game_table, table_name= 'game', primary_key = 'game_id')
-        load.insert_(df = cleaned_fact, table_name= 'nfl_facts', primary_key = 'game_id')
-
-        loader.success("✅ Data Successfully Loaded!")
+    stats_chunks = DataExtractor.extract_chunks(
+        uploaded_stats, uploaded_stats.name,
+        validate = lambda chunk: schedule is not None and validate_schema(chunk, schedule)
+    )
+
+    run_mark = metrics_module.mark()
+    try:
+        seasons = set()
+        rows = 0
+        for number, stats in enumerate(stats_chunks, start = 1):
+            extract.empty()
+            transform.info(f"🔄 Transforming chunk {number}...")
+
+            # TRANSFROM DATA
+            cleaned_season, game_table, cleaned_fact = fe_module.season_tables(stats, schedule)
+
+            transform.empty()
+            loader.warning(f"📤 Loading chunk {number} to Database...")
+
+            # LOAD DATA
+            if number == 1:
+                # the first chunk cannot bound later values, so no compact sizing
+                load.create_(df = cleaned_season, table_name = 'season', primary_key = 'season_id', compact = False)
+                load.create_(df = game_table, table_name = 'game', primary_key = 'game_id', compact = False)
+                load.create_(df = cleaned_fact, table_name = 'nfl_facts', primary_key = 'game_id', compact = False)
+                load.insert_(df = game_table, table_name= 'game', primary_key = 'game_id')
+
+            load.insert_(df = cleaned_season, table_name= 'season', primary_key = 'season_id')
+            load.insert_(df = cleaned_fact, table_name= 'nfl_facts', primary_key = 'game_id', batch_size = 1000)
+            seasons.update(cleaned_season['season_id'].tolist())
+            rows += len(stats)
+
+        load.refresh_season_summaries_(seasons)
+        load.refresh_season_store_(seasons)
+
+        loader.success(f"✅ Data Successfully Loaded! ({rows} rows)")
+        show_metrics(run_mark)
         st.session_state.last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         st.session_state.updated = True
-    elif validate_schema(stats, schedule) is not True:
+    except ValueError:
+        extract.empty()
         st.warning("Files not in correct format")
 
 # Example files for upload
 tab1, tab2 = st.tabs(["team_stats", "schedule"])
 with tab1:
-    df = pd.read_csv('https://raw.githubusercontent.com/DataTrainingFoundations/DataPipeLine/refs/heads/master/2024_team_stats_example.csv')
-    st.session_state.stats_example = df
-    st.dataframe(df)
+    st.dataframe(load_example("team_stats"))
 with tab2:
-    df = pd.read_csv('https://raw.githubusercontent.com/DataTrainingFoundations/DataPipeLine/refs/heads/master/2024_schedule_example.csv')
-    st.session_state.schedule_example = df
-    st.dataframe(df)
\ No newline at end of file
+    st.dataframe(load_example("schedule"))
\ No newline at end of file
@@ -1,43 +1,222 @@
-"""Module that handles database connection engine"""
+"""Module that manages the database connection pool.
+
+One engine, created on first use by get_engine(), is shared by every
+Streamlit session, page and pipeline worker in the process; nothing else
+should open its own connections. Its pool is configured from the
+environment:
+
+    DB_POOL_SIZE       connections kept open (default 5)
+    DB_MAX_OVERFLOW    extra connections allowed under load (default 10)
+    DB_POOL_TIMEOUT    seconds to wait for a free connection (default 30)
+    DB_POOL_RECYCLE    seconds before a connection is replaced (default 1800)
+    DB_POOL_PRE_PING   "0" to skip the liveness check on checkout (default on)
+
+DB_URL replaces the MySQL settings with any SQLAlchemy URL, such as a local
+DuckDB or SQLite file (see src/load/backend_module.py).
+
+pool_status() reports the pool's size, checked-out connections and how long
+checkouts waited. Check the settings with `python -m src.db.engine`.
+"""
 import os
+import time
 import logging
-from sqlalchemy import create_engine
+import threading
+from sqlalchemy import create_engine, event, text, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
 from dotenv import load_dotenv
+from src.logs.logging_module import install_sql_echo
 
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 ENGINE = None
+_ENGINE_LOCK = threading.Lock()
+
+# asyncio driver of each dialect that has one, for get_async_engine()
+ASYNC_DRIVERS = {"mysql": "aiomysql", "sqlite": "aiosqlite"}
+
+def database_url(driver: str = "pymysql") -> str:
+    """Builds the MySQL URL from the DB_* environment variables. DB_URL,
+    when set, is used as is: e.g. duckdb:///nfl.duckdb or sqlite:///nfl.db
+    runs the pipeline and dashboard on a local file with no server"""
+    if os.getenv("DB_URL"):
+        return os.getenv("DB_URL")
+    db_user = os.getenv("DB_USER")
+    db_password = os.getenv("DB_PASSWORD")
+    db_host = os.getenv("DB_HOST")
+    db_name = os.getenv("DB_NAME")
+    db_port = os.getenv("DB_PORT")
+
+    if not all([db_user, db_password, db_host, db_name]):
+        raise ValueError("Database credentials are not fully set in environment variables.")
+    host = f"{db_host}:{db_port}" if db_port else db_host
+    return f"mysql+{driver}://{db_user}:{db_password}@{host}/{db_name}"
+
+def pool_settings(**overrides) -> dict:
+    """Pool keyword arguments for create_engine, from the DB_POOL_* settings"""
+    settings = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") != "0"
+    }
+    settings.update(overrides)
+    return settings
+
+
+# -----------------------------
+# pool metrics
+# -----------------------------
+class PoolStats:
+    """Class: running totals for one pool's checkouts"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidated = 0
+
+    def waited(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+class MeteredQueuePool(QueuePool):
+    """Class: QueuePool that times every checkout. The wait includes
+    opening a new connection when the pool has room for one."""
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        began = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeout:
+            self.stats.waited(time.perf_counter() - began, timed_out = True)
+            logger.warning("Timed out waiting for a database connection | %s", self.status())
+            raise
+        self.stats.waited(time.perf_counter() - began)
+        return conn
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the totals
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def create_pooled_engine(url, **overrides):
+    """Creates an engine on a MeteredQueuePool configured by pool_settings();
+    keyword arguments override the settings or go to create_engine"""
+    engine = create_engine(url, poolclass = MeteredQueuePool, **pool_settings(**overrides))
+
+    @event.listens_for(engine, "connect")
+    def _connected(dbapi_conn, record):
+        engine.pool.stats.count("connects")
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidated(dbapi_conn, record, exc):
+        engine.pool.stats.count("invalidated")
+
+    # SQL_ECHO=1 (optionally with SQL_ECHO_SAMPLE) logs statements
+    install_sql_echo(engine)
+    return engine
+
+def pool_status(engine = None) -> dict:
+    """Size, checked-out connections and checkout wait totals of the
+    engine's pool (the shared engine by default)"""
+    engine = engine or ENGINE
+    if engine is None:
+        return {}
+    pool = engine.pool
+    status = {"pool_size": pool.size(), "checked_out": pool.checkedout(),
+              "idle": pool.checkedin(), "overflow": max(pool.overflow(), 0)}
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update({
+            "checkouts": stats.checkouts,
+            "avg_wait_ms": 1000 * stats.wait_seconds / stats.checkouts if stats.checkouts else 0.0,
+            "max_wait_ms": 1000 * stats.max_wait_seconds,
+            "timeouts": stats.timeouts,
+            "connects": stats.connects,
+            "invalidated": stats.invalidated
+        })
+    return status
+
+
+# -----------------------------
+# shared engines
+# -----------------------------
 def get_engine():
-    """Creates connection engine"""
+    """Creates the shared connection engine on first call and returns it"""
     global ENGINE
-    if ENGINE is None:
-        db_user = os.getenv("DB_USER")
-        db_password = os.getenv("DB_PASSWORD")
-        db_host = os.getenv("DB_HOST")
-        db_name = os.getenv("DB_NAME")
-
-        if not all([db_user, db_password, db_host, db_name]):
-            raise ValueError("Database credentials are not fully set in environment variables.")
-
-        # Assign to the global ENGINE
-        ENGINE = create_engine(
-            f"mysql+pymysql://{db_user}:{db_password}@{db_host}/{db_name}",
-            echo=True,           # optional: logs SQL statements
-            pool_pre_ping=True
-        )
-        print([db_user, db_host, db_name])
-        logger.info("Database engine created successfully.")
+    with _ENGINE_LOCK:
+        if ENGINE is not None:
+            return ENGINE
+        url = make_url(database_url())
+        # needed by DataLoader.load_file_ (LOAD DATA LOCAL INFILE)
+        connect_args = {"local_infile": os.getenv("DB_LOCAL_INFILE") == "1"} if url.get_backend_name() == "mysql" else {}
+        ENGINE = create_pooled_engine(url, connect_args=connect_args)
+        logger.info("Database engine created | user=%s | host=%s | database=%s | pool=%s",
+                    ENGINE.url.username, ENGINE.url.host, ENGINE.url.database, pool_settings())
     return ENGINE
 
+def async_url(url):
+    """The URL with its dialect's asyncio driver (ASYNC_DRIVERS), whatever
+    driver it names; raises ValueError for dialects without one (e.g. DuckDB)"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver for '{backend}' databases; load them without --async-load")
+    return url.set(drivername = f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+def get_async_engine(pool_size: int = None):
+    """Creates a new asyncio engine (aiomysql, or aiosqlite for SQLite) for
+    the same database, with the same pool settings. Its pooled connections
+    belong to the event loop that opens them, so dispose it before that
+    loop closes."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    url = async_url(database_url("aiomysql"))
+    overrides = {"pool_size": pool_size} if pool_size else {}
+    return create_async_engine(url, **pool_settings(**overrides))
+
+def check_connection(engine = None) -> bool:
+    """Runs SELECT 1 on a pooled connection"""
+    try:
+        with (engine or get_engine()).connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        logger.error("Database connection check failed: %s", e)
+        return False
+
 def shutdown():
     """Shuts down created connection engine"""
     global ENGINE
-    if ENGINE:
-        ENGINE.dispose()
-        logger.info("Database engine disposed.")
-        ENGINE = None
+    with _ENGINE_LOCK:
+        if ENGINE:
+            logger.info("Disposing database engine | %s", pool_status(ENGINE))
+            ENGINE.dispose()
+            ENGINE = None
+
 
-get_engine()
+if __name__ == "__main__":
+    print("Connection successful!" if check_connection() else "Connection failed, see records.log")
+    print(pool_status())
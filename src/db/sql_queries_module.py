@@ -0,0 +1,286 @@
+"""Module of the queries behind the dashboard's Season, Team and Game views.
+
+Each view is read from its summary table (season_summary,
+team_season_summary) when the loader has built it, and is otherwise
+aggregated in SQL when an engine is given, so only the view's rows leave
+the database. Without an engine the same aggregation runs in
+pandas on an in-memory nfl_facts frame. Both paths return the same columns.
+
+When a SeasonStore is passed, the seasons it holds are read from its
+Parquet partitions (only the view's columns) and aggregated in pandas; the
+seasons it does not hold still come from the database (or the in-memory
+frame), so a store holding only recent seasons never hides older ones. The
+summary tables are read before the store.
+"""
+import logging
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+logger = logging.getLogger(__name__)
+
+TOTALS = ["pass_attempts", "rush_attempts", "pass_yards", "rush_yards", "pass_tds", "rush_tds"]
+
+def _sums():
+    return ", ".join(f"SUM({c}) AS {c}" for c in TOTALS)
+
+def season_view_sql(start_year: int, end_year: int, exclude: list = None):
+    """Season totals between two seasons (inclusive), leaving out the
+    seasons in `exclude`"""
+    skip = "AND season_id NOT IN :exclude" if exclude else ""
+    sql = text(f"""SELECT season_id, {_sums()}
+                FROM nfl_facts
+                WHERE season_id BETWEEN :start_year AND :end_year {skip}
+                GROUP BY season_id
+                ORDER BY season_id""")
+    params = {"start_year": int(start_year), "end_year": int(end_year)}
+    if exclude:
+        sql = sql.bindparams(bindparam("exclude", expanding=True))
+        params["exclude"] = [int(season) for season in exclude]
+    return sql, params
+
+def team_view_sql(year: int):
+    """Per-team totals, record and playoff flags for one season"""
+    sql = text(f"""SELECT team_id, {_sums()},
+                    SUM(CASE WHEN result = 'W' THEN 1 ELSE 0 END) AS wins,
+                    SUM(CASE WHEN result = 'L' THEN 1 ELSE 0 END) AS losses,
+                    SUM(CASE WHEN result = 'T' THEN 1 ELSE 0 END) AS ties,
+                    MAX(CASE WHEN game_type <> 'REG' THEN 1 ELSE 0 END) AS made_playoffs,
+                    MAX(CASE WHEN game_type = 'SB' THEN 1 ELSE 0 END) AS made_superbowl
+                FROM nfl_facts
+                WHERE season_id = :year
+                GROUP BY team_id
+                ORDER BY team_id""")
+    return sql, {"year": int(year)}
+
+def game_view_sql(year: int, week: int):
+    """Every team's game in one week"""
+    sql = text("""SELECT *
+                FROM nfl_facts
+                WHERE season_id = :year AND week = :week""")
+    return sql, {"year": int(year), "week": int(week)}
+
+def seasons_sql():
+    """Seasons present in nfl_facts"""
+    return text("SELECT DISTINCT season_id FROM nfl_facts ORDER BY season_id"), {}
+
+def season_facts_sql(year: int):
+    """Every fact row of one season"""
+    return text("SELECT * FROM nfl_facts WHERE season_id = :year"), {"year": int(year)}
+
+def read_season_facts(engine, year: int) -> pd.DataFrame:
+    return _read(engine, season_facts_sql(year))
+
+def season_games_sql(year: int):
+    """Every game row of one season"""
+    return text("SELECT * FROM game WHERE season_id = :year"), {"year": int(year)}
+
+def read_season_games(engine, year: int) -> pd.DataFrame:
+    return _read(engine, season_games_sql(year))
+
+PREVIEW_ROWS = 1000
+
+def preview_sql(table_name: str, page: int, rows: int = PREVIEW_ROWS):
+    """One page of a table's rows, for the dashboard's Data Preview tab"""
+    sql = text(f"SELECT * FROM {table_name} LIMIT :rows OFFSET :offset")
+    return sql, {"rows": int(rows), "offset": int(page) * int(rows)}
+
+def count_sql(table_name: str):
+    """Number of rows in a table"""
+    return text(f"SELECT COUNT(*) AS row_count FROM {table_name}"), {}
+
+def read_preview(engine, table_name: str, page: int = 0, rows: int = PREVIEW_ROWS) -> pd.DataFrame:
+    return _read(engine, preview_sql(table_name, page, rows))
+
+def count_rows(engine, table_name: str) -> int:
+    return int(_read(engine, count_sql(table_name))["row_count"].iloc[0])
+
+def _read(engine, query):
+    sql, params = query
+    with engine.connect() as connection:
+        return pd.read_sql(sql, connection, params=params)
+
+
+# -----------------------------
+# pandas fallbacks, same shape as the SQL results
+# -----------------------------
+def season_totals(df: pd.DataFrame, start_year: int, end_year: int) -> pd.DataFrame:
+    filtered = df[(df["season_id"] >= start_year) & (df["season_id"] <= end_year)]
+    return filtered.groupby("season_id", as_index=False)[TOTALS].sum()
+
+def team_totals(df: pd.DataFrame, year: int = None) -> pd.DataFrame:
+    """Per-team totals for one season, or per season and team when year is None"""
+    filtered = df if year is None else df[df["season_id"] == year]
+    keys = ["season_id", "team_id"] if year is None else ["team_id"]
+    flagged = filtered.assign(
+        wins=filtered["result"].eq("W"),
+        losses=filtered["result"].eq("L"),
+        ties=filtered["result"].eq("T"),
+        made_playoffs=filtered["game_type"].ne("REG"),
+        made_superbowl=filtered["game_type"].eq("SB")
+    )
+    return (
+        flagged.groupby(keys, as_index=False)
+        .agg(**{c: (c, "sum") for c in TOTALS + ["wins", "losses", "ties"]},
+             made_playoffs=("made_playoffs", "max"),
+             made_superbowl=("made_superbowl", "max"))
+    )
+
+
+# -----------------------------
+# derived columns, computed on the (small) aggregated frames
+# -----------------------------
+def finish_season_view(season_df: pd.DataFrame) -> pd.DataFrame:
+    season_df = season_df.copy()
+    season_df["avg_pass_pct"] = (
+        season_df["pass_attempts"] /
+        (season_df["pass_attempts"] + season_df["rush_attempts"])
+    )
+    season_df["avg_rush_pct"] = 1 - season_df["avg_pass_pct"]
+    season_df["avg_pass_pct"] *= 100
+    season_df["avg_rush_pct"] *= 100
+    return season_df.dropna()
+
+def finish_team_view(team_df: pd.DataFrame) -> pd.DataFrame:
+    team_df = team_df.copy()
+    team_df["made_playoffs"] = team_df["made_playoffs"].astype(bool)
+    team_df["made_superbowl"] = team_df["made_superbowl"].astype(bool)
+    team_df["season_status"] = np.select(
+        [team_df["made_superbowl"], team_df["made_playoffs"]],
+        ["Super Bowl", "Playoffs"],
+        default="Regular Season"
+    )
+
+    plays = team_df['pass_attempts'] + team_df['rush_attempts']
+    tds = team_df['pass_tds'] + team_df['rush_tds']
+    team_df['pass_percentage'] = (team_df['pass_attempts'] / plays) * 100
+    team_df['rush_percentage'] = (team_df['rush_attempts'] / plays) * 100
+    team_df['pass_efficiency'] = team_df['pass_yards'] / team_df['pass_attempts']
+    team_df['rush_efficiency'] = team_df['rush_yards'] / team_df['rush_attempts']
+    team_df['pass_td_percentage'] = (team_df['pass_tds'] / tds) * 100
+    team_df['rush_td_percentage'] = (team_df['rush_tds'] / tds) * 100
+
+    games = team_df["wins"] + team_df["losses"] + team_df["ties"]
+    team_df["win_pct"] = np.where(
+        games > 0, (team_df["wins"] + 0.5 * team_df["ties"]) / games.where(games > 0, 1) * 100, 0
+    )
+    return team_df.dropna()
+
+
+# -----------------------------
+# summary tables, built by the loader and read directly by the views
+# -----------------------------
+SUMMARY_ERRORS = (ProgrammingError, OperationalError)
+
+def row_counts(engine, table_names) -> tuple:
+    """Row count of each table, None for a table that does not exist. Any
+    process's load that adds or removes rows changes it, unlike the
+    loader's in-process table_version"""
+    counts = []
+    for table_name in table_names:
+        try:
+            counts.append(count_rows(engine, table_name))
+        except SUMMARY_ERRORS:
+            counts.append(None)
+    return tuple(counts)
+
+def season_summary(facts: pd.DataFrame) -> pd.DataFrame:
+    """season_summary rows for every season in the facts frame"""
+    totals = facts.groupby("season_id", as_index=False)[TOTALS].sum()
+    return finish_season_view(totals)
+
+def team_season_summary(facts: pd.DataFrame) -> pd.DataFrame:
+    """team_season_summary rows for every season and team in the facts frame,
+    keyed by summary_id = '<season>_<team>'"""
+    summary = finish_team_view(team_totals(facts))
+    summary.insert(0, "summary_id", summary["season_id"].astype(str).str.cat(summary["team_id"], sep="_"))
+    return summary
+
+def season_summary_sql(start_year: int, end_year: int):
+    sql = text("""SELECT *
+                FROM season_summary
+                WHERE season_id BETWEEN :start_year AND :end_year
+                ORDER BY season_id""")
+    return sql, {"start_year": int(start_year), "end_year": int(end_year)}
+
+def team_season_summary_sql(year: int):
+    sql = text("""SELECT *
+                FROM team_season_summary
+                WHERE season_id = :year
+                ORDER BY team_id""")
+    return sql, {"year": int(year)}
+
+
+# -----------------------------
+# views used by Home.py
+# -----------------------------
+def _stored(store, first: int, last: int) -> list:
+    """Seasons between first and last (inclusive) held by the store"""
+    if store is None or not store.enabled:
+        return []
+    return [season for season in store.seasons("nfl_facts") if first <= season <= last]
+
+def season_view(start_year: int, end_year: int, engine=None, facts: pd.DataFrame = None, store=None) -> pd.DataFrame:
+    """Season totals and pass/rush split for a range of seasons"""
+    if engine is not None:
+        try:
+            return _read(engine, season_summary_sql(start_year, end_year))
+        except SUMMARY_ERRORS:
+            logger.info("season_summary not available, aggregating nfl_facts")
+
+    stored = _stored(store, start_year, end_year)
+    parts = []
+    if stored:
+        read = store.read("nfl_facts", ["season_id"] + TOTALS, seasons=(start_year, end_year))
+        parts.append(season_totals(read, start_year, end_year))
+    if len(stored) < end_year - start_year + 1:
+        if engine is not None:
+            parts.append(_read(engine, season_view_sql(start_year, end_year, exclude=stored)))
+        elif facts is not None:
+            parts.append(season_totals(facts[~facts["season_id"].isin(stored)], start_year, end_year))
+    totals = (pd.concat(parts, ignore_index=True).sort_values("season_id", ignore_index=True) if parts
+              else pd.DataFrame(columns=["season_id"] + TOTALS))
+    return finish_season_view(totals)
+
+def team_view(year: int, engine=None, facts: pd.DataFrame = None, store=None) -> pd.DataFrame:
+    """Team totals, efficiencies, win % and season status for one season"""
+    if engine is not None:
+        try:
+            summary = _read(engine, team_season_summary_sql(year))
+            summary = summary.drop(columns=["summary_id", "season_id"])
+            return summary.astype({"made_playoffs": bool, "made_superbowl": bool})
+        except SUMMARY_ERRORS:
+            logger.info("team_season_summary not available, aggregating nfl_facts")
+
+    if _stored(store, year, year):
+        facts = store.read("nfl_facts", ["season_id", "team_id", "result", "game_type"] + TOTALS, seasons=(year, year))
+        totals = team_totals(facts, year)
+    elif engine is not None:
+        totals = _read(engine, team_view_sql(year))
+    else:
+        totals = team_totals(facts, year)
+    return finish_team_view(totals)
+
+def game_view(year: int, week: int, engine=None, facts: pd.DataFrame = None, store=None) -> pd.DataFrame:
+    """All fact rows for one week"""
+    if _stored(store, year, year):
+        from pyarrow import dataset as ds
+        games = store.read("nfl_facts", seasons=(year, year), where=ds.field("week") == int(week))
+    elif engine is not None:
+        games = _read(engine, game_view_sql(year, week))
+    else:
+        games = facts[(facts["season_id"] == year) & (facts["week"] == week)].copy()
+    return games.dropna()
+
+def seasons(engine=None, facts: pd.DataFrame = None, store=None) -> list:
+    """Sorted list of seasons available for the views: those in the
+    database (or the in-memory frame) and in the store"""
+    found = set()
+    if store is not None and store.enabled:
+        found.update(store.seasons("nfl_facts"))
+    if engine is not None:
+        found.update(_read(engine, seasons_sql())["season_id"])
+    elif facts is not None:
+        found.update(facts["season_id"].unique())
+    return sorted(int(s) for s in found)
@@ -0,0 +1,165 @@
+"""Module for the on-disk Parquet cache of nflreadpy extracts"""
+import os
+import time
+import logging
+import tempfile
+import polars as pl
+
+logger = logging.getLogger(__name__)
+
+
+class ParquetCache:
+    """Class: stores each (dataset, season) extract as one Parquet file.
+
+    Finished seasons never expire. The current season (and extracts that
+    are not tied to a season, like teams) are refreshed once they are older
+    than `ttl` seconds. When the cache grows past `max_bytes` the least
+    recently read files are evicted first."""
+
+    def __init__(self, cache_dir: str, ttl: float = 6 * 3600,
+                 max_bytes: int = 1024 ** 3, current_season=None, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.current_season = current_season
+        self.enabled = enabled
+
+    @classmethod
+    def from_env(cls, current_season=None):
+        """Builds a cache configured by the NFL_CACHE_* environment variables"""
+        return cls(
+            cache_dir = os.getenv("NFL_CACHE_DIR", os.path.join(".cache", "nflreadpy")),
+            ttl = float(os.getenv("NFL_CACHE_TTL", 6 * 3600)),
+            max_bytes = int(float(os.getenv("NFL_CACHE_MAX_MB", 1024)) * 1024 ** 2),
+            current_season = current_season,
+            enabled = os.getenv("NFL_CACHE", "1") != "0"
+        )
+
+    def path(self, dataset: str, season=None) -> str:
+        """Returns the file path for a (dataset, season) entry"""
+        name = "all" if season is None else str(season)
+        return os.path.join(self.cache_dir, dataset, f"{name}.parquet")
+
+    def is_closed(self, season) -> bool:
+        """A season is closed once a later season has started"""
+        if season is None or self.current_season is None:
+            return False
+        current = self.current_season() if callable(self.current_season) else self.current_season
+        return season < current
+
+    def modified(self, dataset: str, season=None):
+        """Returns the entry's modification time, or None if missing or expired"""
+        try:
+            modified = os.path.getmtime(self.path(dataset, season))
+        except OSError:
+            return None
+
+        if not self.is_closed(season) and time.time() - modified > self.ttl:
+            logger.info("Cache expired | dataset=%s | season=%s", dataset, season)
+            return None
+        return modified
+
+    def get(self, dataset: str, season=None):
+        """Returns the cached frame, or None if missing or expired"""
+        if not self.enabled:
+            return None
+
+        path = self.path(dataset, season)
+        modified = self.modified(dataset, season)
+        if modified is None:
+            return None
+
+        try:
+            frame = pl.read_parquet(path)
+        except (OSError, pl.exceptions.PolarsError) as e:
+            logger.warning("Unreadable cache file '%s': %s", path, e)
+            return None
+
+        # Access time drives eviction, modification time drives expiry
+        os.utime(path, (time.time(), modified))
+        logger.debug("Cache hit | dataset=%s | season=%s", dataset, season)
+        return frame
+
+    def put(self, dataset: str, season, frame: pl.DataFrame):
+        """Writes a frame to the cache and evicts old entries if over budget"""
+        if not self.enabled:
+            return
+
+        path = self.path(dataset, season)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+
+        # Write to a temp file first so concurrent readers never see half a file
+        fd, tmp_path = tempfile.mkstemp(dir = os.path.dirname(path), suffix = ".tmp")
+        os.close(fd)
+        try:
+            frame.write_parquet(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        logger.debug("Cache store | dataset=%s | season=%s", dataset, season)
+        self.evict()
+
+    def fetch(self, dataset: str, season, loader):
+        """Returns the cached frame, calling `loader()` and caching
+        its result on a miss"""
+        frame = self.get(dataset, season)
+        if frame is None:
+            frame = loader()
+            self.put(dataset, season, frame)
+        return frame
+
+    def scan(self, dataset: str, season, loader) -> pl.LazyFrame:
+        """Returns a LazyFrame over the cached Parquet file, downloading it
+        first on a miss, so callers can read it in filtered slices instead
+        of holding the whole extract in memory"""
+        if not self.enabled:
+            return loader().lazy()
+
+        path = self.path(dataset, season)
+        modified = self.modified(dataset, season)
+        if modified is None:
+            self.put(dataset, season, loader())
+        else:
+            os.utime(path, (time.time(), modified))
+        return pl.scan_parquet(path)
+
+    def entries(self):
+        """Lists (path, size, last access) for every cached file"""
+        found = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".parquet"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                found.append((path, stat.st_size, stat.st_atime))
+        return found
+
+    def evict(self):
+        """Removes least recently read files until the cache fits max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+
+        for path, size, _ in sorted(entries, key = lambda e: e[2]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                logger.info("Cache evict | path=%s | bytes=%s", path, size)
+            except OSError:
+                continue
+
+    def clear(self):
+        """Removes every cached file"""
+        for path, _, _ in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                continue
@@ -1,13 +1,12 @@
 import os
+import json
 import logging
 import pandas as pd
 from functools import partial
 from concurrent.futures import ProcessPoolExecutor
+from src.metrics.metrics_module import measure
 
-logging.basicConfig(filename = "records.log",
-                    level = logging.DEBUG,
-                    format = "%(asctime)s - %(levelname)s: %(message)s",
-                    filemode = 'a')
+logger = logging.getLogger(__name__)
 
 class DataExtractor:
 
@@ -15,6 +14,7 @@ class DataExtractor:
         pass
 
     @staticmethod
+    @measure(step = "extract")
     def extract_data(file_obj, filename):
         """Function to extract data from csv or json"""
         if filename.endswith(".csv"):
@@ -26,18 +26,66 @@ class DataExtractor:
                 print(f"Error reading CSV file: {e}")
                 return None
             finally:
-                logging.debug("%s finished extracting", filename)
-        elif filename.endswith(".json"):
+                logger.debug("%s finished extracting", filename)
+        elif filename.endswith((".json", ".jsonl", ".ndjson")):
             try:
                 # Returns data as a data frame object (requires pandas)
-                data = pd.read_json(file_obj) 
+                data = pd.read_json(file_obj, lines = not filename.endswith(".json")) 
                 return data
             except ValueError as e:
                 print(f"Error reading JSON file: {e}")
                 return None
             finally:
-                logging.debug("%s finished extracting", filename)
+                logger.debug("%s finished extracting", filename)
         else:
             print('File not in json or csv format')
             return None
 
+    @staticmethod
+    def _is_json_lines(file_obj):
+        """Checks whether a .json file holds one JSON object per line"""
+        if isinstance(file_obj, (str, os.PathLike)):
+            with open(file_obj, "rb") as f:
+                first = f.readline()
+        else:
+            position = file_obj.tell()
+            first = file_obj.readline()
+            file_obj.seek(position)
+        try:
+            record = json.loads(first)
+        except ValueError:
+            return False
+        # A record is a flat object; pandas' default orient nests dicts
+        return isinstance(record, dict) and not any(isinstance(v, (dict, list)) for v in record.values())
+
+    @staticmethod
+    def extract_chunks(file_obj, filename, chunksize = 50_000, validate = None):
+        """Generator that reads a csv or newline-delimited json file in
+        DataFrames of at most `chunksize` rows, so memory stays bounded
+        however large the file is.
+
+        `validate(chunk) -> bool` is called on the first chunk only; a False
+        result raises ValueError before anything is yielded.
+        A .json file that is not newline-delimited is read whole and then
+        yielded in slices."""
+        if filename.endswith(".csv"):
+            reader = pd.read_csv(file_obj, chunksize = chunksize)
+        elif filename.endswith((".jsonl", ".ndjson")) or (
+                filename.endswith(".json") and DataExtractor._is_json_lines(file_obj)):
+            reader = pd.read_json(file_obj, lines = True, chunksize = chunksize)
+        elif filename.endswith(".json"):
+            data = pd.read_json(file_obj)
+            reader = (data.iloc[i:i + chunksize] for i in range(0, len(data), chunksize))
+        else:
+            raise ValueError("File not in json or csv format")
+
+        rows = 0
+        for number, chunk in enumerate(reader, start = 1):
+            if number == 1 and validate is not None and not validate(chunk):
+                logger.warning("%s failed schema validation", filename)
+                raise ValueError(f"{filename} does not match the expected schema")
+            rows += len(chunk)
+            yield chunk
+
+        logger.debug("%s finished extracting | chunks=%s | rows=%s", filename, number if rows else 0, rows)
+
@@ -1,39 +1,91 @@
 import os
+import time
 import logging
-import nflreadpy as nfl
 import pandas as pd
+from src.extract.cache_module import ParquetCache
+from src.metrics.metrics_module import measure
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 
-logging.basicConfig(filename = "records.log",
-                    level = logging.DEBUG,
-                    format = "%(asctime)s - %(levelname)s: %(message)s",
-                    filemode = 'a')
+logger = logging.getLogger(__name__)
 
-def get_pbp(year):
-    pbp = nfl.load_pbp(year)
-    logging.debug("%s finished extracting play-by-play")
-    return pbp.to_pandas()
+def nfl():
+    """nflreadpy, imported on first use: it pulls in pydantic and an HTTP
+    stack that importing this module should not pay for"""
+    import nflreadpy
+    return nflreadpy
 
-def get_team_stats(year = None):
+CACHE = ParquetCache.from_env(current_season = lambda: nfl().get_current_season())
+
+@measure(step = "extract")
+def get_pbp(year, as_polars = False):
+    pbp = CACHE.fetch("pbp", year, lambda: nfl().load_pbp(year))
+    logger.debug("%s finished extracting play-by-play", year)
+    return pbp if as_polars else pbp.to_pandas()
+
+def scan_pbp(year):
+    """Lazy play-by-play for one season, read from the on-disk cache"""
+    pbp = CACHE.scan("pbp", year, lambda: nfl().load_pbp(year))
+    logger.debug("%s play-by-play ready to scan", year)
+    return pbp
+
+@measure(step = "extract")
+def get_team_stats(year = None, as_polars = False):
     if year is None:
-        stats = nfl.load_team_stats()
-    else:
-        stats = nfl.load_team_stats(year)
+        year = nfl().get_current_season()
+    stats = CACHE.fetch("team_stats", year, lambda: nfl().load_team_stats(year))
     
-    logging.debug("%s finished extracting {year} team stats")
-    return stats.to_pandas()
+    logger.debug("%s finished extracting team stats", year)
+    return stats if as_polars else stats.to_pandas()
 
-def get_schedule(year = None):
+@measure(step = "extract")
+def get_schedule(year = None, as_polars = False):
     if year is None:
-        team_schedule = nfl.load_schedules()
+        team_schedule = CACHE.fetch("schedule", None, nfl().load_schedules)
+    else:
+        team_schedule = CACHE.fetch("schedule", year, lambda: nfl().load_schedules(year))
+
+    logger.debug("%s finished extracting schedule", "all seasons" if year is None else year)
+    return team_schedule if as_polars else team_schedule.to_pandas()
+
+@measure(step = "extract")
+def get_teams(as_polars = False):
+    teams = CACHE.fetch("teams", None, nfl().load_teams)
+    if as_polars:
+        current_teams = teams.unique(subset = 'team_id', keep = 'first', maintain_order = True)
     else:
-        team_schedule = nfl.load_schedules(year)
+        current_teams = teams.to_pandas().drop_duplicates(subset = 'team_id', keep = 'first')
+
+    logger.debug("Finished extracting teams | rows=%s", len(current_teams))
+    return current_teams
+
+def get_season(year, as_polars = False):
+    """Extracts team stats and schedule for one season.
+    Returns (year, stats, schedule, seconds taken)"""
+    start = time.perf_counter()
+    stats = get_team_stats(year, as_polars)
+    schedule = get_schedule(year, as_polars)
+    elapsed = time.perf_counter() - start
+
+    logger.debug("%s season extracted in %.2fs", year, elapsed)
+    return year, stats, schedule, elapsed
 
-    logging.debug("%s finished extracting {year} schedule")
-    return team_schedule.to_pandas()
+def get_seasons(years, max_workers = 8, use_processes = False, as_polars = False):
+    """Extracts team stats and schedules for many seasons concurrently.
+    Yields (year, stats, schedule, seconds taken) as each season completes,
+    so results arrive in completion order rather than year order.
+    as_polars keeps the nflreadpy Polars frames instead of converting to pandas."""
+    years = list(years)
+    pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    start = time.perf_counter()
+    season_time = 0.0
 
-def get_teams():
-    teams = nfl.load_teams().to_pandas()
-    current_teams = teams.drop_duplicates(subset = 'team_id', keep = 'first')
+    with pool(max_workers = max_workers) as executor:
+        futures = [executor.submit(get_season, year, as_polars) for year in years]
+        for future in as_completed(futures):
+            result = future.result()
+            season_time += result[3]
+            yield result
 
-    logging.debug("%s finished extracting teams")
-    return current_teams
\ No newline at end of file
+    wall_time = time.perf_counter() - start
+    logger.info("Extracted %s seasons in %.2fs (%.2fs sequential, %.1fx speedup)",
+                 len(years), wall_time, season_time, season_time / wall_time if wall_time else 0)
@@ -0,0 +1,110 @@
+"""Module for loading DataFrames over an asyncio SQLAlchemy engine.
+
+AsyncDataLoader sends the same INSERT batches as
+DataLoader.insert_(batch_size=...), but every batch of every table is its
+own task on the connection pool, so statements that wait on the database
+overlap instead of running back to back. Tables are created beforehand
+with DataLoader.create_.
+"""
+import time
+import asyncio
+import logging
+import pandas as pd
+from src.load.load_module import DataLoader, bump_table_version
+from src.metrics.metrics_module import measure
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDataLoader:
+    """Class: awaitable inserts over a pool of `max_concurrency` connections.
+
+    Pass an AsyncEngine (e.g. sqlite+aiosqlite for tests); by default one is
+    built from the DB_* settings with get_async_engine(). Pooled connections
+    belong to the event loop that opened them, so await dispose() before
+    the loop closes."""
+
+    def __init__(self, engine=None, max_concurrency: int = 4):
+        if engine is None:
+            from src.db.engine import get_async_engine
+            engine = get_async_engine(pool_size = max_concurrency)
+        self.engine = engine
+        self.max_concurrency = max_concurrency
+
+    @property
+    def dialect(self) -> str:
+        return self.engine.dialect.name
+
+    @property
+    def paramstyle(self) -> str:
+        return self.engine.dialect.paramstyle
+
+    async def _send(self, limit: asyncio.Semaphore, table_name: str, batch_num: int, count: int, sql: str, rows: list):
+        async with limit:
+            began = time.perf_counter()
+            try:
+                async with self.engine.begin() as conn:
+                    await conn.exec_driver_sql(sql, rows)
+            except Exception as e:
+                logger.error("Failed to insert batch %s into '%s': '%s'", batch_num, table_name, e)
+                raise
+            seconds = time.perf_counter() - began
+
+        bump_table_version(table_name)
+        rate = count / seconds if seconds else float("inf")
+        logger.info("Inserted batch %s into '%s' | rows=%s | %.0f rows/s", batch_num, table_name, count, rate)
+        return {"table": table_name, "batch": batch_num, "rows": count, "seconds": seconds, "rows_per_sec": rate}
+
+    @measure(step = "load", detail = "table_name")
+    async def insert_(self, df: pd.DataFrame, table_name: str, primary_key: str,
+                      batch_size: int = 1000, limit: asyncio.Semaphore = None):
+        """Inserts (upserts when primary_key is given) the DataFrame as
+        concurrent batches of batch_size rows, each in its own transaction.
+        Returns per-batch stats."""
+        if df is None or df.empty:
+            logger.error("Cannot insert into '%s': DataFrame is empty or None", table_name)
+            raise ValueError("DataFrame is empty or None")
+
+        limit = limit or asyncio.Semaphore(self.max_concurrency)
+        batches = DataLoader._batches(df, table_name, primary_key, batch_size, self.dialect, self.paramstyle)
+        stats = await asyncio.gather(*(
+            self._send(limit, table_name, batch_num, count, sql, rows)
+            for batch_num, _, count, sql, rows in batches
+        ))
+        logger.info("Inserted %d rows into '%s' in %d batches.", len(df), table_name, len(stats))
+        return list(stats)
+
+    @measure(step = "load")
+    async def load_tables_(self, tables: dict, batch_size: int = 1000):
+        """Inserts several tables at once, sharing one concurrency limit.
+
+        Parameters:
+            tables (dict): table name -> (DataFrame or list of DataFrames, primary key),
+                deduplicated on the primary key like DataLoader.load_tables_.
+            batch_size (int): rows per batch.
+
+        Returns:
+            dict: table name -> number of rows written
+        """
+        limit = asyncio.Semaphore(self.max_concurrency)
+        frames_by_table = {}
+        for table_name, (frames, primary_key) in tables.items():
+            if isinstance(frames, pd.DataFrame):
+                frames = [frames]
+            frames = [f for f in frames if f is not None and not f.empty]
+            if not frames:
+                logger.warning("No rows to load into '%s'", table_name)
+                continue
+            df = pd.concat(frames, ignore_index = True)
+            if primary_key in df.columns:
+                df = df.drop_duplicates(subset = primary_key, keep = "last")
+            frames_by_table[table_name] = (df, primary_key)
+
+        await asyncio.gather(*(
+            self.insert_(df, table_name, primary_key, batch_size, limit)
+            for table_name, (df, primary_key) in frames_by_table.items()
+        ))
+        return {name: len(frames_by_table[name][0]) if name in frames_by_table else 0 for name in tables}
+
+    async def dispose(self):
+        await self.engine.dispose()
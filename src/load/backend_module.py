@@ -0,0 +1,146 @@
+"""Module of the SQL backends DataLoader can write to.
+
+A backend holds everything that differs between databases: identifier
+quoting, the auto-increment key, whether ENUM columns exist, the upsert
+clause and an optional bulk path. DataLoader picks one from its engine's
+dialect name with backend_for(), so the same pipeline loads into
+
+    mysql   the server database (default)
+    sqlite  a local file, e.g. DB_URL=sqlite:///nfl.db
+    duckdb  a local file, e.g. DB_URL=duckdb:///nfl.duckdb (needs duckdb and
+            duckdb-engine); DataFrames are loaded through Arrow, with no
+            per-row Python conversion
+
+Register another backend by adding an instance to BACKENDS.
+"""
+import logging
+import pandas as pd
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+
+# Positional placeholder for the n-th (1-based) bound value in each DBAPI paramstyle
+PLACEHOLDERS = {
+    "qmark": lambda n: "?",
+    "numeric": lambda n: f":{n}",
+    "numeric_dollar": lambda n: f"${n}",
+    "format": lambda n: "%s",
+    "pyformat": lambda n: "%s"
+}
+
+
+class Backend:
+    """Class: MySQL, and the base the embedded backends override"""
+    name = "mysql"
+    enums = True
+    # most parameters one statement may bind
+    max_params = 65535
+
+    def quote(self, name: str) -> str:
+        return f"`{name}`"
+
+    def serial_key(self, table_name: str, column: str) -> tuple:
+        """(statements to run first, column definition) for an
+        auto-incrementing primary key; `column` is already quoted if needed"""
+        return [], f"{column} SERIAL PRIMARY KEY"
+
+    def upsert(self, columns: list, primary_key: str) -> str:
+        """Clause appended to an INSERT to update rows whose key exists"""
+        update = ", ".join(f"{self.quote(c)}=VALUES({self.quote(c)})" for c in columns if c != primary_key)
+        return f"ON DUPLICATE KEY UPDATE {update}"
+
+    def insert_sql(self, table_name: str, columns: list, primary_key: str, values: str) -> str:
+        """INSERT of the given VALUES clause (or SELECT), as an upsert when
+        a primary key is given"""
+        sql = f"INSERT INTO {table_name} ({', '.join(self.quote(c) for c in columns)}) {values}"
+        if primary_key is None:
+            return sql + ";"
+        return f"{sql} {self.upsert(columns, primary_key)};"
+
+    def placeholders(self, count: int, paramstyle: str = "format") -> str:
+        """'(%s, %s, ...)' row of `count` positional placeholders in the
+        driver's paramstyle"""
+        placeholder = PLACEHOLDERS.get(paramstyle, PLACEHOLDERS["format"])
+        return "(" + ", ".join(placeholder(n) for n in range(1, count + 1)) + ")"
+
+    def batch_rows(self, columns: int, requested: int) -> int:
+        """Rows per batch: `requested`, capped so a multi-row statement of
+        `columns` columns stays within max_params"""
+        return max(1, min(requested, self.max_params // max(columns, 1)))
+
+    def primary_key(self, engine, table_name: str):
+        """The table's primary key column, or None"""
+        columns = inspect(engine).get_pk_constraint(table_name)["constrained_columns"]
+        return columns[0] if columns else None
+
+    def bulk_insert(self, engine, df: pd.DataFrame, table_name: str, primary_key: str):
+        """Writes the whole frame in one pass and returns True, or returns
+        False when the backend has no bulk path (rows are then bound as
+        parameters)"""
+        return False
+
+
+class SQLiteBackend(Backend):
+    """Class: SQLite file database"""
+    name = "sqlite"
+    enums = False
+    # SQLITE_MAX_VARIABLE_NUMBER of stock builds since 3.32
+    max_params = 32766
+
+    def serial_key(self, table_name: str, column: str) -> tuple:
+        return [], f"{column} INTEGER PRIMARY KEY"
+
+    def upsert(self, columns: list, primary_key: str) -> str:
+        update = ", ".join(f"{self.quote(c)}=excluded.{self.quote(c)}" for c in columns if c != primary_key)
+        return f"ON CONFLICT({self.quote(primary_key)}) " + (f"DO UPDATE SET {update}" if update else "DO NOTHING")
+
+
+class DuckDBBackend(SQLiteBackend):
+    """Class: DuckDB file database, loaded through Arrow"""
+    name = "duckdb"
+
+    def quote(self, name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+
+    def serial_key(self, table_name: str, column: str) -> tuple:
+        sequence = f"{table_name}_key_seq"
+        return ([f"CREATE SEQUENCE IF NOT EXISTS {sequence};"],
+                f"{column} BIGINT PRIMARY KEY DEFAULT nextval('{sequence}')")
+
+    def primary_key(self, engine, table_name: str):
+        # duckdb-engine's inspector does not report primary keys
+        sql = text("""SELECT constraint_column_names FROM duckdb_constraints()
+                    WHERE table_name = :table_name AND constraint_type = 'PRIMARY KEY'""")
+        with engine.connect() as conn:
+            columns = conn.execute(sql, {"table_name": table_name}).scalar()
+        return columns[0] if columns else None
+
+    def bulk_insert(self, engine, df: pd.DataFrame, table_name: str, primary_key: str):
+        """Registers the frame as an Arrow table on the pooled connection
+        and upserts it with one INSERT ... SELECT"""
+        import pyarrow as pa
+        try:
+            arrow = pa.Table.from_pandas(df, preserve_index = False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            logger.warning("'%s' cannot be converted to Arrow (%s); binding rows instead", table_name, e)
+            return False
+
+        view = f"_incoming_{table_name}"
+        columns = ", ".join(self.quote(c) for c in df.columns)
+        sql = self.insert_sql(table_name, list(df.columns), primary_key, f"SELECT {columns} FROM {view}")
+        with engine.begin() as conn:
+            duck = conn.connection.driver_connection
+            duck.register(view, arrow)
+            try:
+                conn.execute(text(sql))
+            finally:
+                duck.unregister(view)
+        return True
+
+
+BACKENDS = {backend.name: backend for backend in (Backend(), SQLiteBackend(), DuckDBBackend())}
+
+def backend_for(dialect: str) -> Backend:
+    """Backend for a SQLAlchemy dialect name; unknown dialects get MySQL's"""
+    return BACKENDS.get(dialect, BACKENDS["mysql"])
@@ -1,17 +1,108 @@
 """Load_Module contains logic for loading dataframes into database"""
+import os
+import time
 import logging
+import tempfile
+import threading
+from itertools import islice
+import numpy as np
 import pandas as pd
 from sqlalchemy import inspect,text
 from src.db.engine import get_engine
+from src.db import sql_queries_module as queries
+from src.load.backend_module import backend_for
+from src.load.parquet_store_module import SeasonStore, TABLES as STORE_TABLES
+from src.metrics.metrics_module import measure
 
 logger = logging.getLogger(__name__)
 
+# Signed integer types from smallest to largest
+INT_RANGES = {
+    "TINYINT": (-2 ** 7, 2 ** 7 - 1),
+    "SMALLINT": (-2 ** 15, 2 ** 15 - 1),
+    "INT": (-2 ** 31, 2 ** 31 - 1),
+    "BIGINT": (-2 ** 63, 2 ** 63 - 1)
+}
+
+# Headroom kept by profile_column, since a table's types are fixed once it
+# exists: integers are at least SMALLINT and sized for INT_HEADROOM times the
+# values seen; strings are VARCHAR of at least STRING_MIN characters and
+# twice the longest value seen
+INT_HEADROOM = 4
+STRING_MIN = 64
+
+# Fixed storage size in bytes of the non-string MySQL types
+TYPE_BYTES = {
+    "TINYINT": 1, "SMALLINT": 2, "INT": 4, "BIGINT": 8, "SERIAL": 8,
+    "FLOAT": 4, "DOUBLE": 8, "BOOLEAN": 1, "TIMESTAMP": 4
+}
+
+# Table name -> write counter, bumped after every successful insert so
+# readers (Home.py) can key their caches on it. It only counts this
+# process's writes; readers combine it with queries.row_counts(), which
+# other processes' loads also change
+_TABLE_VERSIONS = {}
+_VERSION_LOCK = threading.Lock()
+
+def table_version(table_name: str) -> int:
+    """Returns how many successful writes the table has had in this process"""
+    return _TABLE_VERSIONS.get(table_name, 0)
+
+def bump_table_version(table_name: str) -> int:
+    """Marks the table as changed, invalidating cached reads of it"""
+    with _VERSION_LOCK:
+        _TABLE_VERSIONS[table_name] = _TABLE_VERSIONS.get(table_name, 0) + 1
+        return _TABLE_VERSIONS[table_name]
+
+# Known value sets for low-cardinality columns stored as ENUM.
+# Values seen in the data are appended, so the list only needs the expected ones.
+ENUM_DOMAINS = {
+    "result": ["W", "L", "T"],
+    "game_type": ["REG", "WC", "DIV", "CON", "SB"]
+}
+
 
 class DataLoader:
     """Class: contains mapping, create, upsert, and drop methods 
     for tables in the database"""
-    def __init__(self):
-        self.engine = get_engine()
+
+    # (database url, table name) -> {primary key value: row fingerprint},
+    # shared by every DataLoader in the process so it survives Streamlit reruns
+    _fingerprints = {}
+
+    def __init__(self, engine=None, store: SeasonStore = None):
+        # Any SQLAlchemy engine can be passed in (e.g. SQLite for benchmarks);
+        # by default the shared MySQL engine is used, created on first use.
+        # nfl_facts and game are also written to the season-partitioned
+        # Parquet store (PARQUET_STORE_DIR by default)
+        self._engine = engine
+        self.store = store if store is not None else SeasonStore.from_env()
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = get_engine()
+        return self._engine
+
+    @engine.setter
+    def engine(self, engine):
+        self._engine = engine
+
+    def forget_rows_(self, table_name: str):
+        """Drops the remembered fingerprints of a table whose rows are gone
+        (dropped or newly created), so upsert_changed_ resends every row"""
+        self._fingerprints.pop((str(self.engine.url), table_name), None)
+
+    @property
+    def dialect(self) -> str:
+        """Name of the engine's SQL dialect, 'mysql' unless it says otherwise"""
+        name = getattr(getattr(self.engine, "dialect", None), "name", None)
+        return name if isinstance(name, str) else "mysql"
+
+    @property
+    def backend(self):
+        """SQL backend (quoting, keys, upserts, bulk path) for the dialect"""
+        return backend_for(self.dialect)
 
     @staticmethod
     def map_dtype_to_mysql(dtype):
@@ -28,10 +119,67 @@ class DataLoader:
         else:
             return "VARCHAR(50)"
 
-    def create_(self, df: pd.DataFrame, table_name: str, primary_key: str = "id"):
+    @staticmethod
+    def profile_column(series: pd.Series, name: str = None, enums: bool = True) -> str:
+        """picks a compact MySQL column type from the column's values, with
+        headroom for values later frames may bring (INT_HEADROOM, STRING_MIN):
+        integer ranges → SMALLINT/INT/BIGINT, float32 → FLOAT,
+        strings → ENUM for known domains (ENUM_DOMAINS, unless enums=False),
+        otherwise VARCHAR(n) with n at least twice the longest value, rounded
+        up to a power of two.
+        The headroom covers other seasons of the same data, not arbitrary
+        growth: for columns that cannot be bounded from this frame, pass
+        explicit sql_types to create_, or compact=False"""
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            return "BOOLEAN"
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return "TIMESTAMP"
+        if pd.api.types.is_integer_dtype(dtype):
+            if series.isna().all():
+                return "BIGINT"
+            low, high = int(series.min()) * INT_HEADROOM, int(series.max()) * INT_HEADROOM
+            for sql_type, (type_min, type_max) in INT_RANGES.items():
+                if sql_type != "TINYINT" and type_min <= low and high <= type_max:
+                    return sql_type
+            return "BIGINT"
+        if pd.api.types.is_float_dtype(dtype):
+            return "FLOAT" if dtype == np.float32 else "DOUBLE"
+
+        values = series.dropna().astype(str)
+        if enums and name in ENUM_DOMAINS:
+            domain = list(dict.fromkeys(ENUM_DOMAINS[name] + sorted(values.unique())))
+            return "ENUM(" + ", ".join("'" + v.replace("'", "''") + "'" for v in domain) + ")"
+        longest = int(values.str.len().max()) if not values.empty else 0
+        return f"VARCHAR({max(STRING_MIN, 1 << (2 * longest - 1).bit_length())})"
+
+    @staticmethod
+    def row_bytes(sql_types: list) -> int:
+        """estimates the stored size of one row for a list of MySQL types,
+        counting VARCHAR at its declared maximum"""
+        total = 0
+        for sql_type in sql_types:
+            base = sql_type.split("(")[0].split()[0]
+            if base in ("CHAR", "VARCHAR"):
+                length = int(sql_type.split("(")[1].rstrip(")"))
+                total += length + (0 if base == "CHAR" else 1 if length < 256 else 2)
+            elif base == "ENUM":
+                total += 1 if sql_type.count("'") // 2 < 256 else 2
+            else:
+                total += TYPE_BYTES.get(base, 8)
+        return total
+
+    @measure(step = "load", detail = "table_name")
+    def create_(self, df: pd.DataFrame, table_name: str, primary_key: str = "id", compact: bool = True,
+                sql_types: dict = None):
         """creates a table using a DataFrame, and a specified table name 
         with an option to automatically add an incrementing int ID 
-        or a specific value for a primary key"""
+        or a specific value for a primary key.
+        With compact=True (default) column types are sized from the data
+        (profile_column), with headroom for later frames since the types are
+        never revisited once the table exists; otherwise map_dtype_to_mysql
+        is used.
+        sql_types maps column names to SQL types that override both."""
 
         if df is None or df.empty:
             logger.error("Cannot create table '%s': DataFrame is empty or None", table_name)
@@ -43,71 +191,358 @@ class DataLoader:
             logger.info("Table '%s' already exists. Skipping creation.", table_name)
             return
 
-        columns = []
+        backend = self.backend
+        columns, statements = [], []
 
         # --- Handle primary key ---
         if primary_key is None:
             # Case 1: no PK specified → create 'id'
-            columns.append("id SERIAL PRIMARY KEY")
+            statements, serial = backend.serial_key(table_name, "id")
+            columns.append(serial)
             primary_key = None  # nothing in df gets PK
         elif primary_key not in df.columns:
             # Case 2: PK specified but not in df → create that column as PK
-            columns.append(f"`{primary_key}` SERIAL PRIMARY KEY")
+            statements, serial = backend.serial_key(table_name, backend.quote(primary_key))
+            columns.append(serial)
             primary_key = None  # don't assign PK to any df column
         # Case 3: PK exists in df → will assign in loop
 
         # --- Add remaining columns ---
+        overrides = sql_types or {}
+        naive_types, sql_types = [], []
         for col, dtype in zip(df.columns, df.dtypes):
-            sql_type = self.map_dtype_to_mysql(dtype)
-            col_quoted = f"`{col}`"
+            naive_types.append(self.map_dtype_to_mysql(dtype))
+            if col in overrides:
+                sql_type = overrides[col]
+            else:
+                # ENUM is MySQL-only
+                sql_type = (self.profile_column(df[col], col, enums=backend.enums)
+                            if compact else naive_types[-1])
+            sql_types.append(sql_type)
+            col_quoted = backend.quote(col)
             if col == primary_key:
                 columns.append(f"{col_quoted} {sql_type} PRIMARY KEY")
             else:
                 columns.append(f"{col_quoted} {sql_type}")
 
+        logger.info("Table '%s' estimated row size: %s bytes (naive mapping: %s bytes)",
+                    table_name, self.row_bytes(sql_types), self.row_bytes(naive_types))
+
         sql = f"CREATE TABLE {table_name} ({', '.join(columns)});"
 
         # --- Execute SQL ---
         try:
             with self.engine.begin() as conn:
-                conn.execute(text(sql))
+                for statement in statements + [sql]:
+                    conn.execute(text(statement))
+            self.forget_rows_(table_name)
             logger.info("Table '%s' created successfully.", table_name)
         except Exception as e:
             logger.error("Failed to create table '%s': %s", table_name, e)
             raise
 
 
-    def insert_(self, df: pd.DataFrame, table_name: str, primary_key: str):
+    @staticmethod
+    def _insert_sql(table_name: str, columns: list, primary_key: str, values: str, dialect: str = "mysql") -> str:
+        """Builds an INSERT for the given VALUES clause, as an upsert
+        when a primary key is provided, in the dialect's syntax (MySQL:
+        ON DUPLICATE KEY UPDATE; SQLite and DuckDB: ON CONFLICT)"""
+        return backend_for(dialect).insert_sql(table_name, columns, primary_key, f"VALUES {values}")
+
+    @staticmethod
+    def _rows(df: pd.DataFrame):
+        """Yields each row as a tuple of plain Python values, NaN as None"""
+        values = df.astype(object).where(df.notna(), None)
+        return values.itertuples(index=False, name=None)
+
+    @measure(step = "load", detail = "table_name")
+    def insert_(self, df: pd.DataFrame, table_name: str, primary_key: str, batch_size: int = None):
         """Insert rows into a table. 
-        Uses upsert if primary_key is provided, normal insert if not."""
+        Uses upsert if primary_key is provided, normal insert if not.
+        With batch_size, rows are sent in batches of that many rows (see
+        _batches), each batch in its own transaction."""
         if df is None or df.empty:
             logger.error("Cannot insert into '%s': DataFrame is empty or None", table_name)
             raise ValueError("DataFrame is empty or None")
-        # Convert NaN to None for SQL
 
+        began = time.perf_counter()
+        try:
+            bulk = self.backend.bulk_insert(self.engine, df, table_name, primary_key)
+        except Exception as e:
+            logger.error("Failed to bulk insert rows into '%s': '%s'", table_name, e)
+            raise
+        if bulk:
+            # One Arrow pass; batching would only add statements
+            seconds = time.perf_counter() - began
+            bump_table_version(table_name)
+            rate = len(df) / seconds if seconds else float("inf")
+            logger.info("Bulk inserted %d rows into '%s' | %.0f rows/s", len(df), table_name, rate)
+            return [{"batch": 1, "rows": len(df), "seconds": seconds, "rows_per_sec": rate}] if batch_size else None
+
+        if batch_size:
+            return self._insert_batches(df, table_name, primary_key, batch_size)
+
+        # Convert NaN to None for SQL
         columns = list(df.columns)
-        columns_quoted = [f"`{c}`" for c in columns]
         placeholders = ", ".join([f":{c}" for c in columns])
         records = df.to_dict(orient="records")
-
-        if primary_key is None:
-        # Auto-increment PK case → normal insert
-            sql = f"INSERT INTO {table_name} ({', '.join(columns_quoted)}) VALUES ({placeholders});"
-        else:
-        # User-defined PK → upsert with backticks
-            update_clause = ", ".join([f"`{c}`=VALUES(`{c}`)" for c in columns if c != primary_key])
-            sql = f"""INSERT INTO {table_name} ({', '.join(columns_quoted)})
-                    VALUES ({placeholders})
-                    ON DUPLICATE KEY UPDATE {update_clause};"""
+        sql = self._insert_sql(table_name, columns, primary_key, f"({placeholders})", self.dialect)
 
         try:
             with self.engine.begin() as conn:
                 conn.execute(text(sql), records)
+            bump_table_version(table_name)
             logger.info("Inserted %d rows into '%s' successfully.", len(df), table_name)
         except Exception as e:
             logger.error("Failed to insert rows into '%s': '%s'", table_name,e)
             raise
-        
+
+    @property
+    def paramstyle(self) -> str:
+        """DBAPI placeholder style of the engine's driver, 'format' unless it says otherwise"""
+        style = getattr(getattr(self.engine, "dialect", None), "paramstyle", None)
+        return style if isinstance(style, str) else "format"
+
+    @classmethod
+    def _batches(cls, df: pd.DataFrame, table_name: str, primary_key: str, batch_size: int,
+                 dialect: str = "mysql", paramstyle: str = "format"):
+        """Yields (batch number, first row, row count, sql, rows) for each
+        batch of at most batch_size rows. sql is a single-row INSERT with
+        positional placeholders, sent with the batch's rows as one
+        executemany: PyMySQL rewrites it into multi-row INSERTs and SQLite
+        reuses the prepared statement. Batches are capped by the backend's
+        bind-parameter limit."""
+        backend = backend_for(dialect)
+        columns = list(df.columns)
+        batch_size = backend.batch_rows(len(columns), batch_size)
+        sql = backend.insert_sql(table_name, columns, primary_key,
+                                 "VALUES " + backend.placeholders(len(columns), paramstyle))
+        rows = cls._rows(df)
+
+        for batch_num, start in enumerate(range(0, len(df), batch_size), start=1):
+            batch = list(islice(rows, batch_size))
+            yield batch_num, start, len(batch), sql, batch
+
+    def _insert_batches(self, df: pd.DataFrame, table_name: str, primary_key: str, batch_size: int):
+        """Sends the DataFrame in batches of batch_size rows, each in its own
+        transaction. Returns per-batch stats: rows, seconds and rows per second."""
+        stats = []
+
+        for batch_num, start, count, sql, rows in self._batches(df, table_name, primary_key, batch_size,
+                                                                self.dialect, self.paramstyle):
+            began = time.perf_counter()
+            try:
+                with self.engine.begin() as conn:
+                    conn.exec_driver_sql(sql, rows)
+            except Exception as e:
+                logger.error("Failed to insert batch %s (rows %s-%s) into '%s': '%s'",
+                             batch_num, start, start + count - 1, table_name, e)
+                raise
+            seconds = time.perf_counter() - began
+            bump_table_version(table_name)
+
+            rate = count / seconds if seconds else float("inf")
+            stats.append({"batch": batch_num, "rows": count, "seconds": seconds, "rows_per_sec": rate})
+            logger.info("Inserted batch %s into '%s' | rows=%s | %.0f rows/s",
+                        batch_num, table_name, count, rate)
+
+        logger.info("Inserted %d rows into '%s' in %d batches.", len(df), table_name, len(stats))
+        return stats
+
+    @staticmethod
+    def _infile_frame(df: pd.DataFrame) -> pd.DataFrame:
+        """Copy of the frame as LOAD DATA reads it: booleans as 1/0 (not the
+        text True/False) and backslashes in strings doubled, since the
+        default ESCAPED BY '\\' would otherwise consume them"""
+        df = df.copy(deep=False)
+        for col in df.columns:
+            if pd.api.types.is_bool_dtype(df[col].dtype):
+                df[col] = df[col].astype("Int8")
+            elif df[col].dtype == object:
+                df[col] = df[col].map(lambda v: v.replace("\\", "\\\\") if isinstance(v, str) else v)
+        return df
+
+    @measure(step = "load", detail = "table_name")
+    def load_file_(self, df: pd.DataFrame, table_name: str):
+        """Full reload fast path: writes the DataFrame to a temporary CSV and
+        bulk loads it with LOAD DATA LOCAL INFILE, replacing rows that share
+        a primary key. The engine must be created with DB_LOCAL_INFILE=1
+        and the server must allow local_infile. Embedded backends upsert
+        on the table's primary key through insert_ instead."""
+        if df is None or df.empty:
+            logger.error("Cannot load into '%s': DataFrame is empty or None", table_name)
+            raise ValueError("DataFrame is empty or None")
+
+        if self.backend.name != "mysql":
+            return self.insert_(df, table_name, self.backend.primary_key(self.engine, table_name))
+
+        quote = self.backend.quote
+        columns_quoted = [quote(c) for c in df.columns]
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+
+        try:
+            self._infile_frame(df).to_csv(path, index=False, na_rep="\\N", lineterminator="\n")
+            sql = f"""LOAD DATA LOCAL INFILE :path
+                    REPLACE INTO TABLE {quote(table_name)}
+                    FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+                    LINES TERMINATED BY '\\n'
+                    IGNORE 1 LINES ({', '.join(columns_quoted)});"""
+
+            began = time.perf_counter()
+            with self.engine.begin() as conn:
+                conn.execute(text(sql), {"path": path})
+            seconds = time.perf_counter() - began
+            bump_table_version(table_name)
+
+            logger.info("Bulk loaded %d rows into '%s' | %.0f rows/s",
+                        len(df), table_name, len(df) / seconds if seconds else float("inf"))
+        except Exception as e:
+            logger.error("Failed to bulk load '%s': '%s'", table_name, e)
+            raise
+        finally:
+            os.remove(path)
+
+    @staticmethod
+    def _hashable(df: pd.DataFrame) -> pd.DataFrame:
+        """Widens numbers to int64/float64 before fingerprinting: hashes
+        depend on the dtype, and Cleaning picks float32 or float64 (and the
+        int width) per batch, so the same values must hash the same"""
+        widths = {}
+        for col, dtype in df.dtypes.items():
+            if pd.api.types.is_float_dtype(dtype):
+                widths[col] = "Float64" if isinstance(dtype, pd.api.extensions.ExtensionDtype) else "float64"
+            elif pd.api.types.is_integer_dtype(dtype):
+                widths[col] = "Int64" if isinstance(dtype, pd.api.extensions.ExtensionDtype) else "int64"
+        return df.astype(widths) if widths else df
+
+    @measure(step = "load", detail = "table_name")
+    def upsert_changed_(self, df: pd.DataFrame, table_name: str, primary_key: str, batch_size: int = None):
+        """Upserts only the rows that are new or changed since the last
+        upsert_changed_ of this table in this process.
+
+        Each row is fingerprinted by hashing its non-key columns, keyed by its
+        primary key; rows whose fingerprint matches are skipped. The
+        fingerprints of a table are forgotten when drop_ or create_ removes or
+        (re)creates it; after deleting rows by other means, call
+        forget_rows_(table_name).
+
+        Returns:
+            dict: {"sent": rows written, "skipped": unchanged rows}
+        """
+        if df is None or df.empty:
+            logger.error("Cannot upsert into '%s': DataFrame is empty or None", table_name)
+            raise ValueError("DataFrame is empty or None")
+        if primary_key not in df.columns:
+            raise ValueError(f"Primary key '{primary_key}' not in DataFrame")
+
+        df = df.drop_duplicates(subset=primary_key, keep="last")
+        hashes = pd.util.hash_pandas_object(self._hashable(df.drop(columns=[primary_key])), index=False).to_numpy()
+        keys = df[primary_key].tolist()
+
+        seen = self._fingerprints.setdefault((str(self.engine.url), table_name), {})
+        changed = np.fromiter((seen.get(k) != h for k, h in zip(keys, hashes)), dtype=bool, count=len(keys))
+        sent, skipped = int(changed.sum()), int((~changed).sum())
+
+        if sent:
+            self.insert_(df=df[changed], table_name=table_name, primary_key=primary_key, batch_size=batch_size)
+            seen.update((k, h) for k, h, c in zip(keys, hashes, changed) if c)
+
+        logger.info("Upsert into '%s' | sent=%s | skipped unchanged=%s", table_name, sent, skipped)
+        return {"sent": sent, "skipped": skipped}
+
+    @measure(step = "load")
+    def load_tables_(self, tables: dict, batch_size: int = None):
+        """Loads several tables in one bulk pass each.
+
+        Parameters:
+            tables (dict): table name -> (DataFrame or list of DataFrames, primary key).
+                Frames for the same table (e.g. one per season) are concatenated
+                and deduplicated on the primary key, keeping the last row.
+            batch_size (int): passed to insert_; None sends each table as one statement.
+
+        Returns:
+            dict: table name -> number of rows written
+        """
+        written = {}
+        for table_name, (frames, primary_key) in tables.items():
+            if isinstance(frames, pd.DataFrame):
+                frames = [frames]
+            frames = [f for f in frames if f is not None and not f.empty]
+            if not frames:
+                logger.warning("No rows to load into '%s'", table_name)
+                written[table_name] = 0
+                continue
+
+            df = pd.concat(frames, ignore_index=True)
+            if primary_key in df.columns:
+                df = df.drop_duplicates(subset=primary_key, keep="last")
+
+            self.create_(df=df, table_name=table_name, primary_key=primary_key)
+            self.insert_(df=df, table_name=table_name, primary_key=primary_key, batch_size=batch_size)
+            written[table_name] = len(df)
+            logger.info("Consolidated %d frames into %d rows for '%s'", len(frames), len(df), table_name)
+        return written
+
+    @measure(step = "load")
+    def refresh_summaries_(self, facts: pd.DataFrame, batch_size: int = None):
+        """Builds season_summary and team_season_summary from the fact rows
+        just loaded and upserts them. Only the seasons present in `facts`
+        are rewritten, so pass every fact row of each season touched."""
+        if facts is None or facts.empty:
+            logger.warning("No fact rows given, summaries not refreshed")
+            return {}
+
+        written = self.load_tables_({
+            "season_summary": (queries.season_summary(facts), "season_id"),
+            "team_season_summary": (queries.team_season_summary(facts), "summary_id")
+        }, batch_size=batch_size)
+        logger.info("Refreshed summaries for seasons %s", sorted(facts["season_id"].unique().tolist()))
+        return written
+
+    def refresh_season_summaries_(self, seasons):
+        """Rebuilds the summaries of the given seasons from the nfl_facts rows
+        already in the database, one season at a time. Used when facts were
+        loaded in chunks that may split a season."""
+        for season in sorted(set(seasons)):
+            self.refresh_summaries_(queries.read_season_facts(self.engine, season))
+
+    @measure(step = "load")
+    def write_store_(self, tables: dict):
+        """Writes nfl_facts and game frames to the Parquet store, replacing
+        the partitions of the seasons they contain; pass every row of each
+        season touched. Other tables are ignored.
+
+        Parameters:
+            tables (dict): table name -> DataFrame or list of DataFrames
+
+        Returns:
+            dict: table name -> seasons written
+        """
+        written = {}
+        for table_name, frames in tables.items():
+            if table_name not in STORE_TABLES:
+                continue
+            if isinstance(frames, list):
+                frames = [f for f in frames if f is not None and not f.empty]
+                frames = pd.concat(frames, ignore_index=True) if frames else None
+            written[table_name] = self.store.write(frames, table_name)
+            if written[table_name]:
+                bump_table_version(table_name)
+        return written
+
+    def refresh_season_store_(self, seasons):
+        """Rewrites the store partitions of the given seasons from the rows
+        already in the database, one season at a time. Used when facts were
+        loaded in chunks that may split a season."""
+        if not self.store.enabled:
+            return
+        for season in sorted(set(seasons)):
+            self.write_store_({
+                "nfl_facts": queries.read_season_facts(self.engine, season),
+                "game": queries.read_season_games(self.engine, season)
+            })
+
     def drop_(self, table_names):
         """
         Drops one or more tables.
@@ -122,6 +557,8 @@ class DataLoader:
             try:
                 with self.engine.begin() as conn:
                     conn.execute(text(f"DROP TABLE IF EXISTS {table_name};"))
+                self.forget_rows_(table_name)
+                bump_table_version(table_name)
                 logger.info("Table '%s' dropped successfully.", table_name)
             except Exception as e:
                 logger.error("Failed to drop table '%s': '%s", table_name, e)
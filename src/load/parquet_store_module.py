@@ -0,0 +1,121 @@
+"""Module for the season-partitioned Parquet copy of nfl_facts and game.
+
+Each table is a Hive-partitioned dataset with one file per season:
+
+    <store dir>/nfl_facts/season_id=2024/part-0.parquet
+
+Writing a season replaces only that season's file (written to a temporary
+file, then renamed over it), so reloading one season leaves the others
+untouched and readers never see a half-written partition. Reads go through
+pyarrow datasets: only the requested columns are decoded, season filters
+prune whole partitions, and other filters are pushed down to the row
+groups.
+"""
+import os
+import logging
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+PARTITION = "season_id"
+TABLES = ("nfl_facts", "game")
+
+
+class SeasonStore:
+    """Class: reads and writes the season-partitioned datasets under root"""
+
+    def __init__(self, root: str, enabled: bool = True):
+        self.root = root
+        self.enabled = enabled
+
+    @classmethod
+    def from_env(cls):
+        """Builds a store configured by PARQUET_STORE_DIR and PARQUET_STORE ("0" disables)"""
+        return cls(
+            root = os.getenv("PARQUET_STORE_DIR", os.path.join("data", "store")),
+            enabled = os.getenv("PARQUET_STORE", "1") != "0"
+        )
+
+    def path(self, table_name: str, season = None) -> str:
+        """Dataset directory of a table, or the directory of one season"""
+        path = os.path.join(self.root, table_name)
+        return path if season is None else os.path.join(path, f"{PARTITION}={int(season)}")
+
+    def seasons(self, table_name: str) -> list:
+        """Seasons stored for a table, read from the partition names only"""
+        try:
+            names = os.listdir(self.path(table_name))
+        except OSError:
+            return []
+        prefix = f"{PARTITION}="
+        return sorted(int(name[len(prefix):]) for name in names
+                      if name.startswith(prefix) and os.path.exists(os.path.join(self.path(table_name), name, "part-0.parquet")))
+
+    def version(self, table_name: str) -> float:
+        """Latest partition write time, for keying cached reads; changes
+        even when another process (e.g. the CLI) wrote the store"""
+        times = [os.path.getmtime(os.path.join(self.path(table_name, season), "part-0.parquet"))
+                 for season in self.seasons(table_name)]
+        return max(times, default = 0.0)
+
+    def write(self, df: pd.DataFrame, table_name: str) -> list:
+        """Replaces the partitions of every season in the frame, which must
+        hold all of each season's rows. Returns the seasons written."""
+        if not self.enabled or df is None or df.empty:
+            return []
+        if PARTITION not in df.columns:
+            raise ValueError(f"'{table_name}' has no {PARTITION} column to partition on")
+
+        written = []
+        for season, rows in df.groupby(PARTITION, sort = True):
+            directory = self.path(table_name, season)
+            os.makedirs(directory, exist_ok = True)
+            table = pa.Table.from_pandas(rows.drop(columns = [PARTITION]), preserve_index = False)
+            fd, tmp = tempfile.mkstemp(suffix = ".tmp", dir = directory)
+            os.close(fd)
+            try:
+                pq.write_table(table, tmp)
+                os.replace(tmp, os.path.join(directory, "part-0.parquet"))
+            except Exception:
+                os.remove(tmp)
+                raise
+            written.append(int(season))
+
+        logger.info("Wrote '%s' to the Parquet store | seasons=%s | rows=%s", table_name, written, len(df))
+        return written
+
+    def dataset(self, table_name: str, seasons: tuple = None):
+        """pyarrow dataset over a table's partitions (those between the
+        (first, last) seasons when given), or None when there are none.
+        Column types are unified across seasons (e.g. a column that is
+        integer in one season and float in another reads as float)."""
+        stored = self.seasons(table_name)
+        if seasons is not None:
+            stored = [season for season in stored if seasons[0] <= season <= seasons[1]]
+        files = [os.path.join(self.path(table_name, season), "part-0.parquet") for season in stored]
+        if not files:
+            return None
+        schema = pa.unify_schemas([pq.read_schema(f) for f in files], promote_options = "permissive")
+        schema = schema.insert(0, pa.field(PARTITION, pa.int32()))
+        partitioning = ds.partitioning(pa.schema([(PARTITION, pa.int32())]), flavor = "hive")
+        return ds.dataset(files, schema = schema, format = "parquet",
+                          partitioning = partitioning, partition_base_dir = self.path(table_name))
+
+    def read(self, table_name: str, columns: list = None, seasons: tuple = None, where = None) -> pd.DataFrame:
+        """Reads a table with projection and pushdown.
+
+        Parameters:
+            columns (list): columns to decode; None reads all of them.
+            seasons (tuple): (first, last) seasons, inclusive; only those
+                partitions are opened.
+            where (pyarrow.dataset.Expression): extra row filter, e.g.
+                ds.field("week") == 3.
+        """
+        dataset = self.dataset(table_name, seasons)
+        if dataset is None:
+            return pd.DataFrame(columns = columns)
+        return dataset.to_table(columns = columns, filter = where).to_pandas()
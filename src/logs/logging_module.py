@@ -0,0 +1,135 @@
+"""Module that configures logging for the app, the pipeline CLI and scripts.
+
+Records are handed to a QueueHandler, and a background QueueListener thread
+does the formatting and file writes, so a logging call on the load path
+only costs a queue put. Settings come from the environment (or .env):
+
+    LOG_FILE        log file path (default records.log; empty disables it)
+    LOG_LEVEL       root level (default INFO)
+    LOG_LEVELS      per-logger levels, e.g. "src.load=DEBUG,src.extract=WARNING"
+    LOG_ROTATE      "size" (default) or "time"
+    LOG_MAX_MB      size rotation threshold in MB (default 5)
+    LOG_WHEN        time rotation interval, as TimedRotatingFileHandler (default midnight)
+    LOG_BACKUPS     rotated files kept (default 5)
+    LOG_CONSOLE     "1" to also log to stderr
+    SQL_ECHO        "1" to log SQL statements (default off)
+    SQL_ECHO_SAMPLE fraction of statements logged when SQL_ECHO=1 (default 1.0)
+
+configure_logging() is idempotent, so Streamlit reruns keep one listener.
+"""
+import os
+import sys
+import queue
+import atexit
+import random
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from dotenv import load_dotenv
+
+load_dotenv()
+
+FORMAT = "%(asctime)s - %(levelname)s - %(name)s: %(message)s"
+SQL_LOGGER = "src.db.sql"
+
+_LISTENER = None
+_LOCK = threading.Lock()
+
+def parse_levels(spec: str) -> dict:
+    """Parses "name=LEVEL,name=LEVEL" into {name: level}; bad entries are skipped"""
+    levels = {}
+    for item in (spec or "").split(","):
+        name, _, level = item.partition("=")
+        name, level = name.strip(), level.strip().upper()
+        if name and level in logging.getLevelNamesMapping():
+            levels[name] = level
+    return levels
+
+def _file_handler(path: str) -> logging.Handler:
+    backups = int(os.getenv("LOG_BACKUPS", 5))
+    if os.getenv("LOG_ROTATE", "size").lower() == "time":
+        return TimedRotatingFileHandler(path, when = os.getenv("LOG_WHEN", "midnight"),
+                                        backupCount = backups, encoding = "utf-8", delay = True)
+    max_bytes = int(float(os.getenv("LOG_MAX_MB", 5)) * 1024 ** 2)
+    return RotatingFileHandler(path, maxBytes = max_bytes, backupCount = backups,
+                               encoding = "utf-8", delay = True)
+
+def configure_logging(force: bool = False):
+    """Installs the queue handler on the root logger and starts the
+    background listener. Later calls do nothing unless force=True."""
+    global _LISTENER
+    with _LOCK:
+        if _LISTENER is not None and not force:
+            return _LISTENER
+        if _LISTENER is not None:
+            shutdown_logging()
+
+        handlers = []
+        path = os.getenv("LOG_FILE", "records.log")
+        if path:
+            handlers.append(_file_handler(path))
+        if os.getenv("LOG_CONSOLE") == "1":
+            handlers.append(logging.StreamHandler(sys.stderr))
+        formatter = logging.Formatter(FORMAT)
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        records = queue.SimpleQueue()
+        root = logging.getLogger()
+        for handler in [h for h in root.handlers if isinstance(h, QueueHandler)]:
+            root.removeHandler(handler)
+        root.addHandler(QueueHandler(records))
+        root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+        # SQLAlchemy's own echo stays quiet; sampled statements use SQL_LOGGER
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+        for name, level in parse_levels(os.getenv("LOG_LEVELS", "")).items():
+            logging.getLogger(name).setLevel(level)
+
+        _LISTENER = QueueListener(records, *handlers, respect_handler_level = True)
+        _LISTENER.start()
+        return _LISTENER
+
+def shutdown_logging():
+    """Flushes queued records, stops the listener and detaches the queue handler"""
+    global _LISTENER
+    if _LISTENER is not None:
+        root = logging.getLogger()
+        for handler in [h for h in root.handlers if isinstance(h, QueueHandler)]:
+            root.removeHandler(handler)
+        _LISTENER.stop()
+        for handler in _LISTENER.handlers:
+            handler.close()
+        _LISTENER = None
+
+atexit.register(shutdown_logging)
+
+
+# -----------------------------
+# SQL echo
+# -----------------------------
+def sql_echo_rate() -> float:
+    """Fraction of SQL statements to log: 0 unless SQL_ECHO=1"""
+    if os.getenv("SQL_ECHO") != "1":
+        return 0.0
+    return min(max(float(os.getenv("SQL_ECHO_SAMPLE", 1.0)), 0.0), 1.0)
+
+def install_sql_echo(engine, rate: float = None):
+    """Logs a sample of the engine's statements to the src.db.sql logger:
+    the SQL text (cut to 500 characters) and the parameter count, never the
+    values. Does nothing when the rate is 0, the default."""
+    rate = sql_echo_rate() if rate is None else rate
+    if rate <= 0:
+        return False
+
+    from sqlalchemy import event
+    sql_logger = logging.getLogger(SQL_LOGGER)
+    sql_logger.setLevel(logging.INFO)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _echo(conn, cursor, statement, parameters, context, executemany):
+        if rate >= 1 or random.random() < rate:
+            count = len(parameters) if isinstance(parameters, (list, tuple, dict)) else 0
+            sql_logger.info("%s | params=%s%s", " ".join(statement.split())[:500],
+                            count, " | executemany" if executemany else "")
+    return True
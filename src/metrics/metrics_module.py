@@ -0,0 +1,264 @@
+"""Module for recording per-stage performance metrics.
+
+Wrap a stage with `measure` (decorator) or `StageMetrics` (context manager)
+to record its wall time, rows and bytes in/out, process memory (RSS now and
+the process's peak so far) and, when tracing is on, the Python allocation
+peak from tracemalloc. Each record is appended as one JSON line to
+PIPELINE_METRICS_FILE (default metrics.jsonl, empty to disable) and kept in
+memory for the Data Pipeline page's summary panel. Like records.log, the
+file is rotated once it reaches PIPELINE_METRICS_MAX_MB (default 5), keeping
+PIPELINE_METRICS_BACKUPS older files (default 5).
+
+RSS is process-wide, so stages running at the same time share it; tracing
+(PIPELINE_TRACEMALLOC=1) is exact only for stages that run alone and slows
+Python allocations noticeably.
+"""
+import os
+import sys
+import json
+import time
+import inspect
+import logging
+import threading
+import functools
+import tracemalloc
+from collections import deque
+from datetime import datetime, timezone
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:  # RSS is then read from resource where available
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+MAX_RECORDS = 5000
+_RECORDS = deque(maxlen = MAX_RECORDS)
+_LOCK = threading.Lock()
+_SEQUENCE = 0
+
+def metrics_file():
+    """JSON lines output path, or None when disabled"""
+    return os.getenv("PIPELINE_METRICS_FILE", "metrics.jsonl") or None
+
+def _rotate(path: str):
+    """Moves a full metrics file to path.1 (shifting older ones up and
+    dropping the oldest), as logging's size rotation does for records.log"""
+    max_bytes = int(float(os.getenv("PIPELINE_METRICS_MAX_MB", 5)) * 1024 ** 2)
+    try:
+        if max_bytes <= 0 or os.path.getsize(path) < max_bytes:
+            return
+    except OSError:
+        return
+    backups = int(os.getenv("PIPELINE_METRICS_BACKUPS", 5))
+    for n in range(backups - 1, 0, -1):
+        if os.path.exists(f"{path}.{n}"):
+            os.replace(f"{path}.{n}", f"{path}.{n + 1}")
+    if backups > 0:
+        os.replace(path, f"{path}.1")
+    else:
+        os.remove(path)
+
+def tracing_enabled() -> bool:
+    return os.getenv("PIPELINE_TRACEMALLOC") == "1"
+
+
+# -----------------------------
+# sizes and memory
+# -----------------------------
+def frame_size(obj):
+    """Returns (rows, bytes) for a pandas/Polars frame, or the sums over a
+    tuple, list or dict of them; (None, None) for anything else"""
+    if isinstance(obj, pd.DataFrame):
+        return len(obj), int(obj.memory_usage(index = False).sum())
+    if isinstance(obj, pd.Series):
+        return len(obj), int(obj.memory_usage(index = False))
+    if hasattr(obj, "estimated_size") and hasattr(obj, "height"):  # polars.DataFrame
+        return obj.height, int(obj.estimated_size())
+    if isinstance(obj, dict):
+        obj = list(obj.values())
+    if isinstance(obj, (tuple, list)):
+        sizes = [frame_size(item) for item in obj]
+        sizes = [size for size in sizes if size[0] is not None]
+        if sizes:
+            return sum(r for r, _ in sizes), sum(b for _, b in sizes)
+    return None, None
+
+def rss_bytes():
+    """Current resident set size of this process"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    return None
+
+def peak_rss_bytes():
+    """Highest resident set size this process has reached"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024  # kilobytes on Linux
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    return None
+
+
+# -----------------------------
+# recording
+# -----------------------------
+def record(entry: dict):
+    """Stores a metrics record in memory and appends it to the metrics file"""
+    global _SEQUENCE
+    with _LOCK:
+        _SEQUENCE += 1
+        entry["seq"] = _SEQUENCE
+        _RECORDS.append(entry)
+        path = metrics_file()
+        if path:
+            try:
+                _rotate(path)
+                with open(path, "a", encoding = "utf-8") as f:
+                    f.write(json.dumps(entry, default = str) + "\n")
+            except OSError as e:
+                logger.warning("Could not write metrics to '%s': %s", path, e)
+
+def mark() -> int:
+    """Sequence number of the latest record; pass it to records() to get
+    only what a run recorded after this point"""
+    return _SEQUENCE
+
+def records(since: int = 0) -> list:
+    """In-memory records newer than `since`, oldest first"""
+    with _LOCK:
+        return [entry for entry in _RECORDS if entry["seq"] > since]
+
+def summary_frame(entries: list) -> pd.DataFrame:
+    """One row per stage: calls, total seconds, rows/bytes out and the
+    highest memory figures seen"""
+    columns = ["stage", "step", "calls", "seconds", "rows_out", "bytes_out", "rss_peak_mb", "traced_peak_mb", "errors"]
+    if not entries:
+        return pd.DataFrame(columns = columns)
+    df = pd.DataFrame(entries)
+    for col in ("rows_out", "bytes_out", "rss_peak_bytes", "traced_peak_bytes"):
+        df[col] = pd.to_numeric(df[col], errors = "coerce") if col in df.columns else float("nan")
+    df["errors"] = df["status"].eq("error")
+    summary = (
+        df.groupby(["stage", "step"], as_index = False, sort = False)
+        .agg(calls = ("seconds", "size"),
+             seconds = ("seconds", "sum"),
+             rows_out = ("rows_out", "sum"),
+             bytes_out = ("bytes_out", "sum"),
+             rss_peak_mb = ("rss_peak_bytes", "max"),
+             traced_peak_mb = ("traced_peak_bytes", "max"),
+             errors = ("errors", "sum"))
+    )
+    summary["rss_peak_mb"] = summary["rss_peak_mb"] / 1024 ** 2
+    summary["traced_peak_mb"] = summary["traced_peak_mb"] / 1024 ** 2
+    return summary.sort_values("seconds", ascending = False, ignore_index = True)[columns]
+
+
+class StageMetrics:
+    """Class: context manager recording one stage's metrics.
+
+        with StageMetrics("load.nfl_facts", "load", rows_in = df) as m:
+            ...
+            m.output(result)
+    """
+
+    def __init__(self, stage: str, step: str = None, rows_in = None, trace: bool = None, **tags):
+        self.stage = stage
+        self.step = step
+        self.tags = tags
+        self.trace = tracing_enabled() if trace is None else trace
+        self.rows_in, self.bytes_in = frame_size(rows_in) if rows_in is not None else (None, None)
+        self.rows_out = self.bytes_out = None
+        self.entry = None
+
+    def output(self, result):
+        """Records the rows and bytes of what the stage produced"""
+        self.rows_out, self.bytes_out = frame_size(result)
+        return result
+
+    def __enter__(self):
+        self._started_tracing = False
+        if self.trace:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+        self._rss_before = rss_bytes()
+        self._started = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        traced_peak = None
+        if self.trace and tracemalloc.is_tracing():
+            traced_peak = tracemalloc.get_traced_memory()[1]
+            if self._started_tracing:
+                tracemalloc.stop()
+
+        rss_after = rss_bytes()
+        self.entry = {
+            "ts": self._started.isoformat(),
+            "stage": self.stage,
+            "step": self.step,
+            "seconds": seconds,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "rss_bytes": rss_after,
+            "rss_delta_bytes": rss_after - self._rss_before if rss_after is not None else None,
+            "rss_peak_bytes": peak_rss_bytes(),
+            "traced_peak_bytes": traced_peak,
+            "thread": threading.current_thread().name,
+            "status": "error" if exc_type else "ok",
+            **({"error": repr(exc)} if exc_type else {}),
+            **self.tags
+        }
+        record(self.entry)
+        logger.debug("Stage metrics | stage=%s | seconds=%.3f | rows_out=%s", self.stage, seconds, self.rows_out)
+        return False
+
+
+def _first_frame(args, kwargs):
+    for value in list(args) + list(kwargs.values()):
+        if frame_size(value)[0] is not None:
+            return value
+    return None
+
+def measure(stage: str = None, step: str = None, detail: str = None, trace: bool = None):
+    """Decorator recording StageMetrics for every call. rows_in is taken
+    from the first frame argument and rows_out from the return value.
+    Works on plain and async functions; the stage defaults to
+    '<module>.<function>', and `detail` names an argument whose value is
+    appended to it, e.g. detail='table_name' → 'load_module.insert_[game]'."""
+    def decorator(func):
+        name = stage or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+        signature = inspect.signature(func) if detail else None
+
+        def stage_name(args, kwargs):
+            if signature is None:
+                return name
+            value = signature.bind_partial(*args, **kwargs).arguments.get(detail)
+            return name if value is None else f"{name}[{value}]"
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with StageMetrics(stage_name(args, kwargs), step, _first_frame(args, kwargs), trace) as metrics:
+                    return metrics.output(await func(*args, **kwargs))
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with StageMetrics(stage_name(args, kwargs), step, _first_frame(args, kwargs), trace) as metrics:
+                return metrics.output(func(*args, **kwargs))
+        return wrapper
+    return decorator
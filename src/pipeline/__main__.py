@@ -0,0 +1,4 @@
+"""Entry point for `python -m src.pipeline`"""
+from src.pipeline.runner_module import main
+
+main()
@@ -0,0 +1,96 @@
+"""Module for loading play-by-play data one season and week at a time.
+
+A season of pbp has ~370 columns and ~50k rows, and the 1999-present
+backfill is far too large to hold at once. Each season is read lazily
+from the Parquet cache (scan_pbp) and only one week of pass/run plays is
+collected at a time, so peak memory is set by the largest week rather
+than by the number of seasons loaded. Each week is split into side tables
+of at most `max_cols` columns (pbp_1, pbp_2, ...), all keyed by
+play_key = '<game_id>_<play_id>', and inserted in batches.
+"""
+import time
+import logging
+import polars as pl
+from src.extract.nflreadpy_extract import scan_pbp
+from src.transform.validation import Validation
+from src.transform.polars_module import PolarsValidation
+
+logger = logging.getLogger(__name__)
+
+PLAY_TYPES = ["pass", "run"]
+PLAY_KEY = "play_key"
+# Most rows per insert batch; fewer when the backend's bind-parameter limit
+# cannot take this many rows of max_cols columns
+BATCH_ROWS = 5000
+
+def plays(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Pass and run plays, keyed by play_key"""
+    return PolarsValidation.valid_rows(lf, "play_type", PLAY_TYPES).with_columns(
+        pl.concat_str([pl.col("game_id"), pl.col("play_id").cast(pl.Int64)], separator = "_").alias(PLAY_KEY)
+    )
+
+def weekly_batches(lf: pl.LazyFrame, by_week: bool = True):
+    """Yields (week, pandas DataFrame) for each week of the lazy season,
+    or (None, whole season) when by_week is False"""
+    if not by_week:
+        yield None, lf.collect().to_pandas()
+        return
+
+    weeks = lf.select(pl.col("week").unique().sort()).collect()["week"].to_list()
+    for week in weeks:
+        yield week, lf.filter(pl.col("week") == week).collect().to_pandas()
+
+def side_table_types(df) -> dict:
+    """SQL types for the pbp side tables. Strings are TEXT (play
+    descriptions run to hundreds of characters and TEXT keeps ~370 columns
+    under MySQL's row size limit); numbers use the plain BIGINT/DOUBLE
+    mapping, because one week's ranges say little about later seasons."""
+    types = {col: "TEXT" for col in df.select_dtypes(include = "object").columns}
+    types[PLAY_KEY] = "VARCHAR(32)"
+    return types
+
+def ingest_pbp(years, loader, by_week: bool = True, max_cols: int = 52,
+               batch_size: int = None, table_prefix: str = "pbp", scan = scan_pbp) -> dict:
+    """Loads pass/run plays for each season into the {table_prefix}_N side
+    tables. The column layout is fixed by the first batch so every later
+    batch lands in the same tables; columns a later season adds are dropped
+    with a warning and missing ones are sent as NULL.
+    batch_size defaults to BATCH_ROWS, capped by the loader backend's
+    bind-parameter limit for max_cols columns (e.g. 630 rows on SQLite).
+    Returns season -> rows loaded."""
+    if batch_size is None:
+        batch_size = loader.backend.batch_rows(max_cols, BATCH_ROWS)
+    layout = None
+    loaded = {}
+
+    for year in years:
+        start = time.perf_counter()
+        loaded[year] = 0
+        for week, batch in weekly_batches(plays(scan(year)), by_week):
+            if batch.empty:
+                continue
+
+            if layout is None:
+                layout = [PLAY_KEY] + [c for c in batch.columns if c != PLAY_KEY]
+                types = side_table_types(batch)
+            else:
+                extra = batch.columns.difference(layout)
+                if len(extra):
+                    logger.warning("Dropping %s pbp columns not in the table layout: %s",
+                                   len(extra), list(extra))
+                batch = batch.reindex(columns = layout)
+
+            splits = Validation.split_df_rejected(batch, max_cols, PLAY_KEY)
+            del batch
+            for idx, split in enumerate(splits, start = 1):
+                table_name = f"{table_prefix}_{idx}"
+                loader.create_(split, table_name, PLAY_KEY, compact = False,
+                               sql_types = {c: t for c, t in types.items() if c in split.columns})
+                loader.insert_(split, table_name, PLAY_KEY, batch_size = batch_size)
+
+            loaded[year] += len(splits[0])
+            logger.info("Loaded pbp | season=%s | week=%s | rows=%s", year, week, len(splits[0]))
+
+        logger.info("Loaded pbp season %s | rows=%s | seconds=%.2f",
+                    year, loaded[year], time.perf_counter() - start)
+    return loaded
@@ -0,0 +1,442 @@
+"""Module for running the ETL as a graph of stages, outside of Streamlit.
+
+A Pipeline is a set of named stages, each a function of the results of the
+stages it depends on. Stages whose dependencies are done run concurrently
+on a thread pool (extracts wait on the network, and the pandas/Polars/SQL
+work releases the GIL for much of its time), and every stage is timed.
+
+StreamingBackfill instead overlaps the steps across seasons: season N
+loads while N+1 transforms and N+2 downloads, with bounded queues between
+them so only a few seasons are in memory at once.
+
+    python -m src.pipeline current            # this season, changed rows only
+    python -m src.pipeline all --first 1999 --last 2024
+    python -m src.pipeline all --stream --queue-size 1
+"""
+import time
+import queue
+import asyncio
+import inspect
+import logging
+import argparse
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.extract.nflreadpy_extract import get_teams, get_team_stats, get_schedule, get_season, get_seasons
+from src.transform import fe_module
+from src.transform.cleaning import Cleaning
+from src.metrics.metrics_module import StageMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    """Class: one named step of a Pipeline"""
+
+    def __init__(self, name: str, func, deps: tuple):
+        self.name = name
+        self.func = func
+        self.deps = deps
+
+
+class Pipeline:
+    """Class: runs stages in dependency order, independent stages concurrently"""
+
+    def __init__(self, name: str = "pipeline"):
+        self.name = name
+        self.stages = {}
+        self.timings = {}
+        self.wall_time = 0.0
+
+    def add(self, name: str, func, *deps):
+        """Adds a stage called as func(*results of deps); func may be a
+        coroutine function. Dependencies must already be added, which keeps
+        the graph acyclic."""
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' already exists")
+        missing = [d for d in deps if d not in self.stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stages {missing}")
+        self.stages[name] = Stage(name, func, deps)
+        return self
+
+    def _timed(self, stage: Stage, args: list):
+        with StageMetrics(f"{self.name}.{stage.name}", "pipeline") as metrics:
+            if inspect.iscoroutinefunction(stage.func):
+                # async stages run to completion on their own event loop
+                result = metrics.output(asyncio.run(stage.func(*args)))
+            else:
+                result = metrics.output(stage.func(*args))
+        return result, metrics.entry["seconds"]
+
+    def run(self, max_workers: int = 4) -> dict:
+        """Runs every stage and returns stage name -> result.
+        The first failing stage's exception is raised once running stages
+        finish; stages that depend on it are never started."""
+        results, self.timings = {}, {}
+        pending = dict(self.stages)
+        running = {}
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers = max_workers) as pool:
+            while pending or running:
+                ready = [s for s in pending.values() if all(d in results for d in s.deps)]
+                for stage in ready:
+                    del pending[stage.name]
+                    args = [results[d] for d in stage.deps]
+                    running[pool.submit(self._timed, stage, args)] = stage.name
+                    logger.debug("Stage started | pipeline=%s | stage=%s", self.name, stage.name)
+
+                done, _ = wait(running, return_when = FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name], self.timings[name] = future.result()
+                    except Exception:
+                        logger.exception("Stage failed | pipeline=%s | stage=%s", self.name, name)
+                        pending.clear()
+                        raise
+                    logger.info("Stage finished | pipeline=%s | stage=%s | seconds=%.2f",
+                                self.name, name, self.timings[name])
+
+        self.wall_time = time.perf_counter() - start
+        logger.info("Pipeline '%s' finished in %.2fs (%.2fs of stage time)",
+                    self.name, self.wall_time, sum(self.timings.values()))
+        return results
+
+    def timing_frame(self) -> pd.DataFrame:
+        """Stage timings in the order stages finished"""
+        return pd.DataFrame({"stage": list(self.timings), "seconds": list(self.timings.values())})
+
+    def summary(self) -> str:
+        """Plain-text timing table, one line per stage"""
+        width = max([len(name) for name in self.timings] + [5])
+        lines = [f"{'stage':<{width}}  seconds"]
+        lines += [f"{name:<{width}}  {seconds:7.2f}" for name, seconds in self.timings.items()]
+        lines.append(f"{'wall':<{width}}  {self.wall_time:7.2f}  "
+                     f"({sum(self.timings.values()):.2f}s if run one after another)")
+        return "\n".join(lines)
+
+
+# -----------------------------
+# transforms per table, so each can be its own stage
+# -----------------------------
+def _collect(lf, clean: bool) -> pd.DataFrame:
+    from src.transform.polars_module import PolarsCleaning
+    if clean:
+        return PolarsCleaning.downcast(PolarsCleaning.clean(lf).collect()).to_pandas()
+    return lf.collect().to_pandas()
+
+def build_season_table(stats, engine: str = None) -> pd.DataFrame:
+    if (engine or fe_module.transform_engine()) == 'polars':
+        from src.transform import polars_module
+        return _collect(polars_module.season_table(stats), clean = True)
+    return Cleaning.clean(fe_module.season_table(stats))
+
+def build_game_table(schedule, engine: str = None) -> pd.DataFrame:
+    if (engine or fe_module.transform_engine()) == 'polars':
+        from src.transform import polars_module
+        return _collect(polars_module.game_table(schedule), clean = False)
+    return fe_module.game_table(schedule)
+
+def build_facts_table(stats, schedule, engine: str = None) -> pd.DataFrame:
+    if (engine or fe_module.transform_engine()) == 'polars':
+        from src.transform import polars_module
+        return _collect(polars_module.facts_table(stats, schedule), clean = True)
+    return Cleaning.clean(fe_module.facts_table(stats_df = stats, schedule_df = schedule))
+
+def _write_store(load):
+    """Stage writing the loaded facts and games to the Parquet store"""
+    return lambda facts, games, _: load.write_store_({'nfl_facts': facts, 'game': games})
+
+def _per_season(build):
+    """Applies a per-season build to {year: (stats, schedule)}"""
+    return lambda seasons: [build(*frames) for _, frames in sorted(seasons.items())]
+
+
+# -----------------------------
+# pipelines used by the CLI and the Data Pipeline page
+# -----------------------------
+def current_pipeline(load, year: int = None, engine: str = None) -> Pipeline:
+    """This season's tables, sending only rows that changed since the last run"""
+    engine = engine or fe_module.transform_engine()
+    as_polars = engine == 'polars'
+
+    def upsert(table_name, primary_key):
+        def stage(df, *_):
+            # one season cannot bound later seasons' values, so on an empty
+            # database the tables get the plain type mapping (team is complete)
+            load.create_(df = df, table_name = table_name, primary_key = primary_key, compact = table_name == 'team')
+            return load.upsert_changed_(df = df, table_name = table_name, primary_key = primary_key)
+        return stage
+
+    def refresh(facts, counts):
+        if counts['sent']:
+            load.refresh_summaries_(facts)
+        return counts
+
+    def schedule_for(stats):
+        season = year if year is not None else int(stats['season'].max())
+        return get_schedule(season, as_polars = as_polars)
+
+    return (Pipeline("current")
+        .add("extract_teams", get_teams)
+        .add("extract_stats", lambda: get_team_stats(year, as_polars = as_polars))
+        .add("extract_schedule", schedule_for, "extract_stats")
+        .add("team_table", fe_module.team_table, "extract_teams")
+        .add("season_table", lambda stats: build_season_table(stats, engine), "extract_stats")
+        .add("game_table", lambda schedule: build_game_table(schedule, engine), "extract_schedule")
+        .add("facts_table", lambda stats, schedule: build_facts_table(stats, schedule, engine),
+             "extract_stats", "extract_schedule")
+        .add("load_team", upsert('team', 'team_id'), "team_table")
+        .add("load_season", upsert('season', 'season_id'), "season_table")
+        .add("load_game", upsert('game', 'game_id'), "game_table")
+        .add("load_facts", upsert('nfl_facts', 'game_id'),
+             "facts_table", "load_team", "load_season", "load_game")
+        .add("refresh_summaries", refresh, "facts_table", "load_facts")
+        .add("write_store", _write_store(load), "facts_table", "game_table", "load_facts"))
+
+def backfill_pipeline(load, years, engine: str = None, batch_size: int = None, async_load = None) -> Pipeline:
+    """Every table for a range of seasons, loaded in one bulk pass per table.
+    With an AsyncDataLoader as async_load, the tables are created by `load`
+    and then inserted by one async stage whose batches overlap on the pool."""
+    engine = engine or fe_module.transform_engine()
+    as_polars = engine == 'polars'
+    years = list(years)
+
+    def extract_seasons():
+        return {year: (stats, schedule)
+                for year, stats, schedule, _ in get_seasons(years, as_polars = as_polars)}
+
+    def bulk(table_name, primary_key):
+        return lambda frames, *_: load.load_tables_({table_name: (frames, primary_key)},
+                                                    batch_size = batch_size)[table_name]
+
+    pipeline = (Pipeline("backfill")
+        .add("extract_teams", get_teams)
+        .add("extract_seasons", extract_seasons)
+        .add("team_table", fe_module.team_table, "extract_teams")
+        .add("season_table", _per_season(lambda stats, _: build_season_table(stats, engine)), "extract_seasons")
+        .add("game_table", _per_season(lambda _, schedule: build_game_table(schedule, engine)), "extract_seasons")
+        .add("facts_table", _per_season(lambda stats, schedule: build_facts_table(stats, schedule, engine)),
+             "extract_seasons"))
+
+    if async_load is not None:
+        return _async_load_stages(pipeline, load, async_load, batch_size or 1000)
+
+    return (pipeline
+        .add("load_team", bulk('team', 'team_id'), "team_table")
+        .add("load_season", bulk('season', 'season_id'), "season_table")
+        .add("load_game", bulk('game', 'game_id'), "game_table")
+        .add("load_facts", bulk('nfl_facts', 'game_id'),
+             "facts_table", "load_team", "load_season", "load_game")
+        .add("refresh_summaries", lambda facts, _: load.refresh_summaries_(pd.concat(facts, ignore_index = True)),
+             "facts_table", "load_facts")
+        .add("write_store", _write_store(load), "facts_table", "game_table", "load_facts"))
+
+def _async_load_stages(pipeline: Pipeline, load, async_load, batch_size: int) -> Pipeline:
+    """Adds create_tables (sync DDL) and one async load_tables stage:
+    team, season and game are inserted together, then nfl_facts"""
+    tables = [("team", "team_id"), ("season", "season_id"), ("game", "game_id"), ("nfl_facts", "game_id")]
+
+    def create_tables(*frames):
+        for (table_name, primary_key), table in zip(tables, frames):
+            df = pd.concat(table, ignore_index = True) if isinstance(table, list) else table
+            load.create_(df = df, table_name = table_name, primary_key = primary_key)
+
+    async def load_tables(team, seasons, games, facts, _):
+        try:
+            written = await async_load.load_tables_({
+                'team': (team, 'team_id'),
+                'season': (seasons, 'season_id'),
+                'game': (games, 'game_id')
+            }, batch_size = batch_size)
+            written.update(await async_load.load_tables_({'nfl_facts': (facts, 'game_id')}, batch_size = batch_size))
+            return written
+        finally:
+            # pooled connections belong to this stage's event loop
+            await async_load.dispose()
+
+    frames = ("team_table", "season_table", "game_table", "facts_table")
+    return (pipeline
+        .add("create_tables", create_tables, *frames)
+        .add("load_tables", load_tables, *frames, "create_tables")
+        .add("refresh_summaries", lambda facts, _: load.refresh_summaries_(pd.concat(facts, ignore_index = True)),
+             "facts_table", "load_tables")
+        .add("write_store", _write_store(load), "facts_table", "game_table", "load_tables"))
+
+
+# -----------------------------
+# streaming backfill: extract, transform and load overlapped per season
+# -----------------------------
+_DONE = object()
+
+class _Failed:
+    """Carries a worker's exception down the queues to the loading thread"""
+    def __init__(self, error: Exception):
+        self.error = error
+
+def _put(outbox: queue.Queue, item, stop: threading.Event) -> bool:
+    """Blocks until the item fits in the queue; False if stopped first"""
+    while not stop.is_set():
+        try:
+            outbox.put(item, timeout = 0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _drain(inbox: queue.Queue, stop: threading.Event):
+    """Yields queue items until the _DONE marker, or until stopped"""
+    while not stop.is_set():
+        try:
+            item = inbox.get(timeout = 0.1)
+        except queue.Empty:
+            continue
+        if item is _DONE:
+            return
+        yield item
+
+
+def _season_of(item):
+    return item[0] if isinstance(item, tuple) else item
+
+
+class StreamingBackfill(Pipeline):
+    """Class: backfill that overlaps extract, transform and load.
+
+    One thread downloads seasons in order, one transforms them and the
+    calling thread loads them. Each hand-off is a queue of `queue_size`
+    seasons, so at most 2 * queue_size + 3 seasons are held at once
+    (one in each step plus the queued ones), however many are loaded.
+    timings holds the busy time of each step; wall_time shows the overlap."""
+
+    def __init__(self, load, years, engine: str = None, queue_size: int = 1, batch_size: int = None):
+        super().__init__("stream")
+        self.load = load
+        self.years = list(years)
+        self.engine = engine or fe_module.transform_engine()
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.rows = {}
+
+    def extract(self, year):
+        year, stats, schedule, _ = get_season(year, as_polars = self.engine == 'polars')
+        return year, stats, schedule
+
+    def transform(self, item):
+        year, stats, schedule = item
+        return (year, *fe_module.season_tables(stats, schedule, self.engine))
+
+    def load_season(self, item):
+        year, season, game, fact = item
+        if not self.rows:
+            # created from the first season streamed, which cannot bound the
+            # values of later ones (e.g. weekday, stadium), so no compact sizing
+            self.load.create_(df = season, table_name = 'season', primary_key = 'season_id', compact = False)
+            self.load.create_(df = game, table_name = 'game', primary_key = 'game_id', compact = False)
+            self.load.create_(df = fact, table_name = 'nfl_facts', primary_key = 'game_id', compact = False)
+        self.load.insert_(df = season, table_name = 'season', primary_key = 'season_id')
+        self.load.insert_(df = game, table_name = 'game', primary_key = 'game_id', batch_size = self.batch_size)
+        self.load.insert_(df = fact, table_name = 'nfl_facts', primary_key = 'game_id', batch_size = self.batch_size)
+        self.load.refresh_summaries_(fact)
+        self.load.write_store_({'nfl_facts': fact, 'game': game})
+        self.rows[year] = len(fact)
+
+    def _worker(self, name, func, items, outbox, stop):
+        """Applies func to each item and passes the results on, then _DONE"""
+        try:
+            for item in items:
+                if isinstance(item, _Failed):
+                    _put(outbox, item, stop)
+                    return
+                with StageMetrics(f"{self.name}.{name}", "pipeline", season = _season_of(item)) as metrics:
+                    result = metrics.output(func(item))
+                self.timings[name] += metrics.entry["seconds"]
+                if not _put(outbox, result, stop):
+                    return
+        except Exception as e:
+            logger.exception("Stream step failed | step=%s", name)
+            _put(outbox, _Failed(e), stop)
+            return
+        _put(outbox, _DONE, stop)
+
+    def run(self, max_workers: int = None) -> dict:
+        """Loads every season and returns season -> fact rows loaded.
+        The first exception in any step stops the others and is raised."""
+        self.timings = {"extract": 0.0, "transform": 0.0, "load": 0.0}
+        self.rows = {}
+        start = time.perf_counter()
+
+        teams = fe_module.team_table(get_teams())
+        self.load.create_(df = teams, table_name = 'team', primary_key = 'team_id')
+        self.load.insert_(df = teams, table_name = 'team', primary_key = 'team_id')
+
+        extracted = queue.Queue(maxsize = self.queue_size)
+        transformed = queue.Queue(maxsize = self.queue_size)
+        stop = threading.Event()
+        workers = [
+            threading.Thread(target = self._worker, daemon = True,
+                             args = ("extract", self.extract, self.years, extracted, stop)),
+            threading.Thread(target = self._worker, daemon = True,
+                             args = ("transform", self.transform, _drain(extracted, stop), transformed, stop))
+        ]
+        for worker in workers:
+            worker.start()
+
+        try:
+            for item in _drain(transformed, stop):
+                if isinstance(item, _Failed):
+                    raise item.error
+                with StageMetrics(f"{self.name}.load", "pipeline", rows_in = item, season = item[0]) as metrics:
+                    self.load_season(item)
+                self.timings["load"] += metrics.entry["seconds"]
+                logger.info("Streamed season %s | queued: extracted=%s transformed=%s",
+                            item[0], extracted.qsize(), transformed.qsize())
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+        self.wall_time = time.perf_counter() - start
+        logger.info("Streamed %s seasons in %.2fs (%.2fs of step time)",
+                    len(self.rows), self.wall_time, sum(self.timings.values()))
+        return self.rows
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m src.pipeline", description = "Run the NFL ETL pipeline")
+    parser.add_argument("mode", choices = ["current", "all"],
+                        help = "'current': this season's changed rows; 'all': a range of seasons")
+    parser.add_argument("--year", type = int, default = None, help = "season for 'current' (default: current season)")
+    parser.add_argument("--first", type = int, default = 1999, help = "first season for 'all'")
+    parser.add_argument("--last", type = int, default = 2024, help = "last season for 'all'")
+    parser.add_argument("--engine", choices = ["pandas", "polars"], default = None,
+                        help = "transform engine (default: TRANSFORM_ENGINE or pandas)")
+    parser.add_argument("--workers", type = int, default = 4, help = "stages run at once")
+    parser.add_argument("--stream", action = "store_true",
+                        help = "for 'all': overlap extract, transform and load season by season")
+    parser.add_argument("--queue-size", type = int, default = 1,
+                        help = "with --stream: seasons queued between steps")
+    parser.add_argument("--async-load", action = "store_true",
+                        help = "for 'all': insert tables and batches concurrently over an async engine")
+    args = parser.parse_args(argv)
+
+    from src.logs.logging_module import configure_logging
+    configure_logging()
+    from src.load.load_module import DataLoader
+    load = DataLoader()
+    if args.mode == "current":
+        pipeline = current_pipeline(load, args.year, args.engine)
+    elif args.stream:
+        pipeline = StreamingBackfill(load, range(args.first, args.last + 1), args.engine, args.queue_size)
+    else:
+        async_load = None
+        if args.async_load:
+            from src.load.async_load_module import AsyncDataLoader
+            async_load = AsyncDataLoader(max_concurrency = args.workers)
+        pipeline = backfill_pipeline(load, range(args.first, args.last + 1), args.engine, async_load = async_load)
+
+    pipeline.run(max_workers = args.workers)
+    print(pipeline.summary())
+    return pipeline
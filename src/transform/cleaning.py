@@ -1,27 +1,77 @@
 """Module to handle data cleaning and formating"""
 import logging
+import numpy as np
 import pandas as pd
+from src.metrics.metrics_module import measure
 
 logger = logging.getLogger(__name__)
 
+INT_TYPES = (np.int8, np.int16, np.int32, np.int64)
+
 class Cleaning:
     """Module to handle dataframe cleaning and null value handling"""
 
     @staticmethod
-    def clean(df: pd.DataFrame) -> pd.DataFrame:
+    def int_dtype(low, high):
+        """Returns the smallest signed integer type holding [low, high]"""
+        for dtype in INT_TYPES:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return dtype
+        return np.int64
+
+    @staticmethod
+    def numeric_dtypes(df: pd.DataFrame) -> dict:
         """
-        Cleans the DataFrame by replacing NaN values depending on column type:
-        - Numeric columns (int/float): fill NaN with -1, then convert to int
-        - Object/string columns: fill NaN with 'null'
-        Returns a new cleaned DataFrame.
+        Picks the smallest safe dtype for each (NaN-free) numeric column:
+        - integer columns → smallest int type
+        - float columns → float32 if that loses nothing, otherwise float64.
+          Floats stay floats even when a batch holds only whole numbers, since
+          a later batch of the same column may not
         """
-        df = df.copy()
+        lows, highs = df.min(), df.max()
+        floats = df.select_dtypes(include="float")
+        in_range = (floats.abs() <= np.finfo(np.float32).max).all()
+        exact = (floats.astype(np.float32).astype(np.float64) == floats).all() & in_range
 
+        dtypes = {}
         for col in df.columns:
-            if pd.api.types.is_numeric_dtype(df[col]):
-                # Fill numeric NaNs with -1 and convert to int
-                df[col] = df[col].fillna(-1).astype(int)
+            if col in floats.columns:
+                dtypes[col] = np.float32 if exact[col] else np.float64
             else:
-                # Fill non-numeric NaNs with 'null'
-                df[col] = df[col].fillna("null")
+                dtypes[col] = Cleaning.int_dtype(lows[col], highs[col])
+        return dtypes
+
+    @staticmethod
+    @measure(step = "transform")
+    def clean(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """
+        Cleans the DataFrame by replacing NaN values depending on column type,
+        one vectorized pass per dtype group:
+        - Numeric columns: fill NaN with -1, then downcast (see numeric_dtypes),
+          so fractional stats stay floats
+        - Boolean columns: left as they are
+        - Object/string columns: fill NaN with 'null'
+        Returns a new cleaned DataFrame, or the same DataFrame modified in
+        place when inplace=True.
+        """
+        if logger.isEnabledFor(logging.INFO):
+            before = df.memory_usage(deep=True).sum()
+
+        # A shallow copy is enough: whole columns are replaced, never written into
+        if not inplace:
+            df = df.copy(deep=False)
+
+        numeric_cols = df.select_dtypes(include="number").columns
+        other_cols = df.columns.difference(numeric_cols.union(df.select_dtypes(include="bool").columns), sort=False)
+
+        if len(numeric_cols):
+            numeric = df[numeric_cols].fillna(-1)
+            df[numeric_cols] = numeric.astype(Cleaning.numeric_dtypes(numeric))
+        if len(other_cols):
+            df[other_cols] = df[other_cols].fillna("null")
+
+        if logger.isEnabledFor(logging.INFO):
+            after = df.memory_usage(deep=True).sum()
+            logger.info("Cleaned %s rows | memory before=%s bytes | after=%s bytes", len(df), before, after)
         return df
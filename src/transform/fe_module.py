@@ -1,104 +1,149 @@
 import os
+import logging
+import functools
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 from src.transform.validation import Validation
+from src.transform.cleaning import Cleaning
+from src.metrics.metrics_module import measure
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
-team_cols = os.getenv('TEAM_COLS').split('|')
-fact_cols = os.getenv('FACT_COLS').split('|')
-schedule_home = os.getenv("SCHEDULE_HOME").split('|')
-schedule_away = os.getenv("SCHEDULE_AWAY").split('|')
-game_cols = os.getenv("GAME_COLS").split('|')
 
+# Column lists are '|'-separated env vars, read on first use; they are
+# also reachable as module attributes, e.g. fe_module.team_cols
+COLUMN_SETTINGS = {
+    "team_cols": "TEAM_COLS",
+    "fact_cols": "FACT_COLS",
+    "schedule_home": "SCHEDULE_HOME",
+    "schedule_away": "SCHEDULE_AWAY",
+    "game_cols": "GAME_COLS"
+}
+
+@functools.cache
+def columns(name: str) -> list:
+    """Returns the column list configured for `name` (a COLUMN_SETTINGS key)"""
+    value = os.getenv(COLUMN_SETTINGS[name])
+    if value is None:
+        raise ValueError(f"{COLUMN_SETTINGS[name]} is not set in the environment")
+    return value.split('|')
+
+def __getattr__(name):
+    if name in COLUMN_SETTINGS:
+        return columns(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+@measure(step = "transform")
 def team_table(df):
     t_table = df.rename(columns = {
         'team_abbr': 'team_id',
         'team_id': 'ignore'
     })
 
-    valid, rejected = Validation.valid_columns(t_table, team_cols)
+    valid, rejected = Validation.valid_columns(t_table, columns("team_cols"))
 
     return valid
 
+@measure(step = "transform")
 def season_table(df):
     s_table = (df[['season']].drop_duplicates())
     s_table["num_games"] = s_table["season"].apply(lambda x: 16 if x < 2021 else 17)
 
     s_table_rename = s_table.rename(columns = {'season': 'season_id'})
-    print(s_table_rename)
+    logger.debug("Season table built | seasons=%s", len(s_table_rename))
     return s_table_rename
 
+@measure(step = "transform")
 def game_table(df):
     g_table = df.rename(columns = {
         'season': 'season_id'
     })
-    valid, rejected = Validation.valid_columns(g_table, game_cols)
+    valid, rejected = Validation.valid_columns(g_table, columns("game_cols"))
     valid['game_id'] = valid['season_id'].astype(str) + '_' + valid['week'].astype(str) + '_' + valid['home_team']
 
 
     return valid
 
+@measure(step = "transform")
 def facts_table(stats_df, schedule_df):
     if stats_df is None or schedule_df is None:
         raise ValueError("stats_df and schedule_df cannot be None")
 
     # -----------------------------
-    # Build team_games from schedule
+    # Build team_games from schedule: one row per team per game,
+    # home rows first then away rows, built column-wise
     # -----------------------------
-    home_games = schedule_df[schedule_home].copy()
-    home_games['team_id'] = home_games['home_team']
-    home_games['points_scored'] = home_games['home_score']
-    home_games['points_allowed'] = home_games['away_score']
-
-    away_games = schedule_df[schedule_away].copy()
-    away_games['team_id'] = away_games['away_team']
-    away_games['points_scored'] = away_games['away_score']
-    away_games['points_allowed'] = away_games['home_score']
-
-    team_games = pd.concat([home_games, away_games], ignore_index=True)
+    empty = np.full(len(schedule_df), np.nan)
+    schedule_home, schedule_away = columns("schedule_home"), columns("schedule_away")
+    team_games = pd.DataFrame({
+        col: np.concatenate([
+            schedule_df[col].to_numpy() if col in schedule_home else empty,
+            schedule_df[col].to_numpy() if col in schedule_away else empty
+        ])
+        for col in dict.fromkeys(schedule_home + schedule_away)
+    })
+    team_games['team_id'] = np.concatenate([schedule_df['home_team'].to_numpy(), schedule_df['away_team'].to_numpy()])
+    team_games['points_scored'] = np.concatenate([schedule_df['home_score'].to_numpy(), schedule_df['away_score'].to_numpy()])
+    team_games['points_allowed'] = np.concatenate([schedule_df['away_score'].to_numpy(), schedule_df['home_score'].to_numpy()])
 
     team_games = team_games.rename(columns={
         'season': 'season_id'
     })
 
     # -----------------------------
-    # Prepare team_stats
+    # Prepare team_stats, keeping only the columns the fact table uses
     # -----------------------------
     team_stats = stats_df.rename(columns={
         'season': 'season_id',
-        'team': 'team_id'
+        'team': 'team_id',
+        'attempts': 'pass_attempts',
+        'carries': 'rush_attempts',
+        'passing_yards': 'pass_yards',
+        'rushing_yards': 'rush_yards',
+        'passing_tds': 'pass_tds',
+        'rushing_tds': 'rush_tds'
     })
+    keys = ['season_id', 'week', 'team_id']
+    fact_cols = columns("fact_cols")
+    wanted = [c for c in team_stats.columns if c in keys or (c in fact_cols and c not in team_games.columns)]
 
-    f_table = team_stats.merge(
+    f_table = team_stats[wanted].merge(
         team_games,
-        on=['season_id','week','team_id'],
+        on=keys,
         how='left'
     )
 
-    f_table['game_id'] = (
-        f_table['season_id'].astype(str) + "_" +
-        f_table['week'].astype(str) + "_" +
-        f_table['team_id'].fillna('')
+    f_table['game_id'] = f_table['season_id'].astype(str).str.cat(
+        [f_table['week'].astype(str), f_table['team_id'].fillna('')], sep="_"
     )
 
-    f_table['result'] = f_table.apply(
-        lambda row: 'W' if row['points_scored'] > row['points_allowed']
-        else 'L' if row['points_scored'] < row['points_allowed']
-        else 'T',
-        axis=1
-    )
+    scored = f_table['points_scored'].to_numpy(dtype=float, na_value=np.nan)
+    allowed = f_table['points_allowed'].to_numpy(dtype=float, na_value=np.nan)
+    f_table['result'] = np.select([scored > allowed, scored < allowed], ['W', 'L'], default='T')
 
-    print(f_table)
-
-    final_table = f_table.rename(columns={
-        'attempts': 'pass_attempts',
-        'carries': 'rush_attempts',
-        'passing_yards': 'pass_yards',
-        'rushing_yards': 'rush_yards',
-        'passing_tds': 'pass_tds',
-        'rushing_tds': 'rush_tds'
-    })
-
-    valid, rejected = Validation.valid_columns(final_table, fact_cols)
+    valid, rejected = Validation.valid_columns(f_table, fact_cols)
 
     return valid
+
+def transform_engine():
+    """Transform engine chosen by the TRANSFORM_ENGINE env var: 'pandas' (default) or 'polars'"""
+    return os.getenv('TRANSFORM_ENGINE', 'pandas').lower()
+
+@measure(step = "transform")
+def season_tables(stats_df, schedule_df, engine = None):
+    """Builds the cleaned season table, game table and cleaned fact table
+    for a batch of team stats and schedule. Always returns pandas frames.
+    engine: 'pandas' or 'polars' (default from transform_engine())"""
+    engine = engine or transform_engine()
+    if engine == 'polars':
+        from src.transform import polars_module
+        return polars_module.season_tables(stats_df, schedule_df)
+    if engine != 'pandas':
+        raise ValueError(f"Unknown transform engine '{engine}'")
+
+    g_table = game_table(schedule_df)
+    s_table = season_table(stats_df)
+    f_table = facts_table(stats_df = stats_df, schedule_df = schedule_df)
+    return Cleaning.clean(s_table), g_table, Cleaning.clean(f_table)
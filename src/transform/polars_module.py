@@ -0,0 +1,190 @@
+"""Polars (lazy) versions of the fe_module, Cleaning and Validation transforms.
+
+Every function accepts a Polars DataFrame, LazyFrame or pandas DataFrame
+and returns a LazyFrame, so a whole season can be described as one query
+plan and collected once, letting Polars fuse the renames, selects and joins.
+"""
+import logging
+import numpy as np
+import pandas as pd
+import polars as pl
+from src.transform import fe_module
+from src.transform.cleaning import Cleaning
+from src.metrics.metrics_module import measure
+
+logger = logging.getLogger(__name__)
+
+STAT_RENAMES = {
+    'season': 'season_id',
+    'team': 'team_id',
+    'attempts': 'pass_attempts',
+    'carries': 'rush_attempts',
+    'passing_yards': 'pass_yards',
+    'rushing_yards': 'rush_yards',
+    'passing_tds': 'pass_tds',
+    'rushing_tds': 'rush_tds'
+}
+
+NUMPY_TO_POLARS = {
+    np.int8: pl.Int8,
+    np.int16: pl.Int16,
+    np.int32: pl.Int32,
+    np.int64: pl.Int64,
+    np.float32: pl.Float32,
+    np.float64: pl.Float64
+}
+
+def lazy(df) -> pl.LazyFrame:
+    """Returns df as a LazyFrame, converting pandas input"""
+    if isinstance(df, pl.LazyFrame):
+        return df
+    if isinstance(df, pd.DataFrame):
+        return pl.from_pandas(df).lazy()
+    return df.lazy()
+
+def _names(lf: pl.LazyFrame) -> list:
+    return lf.collect_schema().names()
+
+
+class PolarsValidation:
+    """Lazy counterpart of Validation"""
+
+    @staticmethod
+    def valid_rows(df, checked_column: str, row_values: list) -> pl.LazyFrame:
+        """ Validates the rows to add only pass and run play types"""
+        lf = lazy(df).filter(pl.col(checked_column).is_in(row_values))
+        # Replace 'JAC' with 'JAX' in posteam if the column exists
+        if "posteam" in _names(lf):
+            lf = lf.with_columns(pl.col("posteam").replace({"JAC": "JAX"}))
+        return lf
+
+    @staticmethod
+    def valid_columns(df, wanted_columns: list):
+        """ Validates the columns to add only specified columns"""
+        lf = lazy(df)
+        available = _names(lf)
+        valid_columns = [col for col in wanted_columns if col in available]
+        remaining = [col for col in available if col not in valid_columns]
+        logger.info(
+            "Validating columns (polars) | requested=%s | chosen_cols=%s | rejected_cols=%s",
+            len(wanted_columns),
+            len(valid_columns),
+            len(remaining)
+        )
+        return lf.select(valid_columns), lf.select(remaining)
+
+
+class PolarsCleaning:
+    """Lazy counterpart of Cleaning"""
+
+    @staticmethod
+    def clean(df) -> pl.LazyFrame:
+        """
+        Replaces null values depending on column type:
+        - Numeric columns (int/float): fill null/NaN with -1
+        - String columns: fill null with 'null'
+        Downcasting needs the data, so it is done by downcast() after collecting.
+        """
+        lf = lazy(df)
+        exprs = []
+        for col, dtype in lf.collect_schema().items():
+            if dtype.is_float():
+                exprs.append(pl.col(col).fill_nan(-1).fill_null(-1))
+            elif dtype.is_numeric():
+                exprs.append(pl.col(col).fill_null(-1))
+            elif dtype == pl.String:
+                exprs.append(pl.col(col).fill_null("null"))
+        return lf.with_columns(exprs)
+
+    @staticmethod
+    def downcast(df: pl.DataFrame) -> pl.DataFrame:
+        """Casts numeric columns to the same dtypes Cleaning.clean picks"""
+        numeric = [col for col, dtype in df.schema.items() if dtype.is_numeric()]
+        if not numeric or df.is_empty():
+            return df
+        dtypes = Cleaning.numeric_dtypes(df.select(numeric).to_pandas())
+        return df.with_columns(pl.col(col).cast(NUMPY_TO_POLARS[dtype]) for col, dtype in dtypes.items())
+
+
+def team_table(df) -> pl.LazyFrame:
+    t_table = lazy(df).rename({
+        'team_abbr': 'team_id',
+        'team_id': 'ignore'
+    }, strict = False)
+
+    valid, rejected = PolarsValidation.valid_columns(t_table, fe_module.team_cols)
+    return valid
+
+def season_table(df) -> pl.LazyFrame:
+    return (
+        lazy(df)
+        .select(pl.col('season').cast(pl.Int64))
+        .unique(maintain_order = True)
+        .with_columns(num_games = pl.when(pl.col('season') < 2021).then(16).otherwise(17).cast(pl.Int64))
+        .rename({'season': 'season_id'})
+    )
+
+def game_table(df) -> pl.LazyFrame:
+    g_table = lazy(df).rename({'season': 'season_id'})
+    valid, rejected = PolarsValidation.valid_columns(g_table, fe_module.game_cols)
+    return valid.with_columns(
+        game_id = pl.concat_str(['season_id', 'week', 'home_team'], separator = '_')
+    )
+
+def facts_table(stats_df, schedule_df) -> pl.LazyFrame:
+    if stats_df is None or schedule_df is None:
+        raise ValueError("stats_df and schedule_df cannot be None")
+
+    schedule = lazy(schedule_df)
+    keys = ['season_id', 'week', 'team_id']
+
+    # One row per team per game; columns missing on one side become null
+    home_games = schedule.select(
+        *fe_module.schedule_home,
+        team_id = pl.col('home_team'),
+        points_scored = pl.col('home_score'),
+        points_allowed = pl.col('away_score')
+    )
+    away_games = schedule.select(
+        *fe_module.schedule_away,
+        team_id = pl.col('away_team'),
+        points_scored = pl.col('away_score'),
+        points_allowed = pl.col('home_score')
+    )
+    team_games = (
+        pl.concat([home_games, away_games], how = 'diagonal_relaxed')
+        .rename({'season': 'season_id'})
+        .with_columns(pl.col('season_id').cast(pl.Int64), pl.col('week').cast(pl.Int64))
+    )
+    game_columns = _names(team_games)
+
+    team_stats = lazy(stats_df).rename(STAT_RENAMES, strict = False)
+    wanted = [c for c in _names(team_stats)
+              if c in keys or (c in fe_module.fact_cols and c not in game_columns)]
+
+    f_table = (
+        team_stats.select(wanted)
+        .with_columns(pl.col('season_id').cast(pl.Int64), pl.col('week').cast(pl.Int64))
+        .join(team_games, on = keys, how = 'left')
+        .with_columns(
+            game_id = pl.concat_str(['season_id', 'week', pl.col('team_id').fill_null('')], separator = '_'),
+            result = pl.when(pl.col('points_scored') > pl.col('points_allowed')).then(pl.lit('W'))
+                       .when(pl.col('points_scored') < pl.col('points_allowed')).then(pl.lit('L'))
+                       .otherwise(pl.lit('T'))
+        )
+    )
+
+    valid, rejected = PolarsValidation.valid_columns(f_table, fe_module.fact_cols)
+    return valid
+
+@measure(step = "transform")
+def season_tables(stats_df, schedule_df):
+    """Plans the cleaned season, game and fact tables and collects them in
+    one pass, returning pandas DataFrames for the load step"""
+    season = PolarsCleaning.clean(season_table(stats_df))
+    game = game_table(schedule_df)
+    fact = PolarsCleaning.clean(facts_table(stats_df, schedule_df))
+
+    season, game, fact = pl.collect_all([season, game, fact])
+    return (PolarsCleaning.downcast(season).to_pandas(), game.to_pandas(),
+            PolarsCleaning.downcast(fact).to_pandas())
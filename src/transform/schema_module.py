@@ -0,0 +1,175 @@
+"""Module for the local schema registry used to validate uploaded files.
+
+schema_registry.json (next to this module) holds a version number and, for
+each dataset (team_stats, schedule), its columns with a dtype kind
+(integer, float, boolean, string, datetime) and a nullable flag, plus the
+local example file shown on the Data Pipeline page. It is read once per
+process.
+
+Regenerate it from sample files after the upstream format changes; the
+version is bumped:
+    python -m src.transform.schema_module \\
+        team_stats=2024_team_stats_example.csv,2025_team_stats_demo.csv \\
+        schedule=2024_schedule_example.csv,2025_schedule_demo.csv
+"""
+import os
+import sys
+import json
+import logging
+import functools
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_PATH = os.path.join(os.path.dirname(__file__), "schema_registry.json")
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Kinds a column may arrive as for each registered kind: integers read as
+# floats when a CSV column has blanks, and a string column (e.g. the
+# ';'-separated fg_*_list columns) reads as a number when every value is one
+COMPATIBLE = {
+    "integer": {"integer", "float"},
+    "float": {"float", "integer"},
+    "boolean": {"boolean"},
+    "string": {"string", "integer", "float", "boolean", "datetime"},
+    "datetime": {"datetime", "string"}
+}
+
+def dtype_kind(series: pd.Series) -> str:
+    """Kind of a column: integer, float, boolean, string or datetime"""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "integer"
+    if pd.api.types.is_float_dtype(dtype):
+        return "float"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    return "string"
+
+def infer_schema(*samples: pd.DataFrame) -> list:
+    """Column entries from sample frames with the same columns. A column
+    that is empty in a sample takes its kind from the other samples."""
+    columns = []
+    for name in samples[0].columns:
+        present = [s[name] for s in samples if s[name].notna().any()]
+        kinds = {dtype_kind(s) for s in present} or {"string"}
+        kind = "float" if kinds == {"integer", "float"} else kinds.pop() if len(kinds) == 1 else "string"
+        columns.append({"name": name, "dtype": kind,
+                        "nullable": any(s[name].isna().any() for s in samples)})
+    return columns
+
+
+# -----------------------------
+# registry
+# -----------------------------
+@functools.cache
+def load_registry(path: str = REGISTRY_PATH) -> dict:
+    """The registry file, read once per process"""
+    with open(path, encoding = "utf-8") as f:
+        registry = json.load(f)
+    logger.info("Loaded schema registry v%s | datasets=%s", registry["version"], sorted(registry["schemas"]))
+    return registry
+
+def get_schema(name: str, path: str = REGISTRY_PATH) -> dict:
+    """Registry entry of a dataset: {'columns': [...], 'example': file}"""
+    schemas = load_registry(path)["schemas"]
+    if name not in schemas:
+        raise ValueError(f"No schema registered for '{name}'")
+    return schemas[name]
+
+def example_path(name: str, path: str = REGISTRY_PATH) -> str:
+    """Local example file of a dataset (stored relative to the repository root)"""
+    return os.path.join(ROOT, get_schema(name, path)["example"])
+
+
+class SchemaReport:
+    """Class: result of checking a frame against a registered schema.
+    Missing, unexpected or mistyped columns make it fail; empty values in
+    columns the samples never left empty are only reported, since the
+    samples cannot show every column that may be blank."""
+
+    def __init__(self, name: str, missing: list, unexpected: list, mismatched: dict, null_violations: list):
+        self.name = name
+        self.missing = missing
+        self.unexpected = unexpected
+        self.mismatched = mismatched
+        self.null_violations = null_violations
+
+    @property
+    def ok(self) -> bool:
+        return not (self.missing or self.unexpected or self.mismatched)
+
+    def describe(self) -> str:
+        """One line per kind of problem, empty when the frame is valid"""
+        lines = []
+        if self.missing:
+            lines.append(f"missing columns: {', '.join(self.missing)}")
+        if self.unexpected:
+            lines.append(f"unexpected columns: {', '.join(self.unexpected)}")
+        if self.mismatched:
+            lines.append("type mismatches: " + ", ".join(
+                f"{col} (expected {expected}, got {found})" for col, (expected, found) in self.mismatched.items()))
+        if self.null_violations:
+            lines.append(f"empty values in required columns: {', '.join(self.null_violations)}")
+        return "\n".join(f"{self.name} {line}" for line in lines)
+
+
+def validate_frame(df: pd.DataFrame, name: str, path: str = REGISTRY_PATH) -> SchemaReport:
+    """Checks a frame's columns, dtype kinds and nulls against the
+    registered schema of `name`"""
+    expected = {col["name"]: col for col in get_schema(name, path)["columns"]}
+    present = set(df.columns)
+
+    missing = [col for col in expected if col not in present]
+    unexpected = [col for col in df.columns if col not in expected]
+    mismatched, null_violations = {}, []
+    for col in df.columns:
+        spec = expected.get(col)
+        if spec is None:
+            continue
+        series = df[col]
+        nulls = series.isna()
+        if nulls.all():
+            # an empty column carries no type; only nullability applies
+            if len(series) and not spec["nullable"]:
+                null_violations.append(col)
+            continue
+        found = dtype_kind(series)
+        if found not in COMPATIBLE[spec["dtype"]]:
+            mismatched[col] = (spec["dtype"], found)
+        elif spec["dtype"] == "integer" and found == "float" and (series[~nulls] % 1 != 0).any():
+            mismatched[col] = ("integer", "float")
+        if not spec["nullable"] and nulls.any():
+            null_violations.append(col)
+
+    report = SchemaReport(name, missing, unexpected, mismatched, null_violations)
+    if report.describe():
+        logger.warning("Schema check %s | %s", "passed with warnings" if report.ok else "failed", report.describe().replace("\n", " | "))
+    return report
+
+
+def main(argv = None):
+    """Rebuilds the registry from name=file[,file...] arguments"""
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        registry = load_registry.__wrapped__(REGISTRY_PATH)
+    except FileNotFoundError:
+        registry = {"version": 0, "schemas": {}}
+
+    for argument in argv:
+        name, _, files = argument.partition("=")
+        files = files.split(",")
+        samples = [pd.read_csv(f) for f in files]
+        registry["schemas"][name] = {"example": files[0], "columns": infer_schema(*samples)}
+    registry["version"] += 1
+
+    with open(REGISTRY_PATH, "w", encoding = "utf-8") as f:
+        json.dump(registry, f, indent = 2)
+        f.write("\n")
+    print(f"Wrote schema registry v{registry['version']} to {REGISTRY_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -47,12 +47,15 @@ class Validation:
         """
         Splits a DataFrame into multiple DataFrames with at most `max_cols`
         columns each. Ensures 'posteam' exists in every split.
+        An existing `primary_id_col` is kept as the key, so splits of
+        different batches still join back together; otherwise a sequential
+        id is added.
         Returns: List[pd.DataFrame]
         """
-        df = df.copy()
-
-    # Append sequential primary ID column
-        df[primary_id_col] = range(1, len(df) + 1)
+        if primary_id_col not in df.columns:
+            df = df.copy()
+            # Append sequential primary ID column
+            df[primary_id_col] = range(1, len(df) + 1)
 
         # Prepare chunking
         other_cols = [c for c in df.columns if c != primary_id_col]
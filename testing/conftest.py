@@ -0,0 +1,6 @@
+import pytest
+
+@pytest.fixture(autouse=True)
+def metrics_in_tmp_path(tmp_path, monkeypatch):
+    """Keeps stage metrics written by the tests out of the working directory"""
+    monkeypatch.setenv("PIPELINE_METRICS_FILE", str(tmp_path / "metrics.jsonl"))
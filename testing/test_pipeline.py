@@ -1,12 +1,34 @@
+import io
+import os
+import sys
+import json
+import logging
+import asyncio
+import threading
+import subprocess
+import pytest
 import numpy as np
 import pandas as pd
+import polars as pl
 from src.extract.extract_module import DataExtractor
-from src.extract.nflreadpy_extract import get_pbp, get_team_stats, get_schedule, get_teams
-from src.load.load_module import DataLoader
+from src.extract.cache_module import ParquetCache
+from src.extract.nflreadpy_extract import get_pbp, get_team_stats, get_schedule, get_teams, get_seasons
+from src.load.load_module import DataLoader, table_version
+from src.load.async_load_module import AsyncDataLoader
+from src.load.parquet_store_module import SeasonStore
+from src.load.backend_module import SQLiteBackend
 from unittest.mock import MagicMock, patch
 from src.transform.validation import Validation
-from src.transform.fe_module import team_table, season_table, game_table, facts_table
+from src.transform.fe_module import team_table, season_table, game_table, facts_table, season_tables
+from src.transform import polars_module, schema_module
 from src.transform.cleaning import Cleaning
+from src.db import sql_queries_module as queries
+from src.pipeline import pbp_module, runner_module
+from src.metrics import metrics_module
+from src.logs import logging_module
+from src.db import engine as db_engine
+from benchmarks import import_times
+from sqlalchemy import create_engine, text, exc as sqlalchemy_exc
 
 """Testing the pipeline"""
 
@@ -29,6 +51,31 @@ def test_extract_invalid_file():
     df = extract.extract_data(FILE_PATH, FILE_PATH)
     assert df is None
 
+def test_extract_chunks_csv():
+    data = io.StringIO("season,week\n2009,1\n2009,2\n2010,1\n")
+    chunks = list(DataExtractor.extract_chunks(data, "stats.csv", chunksize=2))
+    assert [len(c) for c in chunks] == [2, 1]
+    assert chunks[1]["season"].tolist() == [2010]
+
+def test_extract_chunks_json_lines():
+    data = io.StringIO('{"season": 2009, "week": 1}\n{"season": 2009, "week": 2}\n{"season": 2010, "week": 1}\n')
+    chunks = list(DataExtractor.extract_chunks(data, "stats.json", chunksize=2))
+    assert [len(c) for c in chunks] == [2, 1]
+    whole = io.StringIO(pd.DataFrame({"season": [2009, 2010, 2011]}).to_json())
+    chunks = list(DataExtractor.extract_chunks(whole, "stats.json", chunksize=2))
+    assert [len(c) for c in chunks] == [2, 1]
+
+def test_extract_chunks_fails_fast_on_schema():
+    data = io.StringIO("season,week\n2009,1\n2009,2\n2010,1\n")
+    validate = MagicMock(return_value=False)
+    chunks = DataExtractor.extract_chunks(data, "stats.csv", chunksize=2, validate=validate)
+    try:
+        next(chunks)
+        assert False, "Expected ValueError for invalid schema"
+    except ValueError as e:
+        assert "does not match the expected schema" in str(e)
+    assert validate.call_count == 1
+
 def test_get_pbp():
     df = get_pbp(2009)
     assert not df.empty
@@ -45,6 +92,57 @@ def test_get_teams():
     df = get_teams()
     assert not df.empty
 
+@patch("src.extract.nflreadpy_extract.get_schedule")
+@patch("src.extract.nflreadpy_extract.get_team_stats")
+def test_get_seasons(mock_stats, mock_schedule):
+    mock_stats.side_effect = lambda year, as_polars=False: pd.DataFrame({"season": [year]})
+    mock_schedule.side_effect = lambda year, as_polars=False: pd.DataFrame({"season": [year, year]})
+    results = list(get_seasons(range(2009, 2013), max_workers=2))
+    assert sorted(r[0] for r in results) == [2009, 2010, 2011, 2012]
+    for year, stats, schedule, seconds in results:
+        assert stats["season"].tolist() == [year]
+        assert len(schedule) == 2
+        assert seconds >= 0
+
+def test_cache_closed_season_never_expires(tmp_path):
+    cache = ParquetCache(str(tmp_path), ttl=0, current_season=2025)
+    cache.put("team_stats", 2009, pl.DataFrame({"season": [2009]}))
+    cache.put("team_stats", 2025, pl.DataFrame({"season": [2025]}))
+    old = 0
+    os.utime(cache.path("team_stats", 2009), (old, old))
+    os.utime(cache.path("team_stats", 2025), (old, old))
+    assert cache.get("team_stats", 2009)["season"].to_list() == [2009]
+    assert cache.get("team_stats", 2025) is None
+
+def test_cache_fetch_only_loads_on_miss(tmp_path):
+    cache = ParquetCache(str(tmp_path), current_season=2025)
+    loader = MagicMock(return_value=pl.DataFrame({"season": [2010]}))
+    first = cache.fetch("schedule", 2010, loader)
+    second = cache.fetch("schedule", 2010, loader)
+    assert loader.call_count == 1
+    assert first.equals(second)
+
+def test_cache_evicts_least_recently_read(tmp_path):
+    cache = ParquetCache(str(tmp_path), current_season=2025)
+    for year in (2009, 2010, 2011):
+        cache.put("pbp", year, pl.DataFrame({"season": [year] * 100}))
+    os.utime(cache.path("pbp", 2009), (1, 1))
+    os.utime(cache.path("pbp", 2010), (2, 2))
+    cache.max_bytes = os.path.getsize(cache.path("pbp", 2011)) * 2
+    cache.evict()
+    assert not os.path.exists(cache.path("pbp", 2009))
+    assert os.path.exists(cache.path("pbp", 2010))
+    assert os.path.exists(cache.path("pbp", 2011))
+
+def test_cache_scan_reads_lazily(tmp_path):
+    cache = ParquetCache(str(tmp_path), current_season=2025)
+    loader = MagicMock(return_value=pl.DataFrame({"week": [1, 2, 2]}))
+    cache.scan("pbp", 2010, loader)
+    lf = cache.scan("pbp", 2010, loader)
+    assert loader.call_count == 1
+    assert isinstance(lf, pl.LazyFrame)
+    assert lf.filter(pl.col("week") == 2).collect().height == 2
+
 def test_validate_rows():
     validate = Validation()
     df = pd.DataFrame({
@@ -83,6 +181,59 @@ def test_split_df_rejected():
         assert 'posteam' in split.columns
     for split in splits:
         assert split.shape[1] <= 3
+
+def test_split_df_rejected_keeps_existing_key():
+    df = pd.DataFrame({"play_key": ["g_1", "g_7"], "a": [1, 2], "b": [3, 4]})
+    splits = Validation.split_df_rejected(df, max_cols=2, primary_id_col="play_key")
+    assert [list(split.columns) for split in splits] == [["play_key", "a"], ["play_key", "b"]]
+    assert splits[1]["play_key"].tolist() == ["g_1", "g_7"]
+    assert list(df.columns) == ["play_key", "a", "b"]
+
+def _pbp_season(year, extra=None):
+    columns = {
+        "game_id": [f"{year}_01_A_B", f"{year}_01_A_B", f"{year}_02_C_D", f"{year}_02_C_D"],
+        "play_id": [1.0, 2.0, 1.0, 2.0],
+        "week": [1, 1, 2, 2],
+        "play_type": ["pass", "kickoff", "run", "pass"],
+        "posteam": ["JAC", "A", "C", "D"],
+        "desc": ["x" * 300, "kick", "run", "pass"],
+        "yards_gained": [5.0, None, 3.0, 12.0]
+    }
+    columns.update(extra or {})
+    return pl.DataFrame(columns).lazy()
+
+def test_ingest_pbp_loads_weeks_into_keyed_side_tables():
+    load = MagicMock()
+    scan = lambda year: _pbp_season(year, {"new_stat": [1, 2, 3, 4]} if year == 2001 else None)
+    loaded = pbp_module.ingest_pbp([2000, 2001], load, max_cols=4, batch_size=10, scan=scan)
+
+    assert loaded == {2000: 3, 2001: 3}
+    # one insert per side table per week
+    assert load.insert_.call_count == 2 * 2 * 3
+    tables = {}
+    for call in load.insert_.call_args_list:
+        split, table_name, key = call.args
+        assert key == "play_key" and call.kwargs["batch_size"] == 10
+        tables.setdefault(table_name, set()).add(tuple(split.columns))
+    # every batch lands in the same layout, including the season with an extra column
+    assert all(len(layouts) == 1 for layouts in tables.values())
+    assert sorted(tables) == ["pbp_1", "pbp_2", "pbp_3"]
+
+    first, second = (call.args[0] for call in load.insert_.call_args_list[:2])
+    assert first["play_key"].tolist() == ["2000_01_A_B_1"]
+    assert second["posteam"].tolist() == ["JAX"]
+    create = load.create_.call_args_list[0]
+    assert create.kwargs["compact"] is False
+    assert create.kwargs["sql_types"]["play_key"] == "VARCHAR(32)"
+
+def test_ingest_pbp_batches_fit_the_bind_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(SQLiteBackend, "max_params", 8)
+    load = DataLoader(create_engine(f"sqlite:///{tmp_path / 'pbp.db'}"))
+    assert load.backend.batch_rows(52, pbp_module.BATCH_ROWS) == 1
+    assert pbp_module.ingest_pbp([2000], load, max_cols=4, scan=_pbp_season) == {2000: 3}
+    keys = [pd.read_sql(f"SELECT play_key FROM pbp_{i} ORDER BY play_key", load.engine)["play_key"].tolist()
+            for i in (1, 2)]
+    assert len(keys[0]) == 3 and keys[0] == keys[1]
     
 def test_clean():
     cleaner = Cleaning()
@@ -92,10 +243,29 @@ def test_clean():
     })
     cleaned = cleaner.clean(df)
     assert cleaned["numeric_col"].isna().sum() == 0
-    assert cleaned["numeric_col"].dtype == "int64"
+    assert cleaned["numeric_col"].dtype == "float32"
     assert cleaned["string_col"].isna().sum() == 0
-    assert cleaned["numeric_col"].tolist() == [1, -1, 3]
+    assert cleaned["numeric_col"].tolist() == [1.5, -1.0, 3.0]
     assert cleaned["string_col"].tolist() == ["a", "null", "c"]
+    assert df["numeric_col"].isna().sum() == 1
+
+def test_clean_downcasts_numeric_columns():
+    df = pd.DataFrame({
+        "whole_float": [1.0, np.nan, 300.0],
+        "small_int": [1, 2, 3],
+        "big_int": [1, 2, 3_000_000_000],
+        "precise": [0.1, 0.2, np.nan],
+        "flag": [True, False, True]
+    })
+    cleaned = Cleaning.clean(df, inplace=True)
+    assert cleaned is df
+    assert df["whole_float"].dtype == "float32"
+    assert df["whole_float"].tolist() == [1.0, -1.0, 300.0]
+    assert df["small_int"].dtype == "int8"
+    assert df["big_int"].dtype == "int64"
+    assert df["precise"].dtype == "float64"
+    assert df["precise"].tolist() == [0.1, 0.2, -1.0]
+    assert df["flag"].dtype == "bool"
     
 def test_team_table():
     df = pd.DataFrame({
@@ -166,6 +336,49 @@ def test_facts_table():
     assert facts_df['points_allowed'].tolist() == [30, 30, 20, 20]
     assert facts_df['result'].tolist() == ['L', 'L', 'W', 'W']
 
+def test_polars_engine_matches_pandas():
+    stats_df = pd.DataFrame({
+        "season": [2009, 2009, 2022],
+        "team": ["ATL", "NE", "ATL"],
+        "week": [1, 1, 2],
+        "season_type": ["REG", "REG", "REG"],
+        "attempts": [10, 15, 12],
+        "carries": [5, 7, np.nan],
+        "passing_yards": [100, 150, 90],
+        "rushing_yards": [50, 70, 20],
+        "passing_tds": [1, 2, 0],
+        "rushing_tds": [0, 1, 1],
+    })
+    schedule_df = pd.DataFrame({
+        "season": [2009, 2009, 2022],
+        "week": [1, 1, 2],
+        "home_team": ["ATL", "NE", "DEN"],
+        "away_team": ["NE", "ATL", "ATL"],
+        "home_score": [20, 30, 17],
+        "away_score": [30, 20, 17],
+        "game_type": ["REG", "REG", "REG"],
+        "location": ["Home", "Home", "Home"],
+        "stadium": ["A", "B", "C"]
+    })
+    expected = season_tables(stats_df, schedule_df, engine="pandas")
+    actual = season_tables(pl.from_pandas(stats_df), pl.from_pandas(schedule_df), engine="polars")
+    for exp, act in zip(expected, actual):
+        pd.testing.assert_frame_equal(exp.reset_index(drop=True), act, check_dtype=False)
+
+def test_polars_team_table_and_valid_rows():
+    teams = pl.DataFrame({
+        "team_id": ["1", "2"],
+        "team_abbr": ["ATL", "NE"],
+        "team_name": ["Atlanta Falcons", "New England Patriots"],
+        "team_conf": ["NFC", "AFC"],
+        "team_division": ["South", "East"]
+    })
+    team_df = polars_module.team_table(teams).collect()
+    assert team_df.columns == ["team_id", "team_name", "team_conf", "team_division"]
+    plays = pl.DataFrame({"play_type": ["run", "kickoff", "pass"], "posteam": ["JAC", "NE", "ATL"]})
+    valid = polars_module.PolarsValidation.valid_rows(plays, "play_type", ["run", "pass"]).collect()
+    assert valid["posteam"].to_list() == ["JAX", "ATL"]
+
 def test_facts_table_exception():
     stats_df = None
     schedule_df = None
@@ -203,8 +416,41 @@ def test_create_table(mock_get_inspect, mock_get_engine):
     assert mock_conn.execute.called
     sql_called = str(mock_conn.execute.call_args[0][0])
     assert "CREATE TABLE teams" in sql_called
+    assert "`posteam` VARCHAR(64) PRIMARY KEY" in sql_called
+    assert "`yards` SMALLINT" in sql_called
+
+@patch("src.load.load_module.get_engine")
+@patch("src.load.load_module.inspect")
+def test_create_table_not_compact(mock_get_inspect, mock_get_engine):
+    mock_engine = MagicMock()
+    mock_conn = MagicMock()
+    mock_inspect = MagicMock()
+    mock_inspect.has_table.return_value = False
+    mock_get_inspect.return_value = mock_inspect
+    mock_engine.begin.return_value.__enter__.return_value = mock_conn
+    mock_get_engine.return_value = mock_engine
+    load = DataLoader()
+    df = pd.DataFrame({
+        "posteam": ["DEN"],
+        "yards": [10]
+    })
+    load.create_(df, table_name="teams", primary_key="posteam", compact=False)
+    sql_called = str(mock_conn.execute.call_args[0][0])
     assert "`posteam` VARCHAR(50) PRIMARY KEY" in sql_called
     assert "`yards` BIGINT" in sql_called
+
+def test_profile_column():
+    assert DataLoader.profile_column(pd.Series([1999, 2024])) == "SMALLINT"
+    assert DataLoader.profile_column(pd.Series([0, 1])) == "SMALLINT"
+    assert DataLoader.profile_column(pd.Series([-1, 10_000])) == "INT"
+    assert DataLoader.profile_column(pd.Series([-1, 1_000_000_000])) == "BIGINT"
+    assert DataLoader.profile_column(pd.Series([0.5], dtype="float32")) == "FLOAT"
+    assert DataLoader.profile_column(pd.Series(["W", "L"]), "result") == "ENUM('W', 'L', 'T')"
+    assert DataLoader.profile_column(pd.Series(["REG", "XX"]), "game_type") == "ENUM('REG', 'WC', 'DIV', 'CON', 'SB', 'XX')"
+    assert DataLoader.profile_column(pd.Series(["REG", "REG"])) == "VARCHAR(64)"
+    assert DataLoader.profile_column(pd.Series([None], dtype=object)) == "VARCHAR(64)"
+    assert DataLoader.profile_column(pd.Series(["Sports Authority Field at Mile High"])) == "VARCHAR(128)"
+    assert DataLoader.row_bytes(["TINYINT", "CHAR(3)", "VARCHAR(16)", "ENUM('W', 'L')"]) == 1 + 3 + 17 + 1
     
 @patch("src.load.load_module.get_engine")
 def test_create_table_empty_df(mock_get_engine):
@@ -322,6 +568,127 @@ def test_insert_table_no_primary_key(mock_get_engine):
     assert "VALUES (:posteam, :yards)" in sql_called
     assert mock_conn.execute.called
 
+@patch("src.load.load_module.get_engine")
+def test_insert_table_batched(mock_get_engine):
+    mock_engine = MagicMock()
+    mock_conn = MagicMock()
+    mock_engine.begin.return_value.__enter__.return_value = mock_conn
+    mock_get_engine.return_value = mock_engine
+    load = DataLoader()
+    df = pd.DataFrame({
+        "posteam": ["DEN", "NE", "ATL"],
+        "yards": [10, np.nan, 3]
+    })
+    stats = load.insert_(df, table_name="teams", primary_key="posteam", batch_size=2)
+    assert mock_conn.exec_driver_sql.call_count == 2
+    assert [s["rows"] for s in stats] == [2, 1]
+    sql_called, rows = mock_conn.exec_driver_sql.call_args_list[0][0]
+    assert "VALUES (%s, %s) ON DUPLICATE KEY UPDATE" in sql_called
+    assert rows == [("DEN", 10.0), ("NE", None)]
+
+def test_batches_use_driver_placeholders_and_bind_limit(tmp_path):
+    df = pd.DataFrame({"game_id": [f"g{i}" for i in range(5)], "yards": [1, 2, None, 4, 5]})
+    sql = [b[3] for b in DataLoader._batches(df, "g", "game_id", 2, "sqlite", "qmark")]
+    assert sql[0] == 'INSERT INTO g (`game_id`, `yards`) VALUES (?, ?) ON CONFLICT(`game_id`) DO UPDATE SET `yards`=excluded.`yards`;'
+    wide = pd.DataFrame([[0] * 20000] * 3)
+    assert [b[2] for b in DataLoader._batches(wide, "w", None, 1000, "sqlite", "qmark")] == [1, 1, 1]
+    assert [b[2] for b in DataLoader._batches(wide, "w", None, 1000, "mysql")] == [3]
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'b.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE g (game_id TEXT PRIMARY KEY, yards REAL)")
+    load = DataLoader(engine)
+    assert [s["rows"] for s in load.insert_(df, "g", "game_id", batch_size=2)] == [2, 2, 1]
+    load.insert_(df.assign(yards=9), "g", "game_id", batch_size=3)
+    assert pd.read_sql("SELECT yards FROM g", engine)["yards"].tolist() == [9] * 5
+
+@patch("src.load.load_module.get_engine")
+def test_load_file(mock_get_engine):
+    mock_engine = MagicMock()
+    mock_conn = MagicMock()
+    mock_engine.begin.return_value.__enter__.return_value = mock_conn
+    mock_get_engine.return_value = mock_engine
+    load = DataLoader()
+    df = pd.DataFrame({"posteam": ["DEN"], "yards": [10]})
+    load.load_file_(df, table_name="teams")
+    sql_called = str(mock_conn.execute.call_args[0][0])
+    path = mock_conn.execute.call_args[0][1]["path"]
+    assert "LOAD DATA LOCAL INFILE" in sql_called
+    assert "REPLACE INTO TABLE `teams`" in sql_called
+    assert "(`posteam`, `yards`)" in sql_called
+    assert not os.path.exists(path)
+
+@patch("src.load.load_module.get_engine")
+def test_load_file_writes_bools_as_ints_and_escapes_backslashes(mock_get_engine):
+    mock_engine = MagicMock()
+    mock_conn = MagicMock()
+    written = []
+    mock_conn.execute.side_effect = lambda sql, params: written.append(open(params["path"]).read())
+    mock_engine.begin.return_value.__enter__.return_value = mock_conn
+    mock_get_engine.return_value = mock_engine
+    df = pd.DataFrame({"posteam": ["DEN", "C:\\N"], "home": [True, False], "yards": [10, None]})
+    DataLoader().load_file_(df, table_name="teams")
+    assert written == ["posteam,home,yards\nDEN,1,10.0\nC:\\\\N,0,\\N\n"]
+
+@patch("src.load.load_module.get_engine")
+@patch("src.load.load_module.inspect")
+def test_load_tables(mock_get_inspect, mock_get_engine):
+    mock_engine = MagicMock()
+    mock_conn = MagicMock()
+    mock_inspect = MagicMock()
+    mock_inspect.has_table.return_value = True
+    mock_get_inspect.return_value = mock_inspect
+    mock_engine.begin.return_value.__enter__.return_value = mock_conn
+    mock_get_engine.return_value = mock_engine
+    load = DataLoader()
+    seasons = [
+        pd.DataFrame({"season_id": [2009], "num_games": [16]}),
+        pd.DataFrame({"season_id": [2010], "num_games": [16]}),
+        pd.DataFrame({"season_id": [2010], "num_games": [16]})
+    ]
+    team = pd.DataFrame({"team_id": ["DEN", "NE"]})
+    written = load.load_tables_({"team": (team, "team_id"), "season": (seasons, "season_id")})
+    assert written == {"team": 2, "season": 2}
+    assert mock_conn.execute.call_count == 2
+    records = mock_conn.execute.call_args_list[1][0][1]
+    assert [r["season_id"] for r in records] == [2009, 2010]
+
+@patch("src.load.load_module.get_engine")
+def test_upsert_changed_skips_unchanged_rows(mock_get_engine):
+    mock_engine = MagicMock()
+    mock_conn = MagicMock()
+    mock_engine.begin.return_value.__enter__.return_value = mock_conn
+    mock_get_engine.return_value = mock_engine
+    load = DataLoader()
+    df = pd.DataFrame({"game_id": ["a", "b", "c"], "yards": [10, 20, 30]})
+    assert load.upsert_changed_(df, "nfl_facts", "game_id") == {"sent": 3, "skipped": 0}
+    updated = pd.DataFrame({"game_id": ["a", "b", "c", "d"], "yards": [10, 25, 30, 5]})
+    assert load.upsert_changed_(updated, "nfl_facts", "game_id") == {"sent": 2, "skipped": 2}
+    records = mock_conn.execute.call_args[0][1]
+    assert [r["game_id"] for r in records] == ["b", "d"]
+    assert load.upsert_changed_(updated, "nfl_facts", "game_id") == {"sent": 0, "skipped": 4}
+    assert mock_conn.execute.call_count == 2
+
+@patch("src.load.load_module.get_engine")
+def test_upsert_changed_ignores_numeric_width(mock_get_engine):
+    mock_get_engine.return_value = MagicMock()
+    load = DataLoader()
+    df = pd.DataFrame({"game_id": ["w1", "w2"], "yards": np.array([1.5, 2.0], dtype="float32"),
+                       "week": np.array([1, 2], dtype="int8")})
+    load.upsert_changed_(df, "width_facts", "game_id")
+    wide = df.astype({"yards": "float64", "week": "int64"})
+    assert load.upsert_changed_(wide, "width_facts", "game_id") == {"sent": 0, "skipped": len(df)}
+
+def test_upsert_changed_resends_rows_after_drop_and_create(tmp_path):
+    load = DataLoader(create_engine(f"sqlite:///{tmp_path / 'f.db'}"))
+    df = pd.DataFrame({"game_id": ["a", "b"], "yards": [10, 20]})
+    load.create_(df, "nfl_facts", primary_key="game_id")
+    assert load.upsert_changed_(df, "nfl_facts", "game_id")["sent"] == 2
+    load.drop_("nfl_facts")
+    load.create_(df, "nfl_facts", primary_key="game_id")
+    assert load.upsert_changed_(df, "nfl_facts", "game_id") == {"sent": 2, "skipped": 0}
+    assert len(pd.read_sql("SELECT * FROM nfl_facts", load.engine)) == 2
+
 @patch("src.load.load_module.get_engine")
 def test_insert_table_empty_df(mock_get_engine):
     mock_engine = MagicMock()
@@ -352,6 +719,23 @@ def test_insert_table_exception(mock_get_engine):
     except Exception as e:
         assert str(e) == "DB error on insert"
 
+@patch("src.load.load_module.get_engine")
+def test_insert_bumps_table_version(mock_get_engine):
+    mock_engine = MagicMock()
+    mock_get_engine.return_value = mock_engine
+    load = DataLoader()
+    df = pd.DataFrame({"posteam": ["DEN"], "yards": [10]})
+    before = table_version("versioned")
+    load.insert_(df, table_name="versioned", primary_key="posteam")
+    load.insert_(df, table_name="versioned", primary_key="posteam", batch_size=1)
+    assert table_version("versioned") == before + 2
+    mock_engine.begin.side_effect = Exception("DB error on insert")
+    try:
+        load.insert_(df, table_name="versioned", primary_key="posteam")
+    except Exception:
+        pass
+    assert table_version("versioned") == before + 2
+
 @patch("src.load.load_module.get_engine")
 def test_drop_table(mock_get_engine):
     mock_engine = MagicMock()
@@ -389,4 +773,553 @@ def test_drop_table_exception(mock_get_engine):
         assert False, "Expected Exception for DB error on drop"
     except Exception as e:
         assert str(e) == "DB error on drop"
-        
\ No newline at end of file
+        
+
+def _facts_fixture():
+    return pd.DataFrame({
+        "season_id": [2009, 2009, 2009, 2009, 2010, 2010],
+        "team_id": ["ATL", "NE", "ATL", "NE", "ATL", "NE"],
+        "game_id": ["2009_1_ATL", "2009_1_NE", "2009_20_ATL", "2009_20_NE", "2010_1_ATL", "2010_1_NE"],
+        "week": [1, 1, 20, 20, 1, 1],
+        "game_type": ["REG", "REG", "SB", "SB", "REG", "REG"],
+        "pass_attempts": [30, 20, 25, 35, 40, 10],
+        "rush_attempts": [20, 30, 25, 15, 10, 40],
+        "pass_yards": [300, 150, 200, 280, 350, 90],
+        "rush_yards": [80, 120, 90, 60, 40, 200],
+        "pass_tds": [2, 1, 1, 3, 3, 0],
+        "rush_tds": [1, 1, 0, 1, 0, 2],
+        "points_scored": [21, 14, 10, 28, 24, 24],
+        "points_allowed": [14, 21, 28, 10, 24, 24],
+        "result": ["W", "L", "L", "W", "T", "T"]
+    })
+
+def test_views_sql_matches_pandas():
+    facts = _facts_fixture()
+    engine = create_engine("sqlite://")
+    facts.to_sql("nfl_facts", engine, index=False)
+
+    assert queries.seasons(engine) == queries.seasons(facts=facts) == [2009, 2010]
+
+    sql_season = queries.season_view(2009, 2010, engine)
+    pd_season = queries.season_view(2009, 2010, facts=facts)
+    pd.testing.assert_frame_equal(sql_season, pd_season, check_dtype=False)
+    assert sql_season["pass_attempts"].tolist() == [110, 50]
+
+    sql_team = queries.team_view(2009, engine)
+    pd_team = queries.team_view(2009, facts=facts)
+    pd.testing.assert_frame_equal(sql_team, pd_team, check_dtype=False)
+    assert sql_team["season_status"].tolist() == ["Super Bowl", "Super Bowl"]
+    assert sql_team["win_pct"].tolist() == [50.0, 50.0]
+    assert queries.team_view(2010, facts=facts)["win_pct"].tolist() == [50.0, 50.0]
+
+    sql_game = queries.game_view(2009, 20, engine)
+    pd_game = queries.game_view(2009, 20, facts=facts)
+    assert sql_game["game_id"].tolist() == pd_game["game_id"].tolist() == ["2009_20_ATL", "2009_20_NE"]
+
+    assert queries.count_rows(engine, "nfl_facts") == len(facts)
+    assert queries.row_counts(engine, ["nfl_facts", "season_summary"]) == (len(facts), None)
+    pages = [queries.read_preview(engine, "nfl_facts", page, rows=3) for page in range(2)]
+    assert [len(p) for p in pages] == [3, len(facts) - 3]
+    assert pd.concat(pages)["game_id"].tolist() == facts["game_id"].tolist()
+
+def test_partial_store_does_not_hide_database_seasons(tmp_path):
+    facts = _facts_fixture()
+    engine = create_engine("sqlite://")
+    facts.to_sql("nfl_facts", engine, index=False)
+    store = SeasonStore(str(tmp_path))
+    store.write(facts[facts["season_id"] == 2010], "nfl_facts")
+
+    assert queries.seasons(engine, store=store) == queries.seasons(engine) == [2009, 2010]
+    pd.testing.assert_frame_equal(queries.season_view(2009, 2010, engine, store=store),
+                                  queries.season_view(2009, 2010, engine), check_dtype=False)
+    pd.testing.assert_frame_equal(queries.season_view(2009, 2010, facts=facts, store=store),
+                                  queries.season_view(2009, 2010, engine), check_dtype=False)
+    pd.testing.assert_frame_equal(queries.team_view(2009, engine, store=store),
+                                  queries.team_view(2009, engine), check_dtype=False)
+    assert queries.game_view(2009, 20, engine, store=store)["game_id"].tolist() == ["2009_20_ATL", "2009_20_NE"]
+
+    # the summary tables still come first
+    queries.season_summary(facts).assign(pass_attempts=0).to_sql("season_summary", engine, index=False)
+    assert queries.season_view(2009, 2010, engine, store=store)["pass_attempts"].tolist() == [0, 0]
+
+def test_summary_tables_feed_views():
+    facts = _facts_fixture()
+    engine = create_engine("sqlite://")
+    facts.to_sql("nfl_facts", engine, index=False)
+    aggregated_team = queries.team_view(2009, engine)
+    aggregated_season = queries.season_view(2009, 2010, engine)
+
+    team_summary = queries.team_season_summary(facts)
+    assert team_summary["summary_id"].tolist() == ["2009_ATL", "2009_NE", "2010_ATL", "2010_NE"]
+    queries.season_summary(facts).to_sql("season_summary", engine, index=False)
+    team_summary.to_sql("team_season_summary", engine, index=False)
+
+    pd.testing.assert_frame_equal(queries.team_view(2009, engine), aggregated_team, check_dtype=False)
+    pd.testing.assert_frame_equal(queries.season_view(2009, 2010, engine), aggregated_season, check_dtype=False)
+
+@patch("src.load.load_module.get_engine")
+def test_refresh_summaries(mock_get_engine):
+    mock_get_engine.return_value = MagicMock()
+    load = DataLoader()
+    load.load_tables_ = MagicMock(return_value={})
+    load.refresh_summaries_(_facts_fixture())
+    tables = load.load_tables_.call_args[0][0]
+    season_df, season_pk = tables["season_summary"]
+    team_df, team_pk = tables["team_season_summary"]
+    assert (season_pk, team_pk) == ("season_id", "summary_id")
+    assert season_df["season_id"].tolist() == [2009, 2010]
+    assert len(team_df) == 4
+
+
+def test_runner_runs_independent_stages_concurrently():
+    started = threading.Barrier(2, timeout=5)
+    def side(value):
+        started.wait()  # only passes if both stages run at the same time
+        return value
+    pipeline = (runner_module.Pipeline()
+        .add("source", lambda: 2)
+        .add("left", side, "source")
+        .add("right", side, "source")
+        .add("total", lambda a, b: a + b, "left", "right"))
+    results = pipeline.run(max_workers=2)
+    assert results["total"] == 4
+    assert list(pipeline.timings)[-1] == "total"
+    assert "total" in pipeline.summary() and "wall" in pipeline.summary()
+
+def test_runner_rejects_unknown_dependency():
+    with pytest.raises(ValueError):
+        runner_module.Pipeline().add("load", lambda df: df, "transform")
+
+def test_runner_stops_dependents_of_failed_stage():
+    after = MagicMock()
+    pipeline = (runner_module.Pipeline()
+        .add("extract", lambda: 1 / 0)
+        .add("load", after, "extract"))
+    with pytest.raises(ZeroDivisionError):
+        pipeline.run()
+    after.assert_not_called()
+
+def _season_frames():
+    stats_df = pd.DataFrame({
+        "season": [2024, 2024], "team": ["ATL", "NE"], "week": [1, 1], "season_type": ["REG", "REG"],
+        "attempts": [10, 15], "carries": [5, 7], "passing_yards": [100, 150],
+        "rushing_yards": [50, 70], "passing_tds": [1, 2], "rushing_tds": [0, 1],
+    })
+    schedule_df = pd.DataFrame({
+        "season": [2024], "week": [1], "home_team": ["ATL"], "away_team": ["NE"],
+        "home_score": [20], "away_score": [30], "game_type": ["REG"],
+        "location": ["Home"], "stadium": ["A"]
+    })
+    return stats_df, schedule_df
+
+@pytest.mark.parametrize("engine", ["pandas", "polars"])
+def test_current_pipeline_loads_tables_in_order(engine):
+    stats_df, schedule_df = _season_frames()
+    teams = pd.DataFrame({"team_abbr": ["ATL", "NE"], "team_name": ["Falcons", "Patriots"]})
+    as_frame = (lambda df: pl.from_pandas(df)) if engine == "polars" else (lambda df: df)
+    load = MagicMock()
+    load.upsert_changed_.return_value = {"sent": 1, "skipped": 0}
+    with patch.object(runner_module, "get_teams", return_value=teams), \
+         patch.object(runner_module, "get_team_stats", return_value=as_frame(stats_df)), \
+         patch.object(runner_module, "get_schedule", return_value=as_frame(schedule_df)) as schedule:
+        pipeline = runner_module.current_pipeline(load, engine=engine)
+        pipeline.run()
+
+    assert schedule.call_args.args[0] == 2024
+    tables = [c.kwargs["table_name"] for c in load.upsert_changed_.call_args_list]
+    assert sorted(tables[:3]) == ["game", "season", "team"] and tables[3] == "nfl_facts"
+    expected = season_tables(stats_df, schedule_df, engine="pandas")
+    loaded = {c.kwargs["table_name"]: c.kwargs["df"] for c in load.upsert_changed_.call_args_list}
+    for table_name, exp in zip(["season", "game", "nfl_facts"], expected):
+        pd.testing.assert_frame_equal(exp.reset_index(drop=True), loaded[table_name].reset_index(drop=True),
+                                      check_dtype=False)
+    load.refresh_summaries_.assert_called_once()
+    compact = {c.kwargs["table_name"]: c.kwargs["compact"] for c in load.create_.call_args_list}
+    assert compact == {"team": True, "season": False, "game": False, "nfl_facts": False}
+
+def test_streaming_backfill_bounds_seasons_in_flight():
+    stats_df, schedule_df = _season_frames()
+    extracted, ahead = [], []
+    def fake_season(year, as_polars=False):
+        extracted.append(year)
+        return year, stats_df.assign(season=year), schedule_df.assign(season=year), 0.0
+    load = MagicMock()
+    def slow_insert(df, table_name, **kwargs):
+        if table_name == "nfl_facts":
+            ahead.append(len(extracted) - len(stream.rows))
+            threading.Event().wait(0.02)
+    load.insert_.side_effect = slow_insert
+
+    teams = pd.DataFrame({"team_abbr": ["ATL"], "team_name": ["Falcons"]})
+    with patch.object(runner_module, "get_teams", return_value=teams), \
+         patch.object(runner_module, "get_season", side_effect=fake_season):
+        stream = runner_module.StreamingBackfill(load, range(2000, 2010), engine="pandas", queue_size=1)
+        rows = stream.run()
+
+    assert list(rows) == list(range(2000, 2010))
+    assert max(ahead) <= 2 * 1 + 3
+    assert load.refresh_summaries_.call_count == 10
+    assert set(stream.timings) == {"extract", "transform", "load"}
+    assert all(c.kwargs.get("compact") is False for c in load.create_.call_args_list if c.kwargs["table_name"] != "team")
+
+def test_streaming_backfill_raises_worker_errors():
+    def broken(year, as_polars=False):
+        raise ConnectionError("offline")
+    teams = pd.DataFrame({"team_abbr": ["ATL"], "team_name": ["Falcons"]})
+    with patch.object(runner_module, "get_teams", return_value=teams), \
+         patch.object(runner_module, "get_season", side_effect=broken):
+        with pytest.raises(ConnectionError):
+            runner_module.StreamingBackfill(MagicMock(), [2000, 2001], engine="pandas").run()
+
+def test_async_engine_swaps_in_async_drivers(tmp_path, monkeypatch):
+    assert db_engine.async_url("mysql+pymysql://u:p@h:3307/nfl").render_as_string(hide_password=False) == (
+        "mysql+aiomysql://u:p@h:3307/nfl")
+    assert db_engine.async_url("sqlite:///nfl.db").drivername == "sqlite+aiosqlite"
+    with pytest.raises(ValueError, match="duckdb"):
+        db_engine.async_url("duckdb:///nfl.duckdb")
+    monkeypatch.setenv("DB_URL", "duckdb:///nfl.duckdb")
+    with pytest.raises(ValueError):
+        db_engine.get_async_engine()
+    pytest.importorskip("aiosqlite")
+    monkeypatch.setenv("DB_URL", f"sqlite:///{tmp_path / 'nfl.db'}")
+    assert db_engine.get_async_engine().url.drivername == "sqlite+aiosqlite"
+
+def test_async_loader_upserts_into_sqlite(tmp_path):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine
+    path = tmp_path / "nfl.db"
+    with create_engine(f"sqlite:///{path}").begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE team (team_id TEXT PRIMARY KEY, wins INTEGER)")
+        conn.exec_driver_sql("CREATE TABLE season (season_id INTEGER PRIMARY KEY, num_games INTEGER)")
+
+    async def run():
+        load = AsyncDataLoader(create_async_engine(f"sqlite+aiosqlite:///{path}"), max_concurrency=2)
+        try:
+            written = await load.load_tables_({
+                "team": ([pd.DataFrame({"team_id": ["ATL", "NE", "DEN"], "wins": [1, 2, None]}),
+                          pd.DataFrame({"team_id": ["ATL"], "wins": [7]})], "team_id"),
+                "season": (pd.DataFrame({"season_id": [2020, 2021], "num_games": [16, 17]}), "season_id")
+            }, batch_size=2)
+            stats = await load.insert_(pd.DataFrame({"team_id": ["NE"], "wins": [9]}), "team", "team_id")
+        finally:
+            await load.dispose()
+        return written, stats
+
+    before = table_version("team")
+    written, stats = asyncio.run(run())
+    assert written == {"team": 3, "season": 2}
+    assert stats[0]["rows"] == 1
+    assert table_version("team") == before + 3
+    teams = pd.read_sql("SELECT * FROM team ORDER BY team_id", create_engine(f"sqlite:///{path}"))
+    assert teams["team_id"].tolist() == ["ATL", "DEN", "NE"]
+    assert teams["wins"].tolist()[0::2] == [7, 9] and pd.isna(teams["wins"][1])
+
+class _SlowAsyncEngine:
+    """Stands in for an AsyncEngine whose statements each wait on the server"""
+    def __init__(self):
+        self.dialect = MagicMock()
+        self.dialect.name = "mysql"
+        self.active = self.peak = self.statements = 0
+
+    def begin(self):
+        engine = self
+        class Connection:
+            async def __aenter__(self):
+                engine.active += 1
+                engine.peak = max(engine.peak, engine.active)
+                return self
+            async def __aexit__(self, *exc):
+                engine.active -= 1
+            async def exec_driver_sql(self, sql, rows):
+                engine.statements += 1
+                await asyncio.sleep(0.02)
+        return Connection()
+
+    async def dispose(self):
+        pass
+
+def test_async_loader_overlaps_batches_up_to_limit():
+    engine = _SlowAsyncEngine()
+    load = AsyncDataLoader(engine, max_concurrency=3)
+    df = pd.DataFrame({"game_id": [f"g{i}" for i in range(10)], "yards": range(10)})
+    written = asyncio.run(load.load_tables_({"nfl_facts": (df, "game_id"), "game": (df, "game_id")}, batch_size=2))
+    assert written == {"nfl_facts": 10, "game": 10}
+    assert engine.statements == 10
+    assert engine.peak == 3
+
+def test_runner_awaits_async_stages():
+    async def double(value):
+        await asyncio.sleep(0)
+        return value * 2
+    pipeline = runner_module.Pipeline().add("source", lambda: 21).add("double", double, "source")
+    assert pipeline.run()["double"] == 42
+
+def test_backfill_pipeline_with_async_loader():
+    stats_df, schedule_df = _season_frames()
+    seasons = [(year, stats_df.assign(season=year), schedule_df.assign(season=year), 0.0) for year in (2023, 2024)]
+    teams = pd.DataFrame({"team_abbr": ["ATL", "NE"], "team_name": ["Falcons", "Patriots"]})
+    engine = _SlowAsyncEngine()
+    load = MagicMock()
+    with patch.object(runner_module, "get_teams", return_value=teams), \
+         patch.object(runner_module, "get_seasons", return_value=iter(seasons)):
+        pipeline = runner_module.backfill_pipeline(load, [2023, 2024], engine="pandas",
+                                                   async_load=AsyncDataLoader(engine, max_concurrency=4))
+        results = pipeline.run()
+    assert results["load_tables"] == {"team": 2, "season": 2, "game": 2, "nfl_facts": 4}
+    assert [c.kwargs["table_name"] for c in load.create_.call_args_list] == ["team", "season", "game", "nfl_facts"]
+    load.refresh_summaries_.assert_called_once()
+
+def test_measure_records_json_lines(tmp_path, monkeypatch):
+    path = tmp_path / "metrics.jsonl"
+    monkeypatch.setenv("PIPELINE_METRICS_FILE", str(path))
+
+    @metrics_module.measure(step="load", detail="table_name")
+    def insert(df, table_name):
+        return df.head(2)
+
+    @metrics_module.measure(step="transform", trace=True)
+    async def widen(df):
+        return [df, pl.from_pandas(df)]
+
+    @metrics_module.measure(step="extract")
+    def broken():
+        raise ValueError("bad file")
+
+    mark = metrics_module.mark()
+    df = pd.DataFrame({"a": range(5)})
+    insert(df, table_name="game")
+    asyncio.run(widen(df))
+    with pytest.raises(ValueError):
+        broken()
+
+    entries = metrics_module.records(mark)
+    assert [e["stage"] for e in entries] == ["test_pipeline.insert[game]", "test_pipeline.widen", "test_pipeline.broken"]
+    assert (entries[0]["rows_in"], entries[0]["rows_out"], entries[0]["bytes_out"]) == (5, 2, 16)
+    assert entries[1]["rows_out"] == 10 and entries[1]["traced_peak_bytes"] > 0
+    assert entries[2]["status"] == "error" and "bad file" in entries[2]["error"]
+    assert all(e["seconds"] >= 0 and e["rss_peak_bytes"] for e in entries)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["seq"] for line in lines] == [e["seq"] for e in entries]
+
+    summary = metrics_module.summary_frame(entries)
+    assert set(summary["stage"]) == {e["stage"] for e in entries}
+    assert summary.loc[summary["stage"] == "test_pipeline.broken", "errors"].item() == 1
+
+def test_metrics_file_rotates_at_its_size_cap(tmp_path, monkeypatch):
+    path = tmp_path / "capped.jsonl"
+    monkeypatch.setenv("PIPELINE_METRICS_FILE", str(path))
+    monkeypatch.setenv("PIPELINE_METRICS_MAX_MB", str(300 / 1024 ** 2))
+    monkeypatch.setenv("PIPELINE_METRICS_BACKUPS", "2")
+    for i in range(20):
+        metrics_module.record({"stage": f"s{i}", "padding": "x" * 50})
+    assert sorted(os.listdir(tmp_path)) == ["capped.jsonl", "capped.jsonl.1", "capped.jsonl.2"]
+    assert all(os.path.getsize(tmp_path / name) < 300 + 200 for name in os.listdir(tmp_path))
+    assert json.loads(path.read_text().splitlines()[-1])["stage"] == "s19"
+
+def test_pipeline_stages_are_measured(monkeypatch):
+    monkeypatch.setenv("PIPELINE_METRICS_FILE", "")
+    mark = metrics_module.mark()
+    pipeline = runner_module.Pipeline("demo").add("frame", lambda: pd.DataFrame({"a": [1, 2, 3]}))
+    pipeline.run()
+    entries = metrics_module.records(mark)
+    assert [(e["stage"], e["step"], e["rows_out"]) for e in entries] == [("demo.frame", "pipeline", 3)]
+    assert pipeline.timings["frame"] == entries[0]["seconds"]
+
+def test_loader_round_trip_on_sqlite():
+    load = DataLoader(create_engine("sqlite://"))
+    assert load.dialect == "sqlite"
+    facts = pd.DataFrame({"game_id": ["2024_1_ATL", "2024_1_NE"], "result": ["W", "L"], "week": [1, 1]})
+    load.create_(facts, "nfl_facts", primary_key="game_id")
+    load.insert_(facts, "nfl_facts", "game_id")
+    load.insert_(facts.assign(result=["L", "W"]), "nfl_facts", "game_id", batch_size=1)
+    stored = pd.read_sql("SELECT * FROM nfl_facts ORDER BY game_id", load.engine)
+    assert stored["result"].tolist() == ["L", "W"]
+
+def test_logging_is_queued_rotated_and_levelled(tmp_path, monkeypatch):
+    path = tmp_path / "records.log"
+    monkeypatch.setenv("LOG_FILE", str(path))
+    monkeypatch.setenv("LOG_MAX_MB", "0.001")
+    monkeypatch.setenv("LOG_BACKUPS", "5")
+    monkeypatch.setenv("LOG_LEVELS", "src.load=WARNING,bogus,src.extract=NOPE")
+    assert logging_module.parse_levels(os.environ["LOG_LEVELS"]) == {"src.load": "WARNING"}
+
+    listener = logging_module.configure_logging(force=True)
+    try:
+        assert logging_module.configure_logging() is listener
+        load_logger = logging.getLogger("src.load.load_module")
+        load_logger.info("hidden")
+        load_logger.warning("shown")
+        for i in range(25):
+            logging.getLogger("src.pipeline.runner_module").info("row %s of a long run", i)
+    finally:
+        logging_module.shutdown_logging()
+        logging.getLogger("src.load").setLevel(logging.NOTSET)
+
+    logged = "".join(p.read_text() for p in tmp_path.glob("records.log*"))
+    assert "src.load.load_module: shown" in logged and "hidden" not in logged
+    assert all(f"row {i} of a long run" in logged for i in range(25))
+    assert (tmp_path / "records.log.1").exists()
+    assert all(p.stat().st_size <= 1100 for p in tmp_path.iterdir())
+
+def test_sql_echo_is_off_by_default_and_sampled(monkeypatch, caplog):
+    monkeypatch.delenv("SQL_ECHO", raising=False)
+    assert not logging_module.install_sql_echo(create_engine("sqlite://"))
+
+    monkeypatch.setenv("SQL_ECHO", "1")
+    monkeypatch.setenv("SQL_ECHO_SAMPLE", "0.5")
+    assert logging_module.sql_echo_rate() == 0.5
+
+    engine = create_engine("sqlite://")
+    assert logging_module.install_sql_echo(engine, rate=1)
+    with caplog.at_level(logging.INFO, logger=logging_module.SQL_LOGGER):
+        with engine.begin() as conn:
+            conn.execute(text("SELECT :a"), {"a": "secret"})
+    assert [r.getMessage() for r in caplog.records] == ["SELECT ? | params=1"]
+
+def test_imports_have_no_engine_env_or_nflreadpy_cost():
+    env = {k: v for k, v in os.environ.items() if not k.startswith("DB_") and not k.endswith(("_COLS", "_HOME", "_AWAY"))}
+    # a developer's .env must not fill the settings back in
+    code = ("import sys, dotenv; dotenv.load_dotenv = lambda *a, **k: False\n"
+            "from src.db import engine; from src.transform import fe_module; from src.pipeline import runner_module\n"
+            "from src.load.load_module import DataLoader; DataLoader()\n"
+            "assert engine.ENGINE is None and 'nflreadpy' not in sys.modules\n"
+            "try: fe_module.team_cols\nexcept ValueError as e: print(e)")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "TEAM_COLS is not set in the environment"
+
+def test_import_times_summary():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 | encodings",
+        "import time:       200 |        200 |     numpy.core",
+        "import time:       300 |        500 |   numpy",
+        "import time:       400 |        400 |     src.db.engine",
+        "import time:       100 |       1000 |   src.load.load_module",
+        "import time:        50 |       1050 | src.load",
+    ])
+    rows = import_times.parse_importtime(stderr)
+    assert rows[0] == ("encodings", 0, 100, 100) and rows[-1] == ("src.load", 0, 50, 1050)
+    summary = import_times.summarize(rows, skip={"encodings"})
+    assert summary == pytest.approx({"src.load": 0.00015, "numpy": 0.0005, "src.db": 0.0004})
+    assert import_times.import_code("Home.py").startswith("import streamlit as st")
+
+def test_pooled_engine_reports_checkouts_and_waits(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "1")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "0.05")
+    assert db_engine.pool_settings(pool_recycle=60)["pool_recycle"] == 60
+
+    engine = db_engine.create_pooled_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    assert db_engine.check_connection(engine)
+    with engine.connect():
+        assert db_engine.pool_status(engine)["checked_out"] == 1
+        with pytest.raises(sqlalchemy_exc.TimeoutError):
+            engine.connect()
+    engine.dispose()
+    assert db_engine.check_connection(engine)
+
+    status = db_engine.pool_status(engine)
+    assert status["pool_size"] == 1 and status["checked_out"] == 0
+    assert (status["checkouts"], status["timeouts"], status["connects"]) == (3, 1, 2)
+    assert status["max_wait_ms"] >= 50
+
+@pytest.mark.parametrize("backend", ["sqlite", "duckdb"])
+def test_pipeline_and_views_run_on_embedded_backend(backend, tmp_path):
+    if backend == "duckdb":
+        pytest.importorskip("duckdb_engine")
+    engine = db_engine.create_pooled_engine(f"{backend}:///{tmp_path / 'nfl.db'}")
+    load = DataLoader(engine, store=SeasonStore(str(tmp_path / "store")))
+    assert load.backend.name == backend and not load.backend.enums
+
+    stats_df, schedule_df = _season_frames()
+    teams = pd.DataFrame({"team_abbr": ["ATL", "NE"], "team_name": ["Falcons", "Patriots"]})
+    with patch.object(runner_module, "get_teams", return_value=teams), \
+         patch.object(runner_module, "get_team_stats", return_value=stats_df), \
+         patch.object(runner_module, "get_schedule", return_value=schedule_df):
+        results = runner_module.current_pipeline(load, year=2024).run()
+        assert results["load_facts"]["sent"] == len(stats_df)
+        facts = pd.read_sql("SELECT * FROM nfl_facts ORDER BY game_id", engine)
+        changed = stats_df.assign(passing_yards=stats_df["passing_yards"] + 1)
+        with patch.object(runner_module, "get_team_stats", return_value=changed):
+            runner_module.current_pipeline(load, year=2024).run()
+
+    stored = pd.read_sql("SELECT * FROM nfl_facts ORDER BY game_id", engine)
+    assert len(stored) == len(facts)
+    assert (stored["pass_yards"] == facts["pass_yards"] + 1).all()
+    pd.testing.assert_frame_equal(queries.team_view(2024, engine), queries.team_view(2024, facts=stored),
+                                  check_dtype=False, check_like=True)
+    assert load.store.seasons("nfl_facts") == load.store.seasons("game") == [2024]
+    pd.testing.assert_frame_equal(queries.team_view(2024, store=load.store), queries.team_view(2024, facts=stored),
+                                  check_dtype=False, check_like=True)
+
+    plays = pd.DataFrame({"desc": ["run left", "pass deep"]})
+    load.create_(plays, "plays", primary_key=None)
+    load.insert_(plays, "plays", None)
+    load.load_file_(plays.assign(id=[1, 2], desc=["run right", "pass short"]), "plays")
+    assert pd.read_sql("SELECT * FROM plays ORDER BY id", engine)["desc"].tolist() == ["run right", "pass short"]
+
+def test_backend_upsert_syntax():
+    columns = ["game_id", "result"]
+    assert DataLoader._insert_sql("g", columns, "game_id", "(:a, :b)") == (
+        "INSERT INTO g (`game_id`, `result`) VALUES (:a, :b) ON DUPLICATE KEY UPDATE `result`=VALUES(`result`);")
+    assert DataLoader._insert_sql("g", columns, "game_id", "(:a, :b)", "duckdb") == (
+        'INSERT INTO g ("game_id", "result") VALUES (:a, :b) ON CONFLICT("game_id") DO UPDATE SET "result"=excluded."result";')
+    assert DataLoader._insert_sql("g", ["game_id"], "game_id", "(:a)", "sqlite").endswith("ON CONFLICT(`game_id`) DO NOTHING;")
+    assert DataLoader._insert_sql("g", columns, None, "(:a, :b)", "sqlite") == "INSERT INTO g (`game_id`, `result`) VALUES (:a, :b);"
+
+def test_season_store_rewrites_only_reloaded_partitions(tmp_path):
+    store = SeasonStore(str(tmp_path))
+    facts = pd.DataFrame({
+        "season_id": [2010, 2010, 2011, 2012], "team_id": ["ATL", "NE", "ATL", "NE"], "week": [1, 2, 1, 1],
+        "pass_attempts": [30, 25, 35, 20], "rush_attempts": [20, 25, 15, 30], "pass_yards": [250, 200, 300, 150],
+        "rush_yards": [100, 120, 80, 140], "pass_tds": [2, 1, 3, 1], "rush_tds": [1, 1, 0, 2],
+        "result": ["W", "L", "W", "T"], "game_type": ["REG", "REG", "SB", "REG"]
+    })
+    load = DataLoader(MagicMock(), store=store)
+    assert load.write_store_({"nfl_facts": [facts[facts["season_id"] < 2012], facts[facts["season_id"] == 2012]],
+                              "team": facts}) == {"nfl_facts": [2010, 2011, 2012]}
+    untouched = os.path.getmtime(store.path("nfl_facts", 2010) + "/part-0.parquet")
+
+    reloaded = facts[facts["season_id"] == 2011].assign(pass_yards=[float("nan")])
+    assert store.write(reloaded, "nfl_facts") == [2011]
+    assert os.path.getmtime(store.path("nfl_facts", 2010) + "/part-0.parquet") == untouched
+    assert sorted(os.listdir(store.path("nfl_facts", 2011))) == ["part-0.parquet"]
+
+    both = store.read("nfl_facts", ["team_id", "pass_yards"], seasons=(2011, 2012))
+    assert list(both.columns) == ["team_id", "pass_yards"] and both["pass_yards"].isna().tolist() == [True, False]
+    every = store.read("nfl_facts")
+    assert list(every.columns) == list(facts.columns) and len(every) == 4
+
+    expected = facts.assign(pass_yards=every["pass_yards"])
+    assert queries.seasons(store=store) == [2010, 2011, 2012]
+    pd.testing.assert_frame_equal(queries.season_view(2010, 2011, store=store),
+                                  queries.season_view(2010, 2011, facts=expected), check_dtype=False)
+    pd.testing.assert_frame_equal(queries.team_view(2010, store=store),
+                                  queries.team_view(2010, facts=expected), check_dtype=False)
+    assert queries.game_view(2010, 2, store=store)["team_id"].tolist() == ["NE"]
+
+def test_schema_registry_validates_columns_and_types(tmp_path):
+    for name in ("team_stats", "schedule"):
+        example = pd.read_csv(schema_module.example_path(name))
+        assert schema_module.validate_frame(example, name).ok
+
+    registry = tmp_path / "registry.json"
+    registry.write_text(json.dumps({"version": 1, "schemas": {"t": {"example": "t.csv", "columns": [
+        {"name": "season", "dtype": "integer", "nullable": False},
+        {"name": "team", "dtype": "string", "nullable": False},
+        {"name": "fg_pct", "dtype": "float", "nullable": True},
+        {"name": "fg_list", "dtype": "string", "nullable": True}]}}}))
+    valid = pd.DataFrame({"season": [2024.0, None], "team": ["ATL", "NE"], "fg_pct": [None, None], "fg_list": [48, 45]})
+    report = schema_module.validate_frame(valid, "t", str(registry))
+    assert report.ok and report.null_violations == ["season"]
+
+    wrong = pd.DataFrame({"season": [2024.5], "team": [1], "extra": [0]})
+    report = schema_module.validate_frame(wrong, "t", str(registry))
+    assert not report.ok
+    assert report.missing == ["fg_pct", "fg_list"] and report.unexpected == ["extra"]
+    assert report.mismatched == {"season": ("integer", "float")}
+    assert "team (expected" not in report.describe() and "t missing columns: fg_pct, fg_list" in report.describe()
+    with pytest.raises(ValueError):
+        schema_module.get_schema("play_by_play")